@@ -0,0 +1,253 @@
+from langchain_openai import AzureChatOpenAI
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import StructuredTool
+from langchain.agents import create_tool_calling_agent, AgentExecutor
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from pydantic import ValidationError
+from typing import AsyncIterator, List, Optional
+import logging
+import os
+from bullet_service import BulletFormatter
+from customstore import CustomChatMessageHistory, RedisStore, get_store
+from metrics import MetricsCallbackHandler
+from resume_builder import Resume, current_resume
+from structured_input import describe_tool_calls, keep_existing_fields, parse_structured_input
+from tools.resume_tools import (
+    PersonalInformation, ExperienceTool, EducationTool, SkillsTool, ProjectsTool, ResumeTool,
+    ToolCallSequencer, current_tool_seq, current_tool_sequencer
+)
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_MESSAGE = """
+You are an AI-powered resume builder assistant. Your role is to:
+
+1. Collect all required information from the user through a series of questions.
+2. Ensure completeness and ask for missing details when necessary.
+3. Format responsibilities and project details into structured bullet points using the `format_responsibilities` tool.
+
+Resume structure (for reference):
+
+{{
+    "personal_info": {{
+        "name": "string",
+        "email": "string",
+        "phone": "string",
+        "github": "string",
+        "linkedin": "string"
+    }},
+    "experience": [{{
+        "company": "string",
+        "title": "string",
+        "start_date": "string",
+        "end_date": "string or null",
+        "job_type": "string",
+        "responsibilities": ["string"]
+    }}],
+    "education": [{{
+        "institution": "string",
+        "location": "string or null",
+        "degree": "string",
+        "graduation_date": "string"
+    }}],
+    "projects": [{{
+        "title": "string",
+        "tech_stack": ["string"],
+        "features": ["string"],
+        "duration": "string"
+    }}],
+    "skills": {{
+        "languages": ["string"],
+        "frameworks": ["string"],
+        "developer_tools": ["string"],
+        "libraries": ["string"]
+    }}
+}}
+
+"""
+
+def build_model() -> AzureChatOpenAI:
+    """Create the chat model; its HTTP connection pool is reused by every request that shares it."""
+    return AzureChatOpenAI(
+        model="gpt-4",
+        api_key=os.getenv("OPEN_AI_KEY"),
+        api_version=os.getenv("OPENAI_API_VERSION")
+    )
+
+
+def build_bullet_formatter(model: BaseChatModel, callbacks: Optional[list] = None) -> BulletFormatter:
+    """Bullet formatter sized from BULLET_CACHE_SIZE; its cache is shared through Redis when sessions are."""
+    store = get_store()
+    return BulletFormatter(
+        model,
+        callbacks=callbacks,
+        max_entries=int(os.getenv("BULLET_CACHE_SIZE", 1024)),
+        redis_client=store.client if isinstance(store, RedisStore) else None,
+        batch_window=float(os.getenv("BULLET_BATCH_WINDOW", 0.02)),
+        max_batch=int(os.getenv("BULLET_MAX_BATCH", 8))
+    )
+
+
+def build_format_responsibilities(formatter: BulletFormatter) -> StructuredTool:
+    def format_responsibilities(text: str) -> List[str]:
+        try:
+            return formatter.format(text)
+        except Exception as e:
+            return [f"Error breaking into bullet points: {str(e)}"]
+
+    async def aformat_responsibilities(text: str) -> List[str]:
+        try:
+            return await formatter.aformat(text)
+        except Exception as e:
+            return [f"Error breaking into bullet points: {str(e)}"]
+
+    return StructuredTool.from_function(
+        func=format_responsibilities,
+        coroutine=aformat_responsibilities,
+        name="format_responsibilities",
+        description="Breaks down long text into well-structured, impactful bullet points for better readability."
+    )
+
+
+class ParallelToolExecutor(AgentExecutor):
+    """AgentExecutor that runs the tool calls of one agent step concurrently on the async path.
+
+    AgentExecutor already gathers an async step's actions; this bounds the non-resume ones with
+    the request's ToolCallSequencer and tags each with its position so resume edits apply in
+    emitted order.
+    """
+
+    async def _aperform_agent_action(self, name_to_tool_map, color_mapping, agent_action, run_manager=None):
+        sequencer = current_tool_sequencer.get()
+        if sequencer is None:
+            return await super()._aperform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+        # Runs before the first await, so numbers follow the order the actions were gathered in
+        seq = sequencer.next_seq()
+        token = current_tool_seq.set(seq)
+        try:
+            if isinstance(name_to_tool_map.get(agent_action.tool), ResumeTool):
+                # Resume edits spend their time waiting for earlier calls, not working; holding a
+                # slot meanwhile would starve the format_responsibilities calls they wait on
+                return await super()._aperform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+            async with sequencer.semaphore:
+                return await super()._aperform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+        finally:
+            current_tool_seq.reset(token)
+            await sequencer.release(seq)
+
+
+class ResumeAgentFactory:
+    """Holds the model, prompt, tools and executor for the app; only the resume and history are per request."""
+
+    def __init__(self, model: Optional[BaseChatModel] = None, verbose: Optional[bool] = None,
+                 max_tool_concurrency: Optional[int] = None, bullet_formatter: Optional[BulletFormatter] = None):
+        self.model = model or build_model()
+        # Per-stage timings and token counts for /metrics
+        self.config = {"callbacks": [MetricsCallbackHandler()]}
+        # Bullet batches serve several requests at once, so they report to the metrics handler only
+        self.bullet_formatter = bullet_formatter or build_bullet_formatter(self.model, self.config["callbacks"])
+        self.max_tool_concurrency = max_tool_concurrency or int(os.getenv("TOOL_CONCURRENCY", 4))
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", SYSTEM_MESSAGE),
+            MessagesPlaceholder("chat_history", optional=True),
+            ("human", "{input}"),
+            MessagesPlaceholder(variable_name='agent_scratchpad')
+        ])
+        # The resume tools are unbound and pick up the request's resume from `current_resume`
+        self.tools = [
+            PersonalInformation(),
+            ExperienceTool(),
+            EducationTool(),
+            SkillsTool(),
+            ProjectsTool(),
+            build_format_responsibilities(self.bullet_formatter)
+        ]
+        self.agent = create_tool_calling_agent(
+            llm=self.model,
+            tools=self.tools,
+            prompt=self.prompt,
+        )
+        self.executor = ParallelToolExecutor(
+            agent=self.agent,
+            tools=self.tools,
+            # The stdout callback prints every step of every request; only worth it when debugging
+            verbose=logger.isEnabledFor(logging.DEBUG) if verbose is None else verbose,
+            handle_parsing_errors=True
+        )
+
+    async def aapply_structured(self, query: str, resume: Resume, history: CustomChatMessageHistory) -> Optional[dict]:
+        """Apply structured input (JSON or "key: value" lines) through the resume tools, without the model.
+
+        Returns None, having changed nothing, when `query` is free text or doesn't fit the tool
+        schemas; the caller then runs the agent. Otherwise the response has the reply in "output"
+        and the applied (name, args, result) in "tool_calls".
+        """
+        calls = parse_structured_input(query)
+        if calls is None:
+            return None
+        tools = {tool.name: tool for tool in self.tools}
+        try:
+            calls = keep_existing_fields(calls, resume.data)
+            # Validate every call before applying any, so a bad entry can't leave a partial edit
+            for name, args in calls:
+                tools[name].args_schema(**args)
+        except (KeyError, TypeError, ValidationError):
+            return None
+
+        # Read the history first, so the turn's write is checked against it as in ainvoke
+        await history.aload()
+        token = current_resume.set(resume)
+        try:
+            applied = [(name, args, tools[name].invoke(args, config=self.config)) for name, args in calls]
+        finally:
+            current_resume.reset(token)
+        output = describe_tool_calls(calls)
+        await history.aadd_messages([HumanMessage(content=query), AIMessage(content=output)])
+        return {"input": query, "output": output, "tool_calls": applied}
+
+    def invoke(self, query: str, resume: Resume, history: CustomChatMessageHistory) -> dict:
+        """Run one chat turn against `resume`, reading and extending `history` like ConversationBufferMemory."""
+        token = current_resume.set(resume)
+        try:
+            response = self.executor.invoke(
+                {"input": query, "chat_history": history.get_context_messages()}, config=self.config
+            )
+        finally:
+            current_resume.reset(token)
+        history.add_messages([HumanMessage(content=query), AIMessage(content=response["output"])])
+        return response
+
+    async def ainvoke(self, query: str, resume: Resume, history: CustomChatMessageHistory) -> dict:
+        """Async `invoke`; the LLM round trips and tool calls never block the event loop.
+
+        Tool calls emitted together run concurrently, up to `max_tool_concurrency` at a time.
+        """
+        token = current_resume.set(resume)
+        sequencer_token = current_tool_sequencer.set(ToolCallSequencer(self.max_tool_concurrency))
+        try:
+            response = await self.executor.ainvoke(
+                {"input": query, "chat_history": await history.aget_context_messages()}, config=self.config
+            )
+        finally:
+            current_tool_sequencer.reset(sequencer_token)
+            current_resume.reset(token)
+        await history.aadd_messages([HumanMessage(content=query), AIMessage(content=response["output"])])
+        return response
+
+    async def astream_events(self, query: str, resume: Resume, history: CustomChatMessageHistory) -> AsyncIterator[dict]:
+        """Stream LangChain v2 events for one chat turn, saving the exchange to `history` once it finishes."""
+        token = current_resume.set(resume)
+        sequencer_token = current_tool_sequencer.set(ToolCallSequencer(self.max_tool_concurrency))
+        output = None
+        try:
+            inputs = {"input": query, "chat_history": await history.aget_context_messages()}
+            async for event in self.executor.astream_events(inputs, config=self.config, version="v2"):
+                if event["event"] == "on_chain_end" and not event["parent_ids"]:
+                    output = event["data"]["output"]["output"]
+                yield event
+        finally:
+            current_tool_sequencer.reset(sequencer_token)
+            current_resume.reset(token)
+        if output is not None:
+            await history.aadd_messages([HumanMessage(content=query), AIMessage(content=output)])
@@ -0,0 +1,241 @@
+import asyncio
+import io
+import itertools
+import logging
+import multiprocessing
+import multiprocessing.util
+import os
+import shutil
+import subprocess
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from typing import AsyncIterator, Iterable, Iterator, List, NamedTuple, Optional
+
+from pdf_service import FORMAT_NAME, format_dump_command
+from tools.latex_converter import LaTeXResumeConverter
+
+logger = logging.getLogger(__name__)
+
+# Per worker process, set up by init_worker
+_converter = LaTeXResumeConverter()
+_work_dir = None
+_warm = False
+
+
+class BatchResult(NamedTuple):
+    index: int
+    pdf: Optional[bytes] = None
+    error: Optional[str] = None
+
+
+def init_worker(root: Optional[str] = None, pdflatex: str = "pdflatex", timeout: float = 30):
+    """Process pool initializer: a private work directory under `root` and, if possible, a dumped preamble format."""
+    global _work_dir, _warm
+    _work_dir = tempfile.mkdtemp(prefix="latex-batch-", dir=root)
+    # Removed when the worker exits; multiprocessing runs these finalizers even where atexit doesn't
+    multiprocessing.util.Finalize(None, shutil.rmtree, args=(_work_dir,), kwargs={"ignore_errors": True},
+                                  exitpriority=0)
+    try:
+        subprocess.run(
+            format_dump_command(_work_dir, _converter.generate_preamble(), pdflatex),
+            cwd=_work_dir, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            timeout=timeout, check=True
+        )
+        _warm = os.path.exists(os.path.join(_work_dir, f"{FORMAT_NAME}.fmt"))
+    except (subprocess.SubprocessError, OSError) as e:
+        logger.warning("Could not precompile the LaTeX preamble, compiling cold: %s", e)
+
+
+def render_pdf(resume_data: dict, pdflatex: str = "pdflatex", timeout: float = 30) -> bytes:
+    """Generate and compile one resume synchronously; meant to run inside a pool worker."""
+    work_dir = tempfile.mkdtemp(dir=_work_dir)
+    try:
+        with open(os.path.join(work_dir, "resume.tex"), "w") as f:
+            _converter.write_latex(resume_data, f)
+        args = [pdflatex, "-interaction=nonstopmode", "-halt-on-error"]
+        if _warm:
+            os.symlink(os.path.join(_work_dir, f"{FORMAT_NAME}.fmt"), os.path.join(work_dir, f"{FORMAT_NAME}.fmt"))
+            args.append(f"-fmt={FORMAT_NAME}")
+        result = subprocess.run(
+            args + ["resume.tex"],
+            cwd=work_dir, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            timeout=timeout
+        )
+        pdf_file = os.path.join(work_dir, "resume.pdf")
+        if result.returncode != 0 or not os.path.exists(pdf_file):
+            raise RuntimeError(f"PDF generation failed: {result.stdout.decode(errors='replace')[-2000:]}")
+        with open(pdf_file, "rb") as f:
+            return f.read()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+class BatchQueueFull(Exception):
+    """Raised when the resumes already being rendered leave no room for another batch."""
+
+
+def _mp_context():
+    # Forking a process that runs the event loop, threads and open connections copies their
+    # state mid-flight; workers start from a clean interpreter instead
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class BatchExecutor(ProcessPoolExecutor):
+    """Process pool for batch renders whose workers share one temporary root, removed on shutdown.
+
+    `pending` counts the resumes of batches being rendered by arender_batch that have not finished;
+    `reserve` raises BatchQueueFull once another batch would take it past `max_pending`.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 256):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.pending = 0
+        self.root = tempfile.mkdtemp(prefix="latex-batch-")
+        super().__init__(max_workers=self.max_workers, mp_context=_mp_context(),
+                         initializer=init_worker, initargs=(self.root,))
+
+    def check_capacity(self, resumes: int):
+        """Raise BatchQueueFull unless `resumes` more fit; an idle pool takes any batch."""
+        if self.pending and self.pending + resumes > self.max_pending:
+            raise BatchQueueFull(f"{self.pending} resumes already being rendered")
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        super().shutdown(wait=wait, cancel_futures=cancel_futures)
+        # Catches work directories of workers that were killed before their finalizer ran
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def create_batch_executor(max_workers: Optional[int] = None, max_pending: int = 256) -> BatchExecutor:
+    """A process pool sized to the cores, with each worker set up by init_worker."""
+    return BatchExecutor(max_workers, max_pending)
+
+
+def _window(executor: Executor, max_in_flight: Optional[int]) -> int:
+    # Two per worker keeps every worker busy while a finished result is handed back
+    return max_in_flight or 2 * (getattr(executor, "max_workers", None) or os.cpu_count() or 1)
+
+
+def _describe(error: BaseException) -> str:
+    if isinstance(error, subprocess.TimeoutExpired):
+        return f"PDF generation timed out after {error.timeout}s"
+    return str(error) or type(error).__name__
+
+
+def render_batch(resumes: Iterable[dict], executor: Optional[Executor] = None,
+                 max_in_flight: Optional[int] = None) -> Iterator[BatchResult]:
+    """Render many resumes across a process pool, yielding each result as soon as it finishes.
+
+    At most `max_in_flight` resumes are submitted at a time. A failing resume yields a
+    BatchResult with `error` set; the rest of the batch carries on.
+    """
+    own_executor = executor is None
+    executor = executor or create_batch_executor()
+    window = _window(executor, max_in_flight)
+    items = enumerate(resumes)
+    futures = {}
+    try:
+        while True:
+            for i, resume_data in itertools.islice(items, window - len(futures)):
+                futures[executor.submit(render_pdf, resume_data)] = i
+            if not futures:
+                return
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = futures.pop(future)
+                error = future.exception()
+                if error is None:
+                    yield BatchResult(i, pdf=future.result())
+                else:
+                    yield BatchResult(i, error=_describe(error))
+    finally:
+        for future in futures:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+
+
+def _submit(executor: Executor, resume_data: dict) -> Future:
+    try:
+        return executor.submit(render_pdf, resume_data)
+    except Exception as e:
+        # A broken or shut-down pool fails each remaining resume rather than the whole stream
+        future = Future()
+        future.set_exception(e)
+        return future
+
+
+async def arender_batch(resumes: List[dict], executor: Executor,
+                        max_in_flight: Optional[int] = None) -> AsyncIterator[BatchResult]:
+    """Async `render_batch` for use inside the event loop.
+
+    On a BatchExecutor the batch counts towards its `pending` resumes from the first iteration
+    until each resume finishes or the iteration stops.
+    """
+    window = _window(executor, max_in_flight)
+    counted = isinstance(executor, BatchExecutor)
+    items = enumerate(resumes)
+    remaining = len(resumes)
+    # asyncio wrapper -> (index, pool future); the pool futures are cancelled directly when the
+    # iteration stops, so queued renders never start even before the event loop runs again
+    futures = {}
+
+    if counted:
+        executor.pending += remaining
+    try:
+        while True:
+            for i, resume_data in itertools.islice(items, window - len(futures)):
+                future = _submit(executor, resume_data)
+                futures[asyncio.wrap_future(future)] = (i, future)
+            if not futures:
+                return
+            done, _ = await asyncio.wait(futures, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in done:
+                i, _ = futures.pop(waiter)
+                remaining -= 1
+                if counted:
+                    executor.pending -= 1
+                error = waiter.exception()
+                if error is None:
+                    yield BatchResult(i, pdf=waiter.result())
+                else:
+                    yield BatchResult(i, error=_describe(error))
+    finally:
+        for _, future in futures.values():
+            future.cancel()
+        if counted:
+            executor.pending -= remaining
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable buffer that zipfile streams into; drained after every entry."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+async def stream_zip(results: AsyncIterator[BatchResult]) -> AsyncIterator[bytes]:
+    """ZIP the batch as it completes: resume-<index>.pdf per success, resume-<index>.error.txt per failure."""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        async for result in results:
+            if result.error is None:
+                archive.writestr(f"resume-{result.index}.pdf", result.pdf)
+            else:
+                archive.writestr(f"resume-{result.index}.error.txt", result.error)
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,59 @@
+"""Per-request setup cost of the /chat pipeline, rebuilt every request vs. shared through ResumeAgentFactory.
+
+Run from the repo root: python benchmarks/bench_agent_factory.py [iterations]
+No network access is needed; the Azure client is constructed but never called.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("OPEN_AI_KEY", "bench-key")
+os.environ.setdefault("OPENAI_API_VERSION", "2024-02-01")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://bench.invalid")
+
+from agent import ResumeAgentFactory
+from customstore import CustomChatMessageHistory
+from resume_builder import current_resume
+
+
+def per_request_setup(i):
+    # What read_root used to do before any LLM call
+    factory = ResumeAgentFactory(verbose=False)
+    history = CustomChatMessageHistory(session_id=f"bench-{i}")
+    return factory, history.store.get_resume(history.session_id)
+
+
+def factory_binding(factory, i):
+    history = CustomChatMessageHistory(session_id=f"bench-{i}")
+    token = current_resume.set(history.store.get_resume(history.session_id))
+    current_resume.reset(token)
+    return factory
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        per_request_setup(i)
+    rebuilt = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    factory = ResumeAgentFactory(verbose=False)
+    startup = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(iterations):
+        factory_binding(factory, i)
+    shared = (time.perf_counter() - start) / iterations
+
+    print(f"iterations:                 {iterations}")
+    print(f"rebuilt per request:        {rebuilt * 1000:.3f} ms/request")
+    print(f"factory startup (once):     {startup * 1000:.3f} ms")
+    print(f"factory per request:        {shared * 1000:.3f} ms/request")
+    print(f"speedup:                    {rebuilt / shared:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
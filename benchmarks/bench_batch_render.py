@@ -0,0 +1,37 @@
+"""Batch render throughput against the number of worker processes.
+
+Run from the repo root: python benchmarks/bench_batch_render.py [resumes]
+Needs pdflatex on PATH.
+"""
+import os
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_render import create_batch_executor, render_batch
+from bench_pdf_compile import SAMPLE_RESUME
+
+
+def main(resumes: int):
+    cores = os.cpu_count() or 1
+    levels = sorted({1, 2, 4, cores} - {w for w in (2, 4) if w > cores})
+    batch = [dict(SAMPLE_RESUME, personal_section=dict(SAMPLE_RESUME["personal_section"], name=f"Candidate {i}"))
+             for i in range(resumes)]
+    print(f"{resumes} resumes, {cores} cores")
+    for workers in levels:
+        executor = create_batch_executor(workers)
+        # Start every worker (and its preamble dump) before timing
+        list(executor.map(abs, range(workers)))
+        start = time.perf_counter()
+        failures = sum(1 for result in render_batch(batch, executor) if result.error is not None)
+        elapsed = time.perf_counter() - start
+        executor.shutdown()
+        print(f"  workers {workers:3d}: {elapsed:6.2f} s  {resumes / elapsed:6.2f} PDFs/s  failures {failures}")
+
+
+if __name__ == "__main__":
+    if shutil.which("pdflatex") is None:
+        sys.exit("pdflatex not found on PATH")
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 32)
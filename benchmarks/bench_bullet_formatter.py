@@ -0,0 +1,64 @@
+"""Many concurrent format_responsibilities calls, some repeated: one model call each vs. BulletFormatter.
+
+Run from the repo root: python benchmarks/bench_bullet_formatter.py [calls] [distinct_texts] [latency_seconds]
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bullet_service import FORMAT_RESPONSIBILITIES_PROMPT, BulletFormatter, parse_bullets
+
+
+class Reply:
+    def __init__(self, content):
+        self.content = content
+
+
+class ScriptedModel:
+    """Answers the single and the batched bullet prompt after `latency` seconds, counting calls."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def ainvoke(self, prompt, config=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        numbers = re.findall(r"^\s*(\d+): ", str(prompt), re.MULTILINE)
+        if "numbered texts" in str(prompt):
+            return Reply(json.dumps({n: [f"Delivered item {n}", "Improved throughput by 30%"] for n in numbers}))
+        return Reply("- Delivered item\n\n- Improved throughput by 30%\n")
+
+
+async def main(calls: int, distinct: int, latency: float):
+    texts = [f"Built and maintained service number {i % distinct} for the payments team" for i in range(calls)]
+
+    model = ScriptedModel(latency)
+    start = time.perf_counter()
+
+    async def one_call(text):
+        return parse_bullets((await model.ainvoke(FORMAT_RESPONSIBILITIES_PROMPT.format(text=text))).content)
+
+    await asyncio.gather(*(one_call(t) for t in texts))
+    print(f"{calls} calls over {distinct} distinct texts, {latency * 1000:.0f} ms model latency")
+    print(f"  one call each:   {time.perf_counter() - start:6.2f} s   {model.calls:4d} model calls")
+
+    model = ScriptedModel(latency)
+    formatter = BulletFormatter(model)
+    start = time.perf_counter()
+    await asyncio.gather(*(formatter.aformat(t) for t in texts))
+    print(f"  BulletFormatter: {time.perf_counter() - start:6.2f} s   {model.calls:4d} model calls")
+    await asyncio.gather(*(formatter.aformat(t) for t in texts))
+    print(f"  after a repeat:  {json.dumps(formatter.stats())}")
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+    asyncio.run(main(calls, distinct, latency))
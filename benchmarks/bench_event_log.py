@@ -0,0 +1,59 @@
+"""Bytes written per chat turn as the resume grows: whole resume_data blobs vs. edit events.
+
+Also times rebuilding an old version for a few snapshot intervals.
+
+Run from the repo root: python benchmarks/bench_event_log.py [turns]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from customstore import InMemoryStore, _size_of
+from event_log import append_to_section, set_section
+
+
+def edit(resume, i):
+    resume.apply(append_to_section("experience_section", {
+        "job_title": "Software Engineer", "company": f"Company {i}", "start_date": "2020-01",
+        "end_date": None, "job_type": "Remote",
+        "responsibilities": [f"Built service {i} handling 10k requests per second", "Cut p99 latency by 40%"]
+    }))
+    resume.apply(set_section("skills_section", {
+        "languages": ["Python", "Go"], "frameworks": ["FastAPI"], "developer_tools": ["Docker"], "libraries": []
+    }))
+
+
+def main(turns: int):
+    store = InMemoryStore()
+    blob_bytes = event_bytes = 0
+    for i in range(turns):
+        resume = store.get_resume("bench")
+        edit(resume, i)
+        blob_bytes += _size_of(resume.resume_data)
+        event_bytes += sum(_size_of(e) for e in resume.pending_events)
+        store.append_events("bench", resume.pending_events, expected_version=resume.version)
+
+    print(f"{turns} turns")
+    print(f"  whole resume per turn: {blob_bytes / 1024:9.1f} KiB written  ({blob_bytes / turns:8.0f} B/turn)")
+    print(f"  events per turn:       {event_bytes / 1024:9.1f} KiB written  ({event_bytes / turns:8.0f} B/turn)")
+
+    for snapshot_every in (10, 50, 200):
+        store = InMemoryStore(snapshot_every=snapshot_every)
+        for i in range(turns):
+            resume = store.get_resume("bench")
+            edit(resume, i)
+            store.append_events("bench", resume.pending_events)
+        version = store.get_resume("bench").version
+        start = time.perf_counter()
+        for v in range(0, version + 1, max(1, version // 100)):
+            store.get_resume_at("bench", v)
+        rebuilds = len(range(0, version + 1, max(1, version // 100)))
+        elapsed = (time.perf_counter() - start) / rebuilds
+        print(f"  snapshot every {snapshot_every:3d}: rebuild any version in {elapsed * 1e6:8.1f} us, "
+              f"store {store.stats()['bytes'] / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,88 @@
+"""Micro-benchmark of LaTeXResumeConverter on large synthetic resumes.
+
+Compares the old unconditional str.replace escaper with the current one and times
+whole-document generation into a string and streamed into a file.
+
+Run from the repo root: python benchmarks/bench_latex_converter.py [experiences] [iterations]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.latex_converter import LaTeXResumeConverter
+
+OLD_SPECIAL_CHARS = {
+    '&': '\\&', '%': '\\%', '$': '\\$', '#': '\\#', '_': '\\_',
+    '{': '\\{', '}': '\\}', '~': '\\textasciitilde{}', '^': '\\textasciicircum{}'
+}
+
+
+def old_escape_latex(text):
+    for char, replacement in OLD_SPECIAL_CHARS.items():
+        text = text.replace(char, replacement)
+    return text
+
+
+def synthetic_resume(experiences: int) -> dict:
+    return {
+        "personal_info": {
+            "name": "Jane Doe",
+            "email": "jane_doe@example.com",
+            "phone": "+1 555 0100",
+            "github": "https://github.com/janedoe",
+            "linkedin": "https://linkedin.com/in/janedoe"
+        },
+        "skills": {
+            "Languages": ["Python", "C#", "SQL"],
+            "Frameworks": ["FastAPI", "React", "Django"]
+        },
+        "experience": [{
+            "title": f"Engineer #{i}",
+            "company": f"Acme & Sons {i}",
+            "location": "Remote",
+            "start_date": "2020-01",
+            "end_date": "2021-01",
+            "responsibilities": [
+                f"Improved throughput by {j * 10}% using caching_{j} & batching {{fast path}} ~ ^" for j in range(8)
+            ]
+        } for i in range(experiences)]
+    }
+
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    experiences = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    converter = LaTeXResumeConverter()
+    resume = synthetic_resume(experiences)
+    special = [r for exp in resume["experience"] for r in exp["responsibilities"]]
+    plain = [f"Led a team of {i % 9} engineers building the billing platform" for i in range(len(special))]
+
+    for name, strings in (("plain", plain), ("special-heavy", special)):
+        old = timed(lambda: [old_escape_latex(s) for s in strings], iterations)
+        new = timed(lambda: [converter.escape_latex(s) for s in strings], iterations)
+        print(f"escape {len(strings)} {name} strings: old {old * 1000:7.2f} ms   new {new * 1000:7.2f} ms   ({old / new:.1f}x)")
+
+    to_string = timed(lambda: converter.convert_json_to_latex(resume), iterations)
+    size = len(converter.convert_json_to_latex(resume))
+    print(f"convert_json_to_latex ({size} chars): {to_string * 1000:7.2f} ms")
+
+    with tempfile.TemporaryFile("w") as f:
+        def stream():
+            f.seek(0)
+            converter.write_latex(resume, f)
+        to_file = timed(stream, iterations)
+    print(f"write_latex into a file:             {to_file * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Compiled section templates vs. the hand-written f-string formatter, on the same experience entries.
+
+The templated renderer does more per entry than format_experience: it also escapes the dates
+and job type, and drops bullet markers and blank bullets, so it is still the slower of the two.
+
+Run from the repo root: python benchmarks/bench_latex_templates.py [experiences] [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.latex_converter import LaTeXResumeConverter
+
+
+def experiences(count: int):
+    return [{
+        "job_title": f"Engineer {i}",
+        "company": f"Company {i}",
+        "start_date": "2020-01",
+        "end_date": "2021-06",
+        "job_type": "Remote",
+        "responsibilities": [f"Shipped feature {j} used by {j * 1000} customers" for j in range(6)]
+    } for i in range(count)]
+
+
+def legacy_shape(entries):
+    # format_experience reads title/location rather than job_title/job_type
+    return [dict(e, title=e["job_title"], location=e["job_type"]) for e in entries]
+
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    converter = LaTeXResumeConverter()
+    entries = experiences(count)
+    legacy = legacy_shape(entries)
+
+    templated = timed(lambda: converter.render_experience_section(entries), iterations)
+    hand_written = timed(lambda: "\n".join(converter.format_experience(legacy)), iterations)
+    print(f"{count} experience entries")
+    print(f"  template engine:        {templated * 1000:7.2f} ms")
+    print(f"  hand-written formatter: {hand_written * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
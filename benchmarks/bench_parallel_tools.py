@@ -0,0 +1,50 @@
+"""Bulk-paste turn with many tool calls in one agent step, run one at a time vs. concurrently.
+
+The fake model emits `jobs` AddExperience calls and as many format_responsibilities calls; each
+bullet-formatting call is one more fake LLM round trip of `latency` seconds.
+
+Run from the repo root: python benchmarks/bench_parallel_tools.py [jobs] [latency_seconds]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import ResumeAgentFactory
+from customstore import CustomChatMessageHistory, InMemoryStore
+from fake_llm import FakeChatModel
+from resume_builder import Resume
+
+
+def bulk_paste_calls(jobs: int):
+    calls = []
+    for i in range(jobs):
+        calls.append({"name": "AddExperience", "args": {"company": f"Company {i}", "job_title": "Engineer"}})
+        calls.append({"name": "format_responsibilities", "args": {"text": f"Worked on project {i}"}})
+    return calls
+
+
+async def run_turn(factory: ResumeAgentFactory):
+    resume = Resume()
+    history = CustomChatMessageHistory(session_id="bulk", store=InMemoryStore())
+    start = time.perf_counter()
+    await factory.ainvoke("Here is my whole resume ...", resume, history)
+    return time.perf_counter() - start, [e.company for e in resume.data.experience]
+
+
+async def main(jobs: int, latency: float):
+    model = FakeChatModel(latency=latency, tool_calls=bulk_paste_calls(jobs))
+    expected = [f"Company {i}" for i in range(jobs)]
+    for limit in (1, 4, jobs * 2):
+        factory = ResumeAgentFactory(model=model, verbose=False, max_tool_concurrency=limit)
+        elapsed, companies = await run_turn(factory)
+        status = "in order" if companies == expected else "OUT OF ORDER"
+        print(f"tool concurrency {limit:3d}: {elapsed:6.2f} s   experiences {status}")
+
+
+if __name__ == "__main__":
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    asyncio.run(main(jobs, latency))
@@ -0,0 +1,75 @@
+"""PDF compile throughput of LatexCompileService at different concurrency limits.
+
+Run from the repo root: python benchmarks/bench_pdf_compile.py [requests]
+Needs pdflatex on PATH.
+"""
+import asyncio
+import os
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_service import LatexCompileService
+from tools.latex_converter import LaTeXResumeConverter
+
+SAMPLE_RESUME = {
+    "personal_section": {
+        "name": "Jane Doe",
+        "email": "jane@example.com",
+        "phone": "+1 555 0100",
+        "github": "https://github.com/janedoe",
+        "linkedin": "https://linkedin.com/in/janedoe"
+    },
+    "experience_section": [{
+        "job_title": "Software Engineer",
+        "company": "Acme & Co",
+        "start_date": "2021-01",
+        "end_date": None,
+        "job_type": "Remote",
+        "responsibilities": ["- Built the resume service", "- Cut PDF latency by 40%"]
+    }],
+    "education_section": {
+        "degree": "B.Sc. Computer Science",
+        "institution": "State University",
+        "graduation_date": "2020-05",
+        "location": "Springfield"
+    },
+    "projects_section": [{
+        "title": "Resume Builder",
+        "tech_stack": ["FastAPI", "LangChain"],
+        "features": ["Chat-driven resume editing", "One-click PDF export"],
+        "duration": "3 months"
+    }],
+    "skills_section": {
+        "languages": ["Python", "TypeScript", "SQL"],
+        "frameworks": ["FastAPI", "React"],
+        "developer_tools": ["Git", "Docker"],
+        "libraries": ["pandas"]
+    }
+}
+
+
+async def run_level(latex: str, requests: int, concurrency: int) -> float:
+    service = LatexCompileService(max_concurrency=concurrency, max_pending=requests)
+    start = time.perf_counter()
+    await asyncio.gather(*(service.compile(latex) for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    await service.close()
+    return elapsed
+
+
+async def main(requests: int):
+    latex = LaTeXResumeConverter().convert_json_to_latex(SAMPLE_RESUME)
+    levels = sorted({1, 2, 4, os.cpu_count() or 1})
+    print(f"{requests} concurrent PDF requests")
+    for concurrency in levels:
+        elapsed = await run_level(latex, requests, concurrency)
+        print(f"  concurrency {concurrency:3d}: {elapsed:6.2f} s  {requests / elapsed:6.2f} PDFs/s")
+
+
+if __name__ == "__main__":
+    if shutil.which("pdflatex") is None:
+        sys.exit("pdflatex not found on PATH")
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 16))
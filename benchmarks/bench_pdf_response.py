@@ -0,0 +1,42 @@
+"""Size and serialization time of a PDF response: hex in JSON (old), base64 in JSON, and raw bytes.
+
+Run from the repo root: python benchmarks/bench_pdf_response.py [pdf_path] [iterations]
+"""
+import base64
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def hex_json(pdf: bytes) -> bytes:
+    return json.dumps({"message": "PDF generated successfully", "pdf": pdf.hex()}).encode()
+
+
+def base64_json(pdf: bytes) -> bytes:
+    return json.dumps({"message": "PDF generated successfully", "pdf": base64.b64encode(pdf).decode("ascii")}).encode()
+
+
+def raw(pdf: bytes) -> bytes:
+    return pdf
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "generated_pdfs", "resume.pdf")
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    with open(path, "rb") as f:
+        pdf = f.read()
+
+    print(f"PDF: {len(pdf)} bytes, {iterations} iterations")
+    for name, encode in (("hex JSON (before)", hex_json), ("base64 JSON", base64_json), ("application/pdf", raw)):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            body = encode(pdf)
+        elapsed = (time.perf_counter() - start) / iterations
+        print(f"  {name:18s} {len(body):9d} bytes ({len(body) / len(pdf):.2f}x)  {elapsed * 1e6:8.1f} us/response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Per-render pdflatex latency, cold (full preamble every time) vs. warm (precompiled preamble format).
+
+Run from the repo root: python benchmarks/bench_pdf_warm.py [renders]
+Needs pdflatex and the mylatexformat package.
+"""
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_pdf_compile import SAMPLE_RESUME
+from pdf_service import LatexCompileService
+from tools.latex_converter import LaTeXResumeConverter
+
+
+async def measure(service: LatexCompileService, latex: str, renders: int):
+    start = time.perf_counter()
+    await service.start()
+    startup = time.perf_counter() - start
+    timings = []
+    for _ in range(renders):
+        start = time.perf_counter()
+        await service.compile(latex)
+        timings.append(time.perf_counter() - start)
+    await service.close()
+    return startup, timings
+
+
+async def main(renders: int):
+    converter = LaTeXResumeConverter()
+    latex = converter.convert_json_to_latex(SAMPLE_RESUME)
+    cold = LatexCompileService(max_concurrency=1)
+    warm = LatexCompileService(max_concurrency=1, preamble=converter.generate_preamble())
+
+    for name, service in (("cold", cold), ("warm", warm)):
+        startup, timings = await measure(service, latex, renders)
+        if name == "warm" and not service.warm:
+            print("warm: format dump failed, see the log; is mylatexformat installed?")
+        print(f"{name}: startup {startup * 1000:7.1f} ms   "
+              f"median {statistics.median(timings) * 1000:7.1f} ms   "
+              f"min {min(timings) * 1000:7.1f} ms   max {max(timings) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    if shutil.which("pdflatex") is None:
+        sys.exit("pdflatex not found on PATH")
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10))
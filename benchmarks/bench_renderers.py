@@ -0,0 +1,128 @@
+"""PDF backends side by side: pdflatex (LatexPdfRenderer) vs. in-process weasyprint (HtmlPdfRenderer).
+
+Each backend runs in a fresh interpreter so their memory does not mix. Reported per backend:
+first render (includes weasyprint import / preamble format dump), median and p95 per-render
+latency, CPU seconds per render (pdflatex CPU is counted through RUSAGE_CHILDREN) and peak RSS
+of the Python process and of its largest child. Renders are sequential and never hit a cache.
+
+Run from the repo root: python benchmarks/bench_renderers.py [renders] [--backend latex html]
+A backend whose dependency (pdflatex / weasyprint) is missing is skipped.
+"""
+import argparse
+import asyncio
+import copy
+import importlib.util
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def max_rss_mb(who) -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def cpu_seconds() -> float:
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def create_renderer(backend: str):
+    if backend == "html":
+        from pdf_renderers import HtmlPdfRenderer
+        return HtmlPdfRenderer()
+
+    from pdf_renderers import LatexPdfRenderer
+    from pdf_service import LatexCompileService
+    from tools.latex_converter import LaTeXResumeConverter
+    converter = LaTeXResumeConverter()
+    return LatexPdfRenderer(converter, LatexCompileService(max_concurrency=1, preamble=converter.generate_preamble()))
+
+
+async def measure(backend: str, renders: int) -> dict:
+    from bench_pdf_compile import SAMPLE_RESUME
+
+    renderer = create_renderer(backend)
+    start = time.perf_counter()
+    if backend == "latex":
+        await renderer.compile_service.start()
+    else:
+        renderer.warm()
+    first = await renderer.render(SAMPLE_RESUME)
+    first_ms = (time.perf_counter() - start) * 1000
+
+    cpu_start = cpu_seconds()
+    timings = []
+    for i in range(renders):
+        resume_data = copy.deepcopy(SAMPLE_RESUME)
+        resume_data["personal_section"]["name"] = f"Jane Doe {i}"
+        start = time.perf_counter()
+        await renderer.render(resume_data)
+        timings.append(time.perf_counter() - start)
+    cpu = cpu_seconds() - cpu_start
+    await renderer.close()
+
+    timings.sort()
+    return {
+        "backend": backend,
+        "renders": renders,
+        "first_render_ms": first_ms,
+        "median_ms": statistics.median(timings) * 1000,
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        "cpu_ms_per_render": cpu / renders * 1000,
+        "peak_rss_mb": max_rss_mb(resource.RUSAGE_SELF),
+        "peak_child_rss_mb": max_rss_mb(resource.RUSAGE_CHILDREN),
+        "pdf_bytes": len(first),
+    }
+
+
+def missing_dependency(backend: str):
+    if backend == "latex" and shutil.which("pdflatex") is None:
+        return "pdflatex is not on PATH"
+    if backend == "html" and importlib.util.find_spec("weasyprint") is None:
+        return "weasyprint is not installed"
+    return None
+
+
+def main(args):
+    for backend in args.backend:
+        reason = missing_dependency(backend)
+        if reason:
+            print(f"{backend:5s} skipped: {reason}")
+            continue
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), str(args.renders), "--child", backend],
+            capture_output=True, text=True
+        )
+        if output.returncode != 0:
+            print(f"{backend:5s} failed:\n{output.stderr[-2000:]}")
+            continue
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        print(f"{backend:5s} first {result['first_render_ms']:8.1f} ms   "
+              f"median {result['median_ms']:7.1f} ms   p95 {result['p95_ms']:7.1f} ms   "
+              f"CPU {result['cpu_ms_per_render']:7.1f} ms/render   "
+              f"peak RSS {result['peak_rss_mb']:6.1f} MiB (child {result['peak_child_rss_mb']:6.1f} MiB)   "
+              f"{result['pdf_bytes']} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("renders", type=int, nargs="?", default=20)
+    parser.add_argument("--backend", nargs="+", choices=["latex", "html"], default=["latex", "html"])
+    parser.add_argument("--child", choices=["latex", "html"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(asyncio.run(measure(args.child, args.renders))))
+    else:
+        main(args)
@@ -0,0 +1,95 @@
+"""Plain resume_data dicts vs. the typed ResumeData model: serialize, deserialize, copy, hash and memory.
+
+"copy" is what the store does on every get_resume (deepcopy of the dict before, ResumeData.copy
+now). ResumeData keeps each section's JSON until the section is edited, so "serialize" and
+"hash" (resume_content_hash on the dict vs. ResumeData.fingerprint) are measured on a resume read
+from the store and edited once, the way a /chat turn uses them; "diff" is the per-section
+fingerprints a /chat turn with diff=true takes before and after its edit. "deserialize" has
+nothing cached and is slower for the model. Memory is measured with tracemalloc over `sessions`
+resumes kept alive at once.
+
+Run from the repo root: python benchmarks/bench_resume_model.py [iterations] [sessions]
+"""
+import copy
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_pdf_compile import SAMPLE_RESUME
+from render_cache import diff_sections, resume_content_hash, section_fingerprints
+from resume_model import Experience, ResumeData
+
+
+def sample_resume() -> dict:
+    resume_data = ResumeData.from_dict(SAMPLE_RESUME).to_dict()
+    # A few more jobs and projects, closer to a finished resume
+    resume_data["experience_section"] = resume_data["experience_section"] * 4
+    resume_data["projects_section"] = resume_data["projects_section"] * 3
+    return resume_data
+
+
+def per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def memory_per_session(build, sessions: int) -> float:
+    tracemalloc.start()
+    kept = [build(i) for i in range(sessions)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current / sessions
+
+
+def main(iterations: int, sessions: int):
+    resume_dict = sample_resume()
+    resume_model = ResumeData.from_dict(resume_dict)
+    resume_model.to_json()  # as stored: every section serialized once already
+    raw = json.dumps(resume_dict, separators=(",", ":"))
+    job = Experience.from_dict(resume_dict["experience_section"][0])
+
+    def edited_dict() -> dict:
+        resume_data = copy.deepcopy(resume_dict)
+        resume_data["experience_section"].append(job.to_dict())
+        return resume_data
+
+    def edited_model() -> ResumeData:
+        resume_data = resume_model.copy()
+        resume_data.append_to_section("experience_section", job)
+        return resume_data
+
+    def diff_dict():
+        before = section_fingerprints(resume_dict)
+        after = edited_dict()
+        return diff_sections(before, after)
+
+    def diff_model():
+        before = resume_model.section_fingerprints()
+        after = edited_model()
+        return diff_sections(before, after.to_dict(), after.section_fingerprints())
+
+    rows = [
+        ("serialize", lambda: json.dumps(edited_dict(), separators=(",", ":")), lambda: edited_model().to_json()),
+        ("deserialize", lambda: json.loads(raw), lambda: ResumeData.from_json(raw)),
+        ("copy", lambda: copy.deepcopy(resume_dict), resume_model.copy),
+        ("hash", lambda: resume_content_hash(edited_dict(), "bench"), lambda: edited_model().fingerprint()),
+        ("diff", diff_dict, diff_model),
+    ]
+    print(f"{'':12s} {'dict':>10s} {'ResumeData':>12s}")
+    for name, with_dict, with_model in rows:
+        print(f"{name:12s} {per_call_us(with_dict, iterations):8.1f} us {per_call_us(with_model, iterations):10.1f} us")
+
+    dict_bytes = memory_per_session(lambda i: json.loads(raw), sessions)
+    model_bytes = memory_per_session(lambda i: ResumeData.from_json(raw), sessions)
+    print(f"{'memory':12s} {dict_bytes / 1024:7.1f} KiB {model_bytes / 1024:9.1f} KiB   per session ({sessions} sessions)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000, int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
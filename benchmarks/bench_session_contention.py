@@ -0,0 +1,77 @@
+"""Overlapping chat turns on the same sessions: lost updates and wall time per concurrency strategy.
+
+Each simulated turn reads the resume, waits `latency` seconds as the agent would, adds one
+experience entry and writes the resume back. Every strategy runs `turns` overlapping turns on
+each of `sessions` sessions.
+
+Run from the repo root: python benchmarks/bench_session_contention.py [sessions] [turns] [latency_seconds]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from customstore import InMemoryStore, VersionConflict
+from resume_model import Experience
+
+
+async def turn(store, session_id, i, latency):
+    resume = store.get_resume(session_id)
+    await asyncio.sleep(latency)
+    resume.data.experience.append(Experience(company=f"Company {i}"))
+    store.update_resume(session_id, resume.resume_data, expected_version=resume.version)
+
+
+async def unguarded(store, session_id, i, latency):
+    resume = store.get_resume(session_id)
+    await asyncio.sleep(latency)
+    resume.data.experience.append(Experience(company=f"Company {i}"))
+    store.update_resume(session_id, resume.resume_data)
+
+
+async def run(name, sessions, turns, latency, make_turn):
+    store = InMemoryStore()
+    conflicts = 0
+
+    async def guarded(session_id, i):
+        nonlocal conflicts
+        while True:
+            try:
+                return await make_turn(store, session_id, i, latency)
+            except VersionConflict:
+                conflicts += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(guarded(f"s{s}", i) for s in range(sessions) for i in range(turns)))
+    elapsed = time.perf_counter() - start
+    kept = sum(len(store.get_resume(f"s{s}").data.experience) for s in range(sessions))
+    lost = sessions * turns - kept
+    print(f"  {name:22s} {elapsed:6.2f} s   lost updates {lost:4d}   retried conflicts {conflicts:4d}")
+
+
+async def main(sessions, turns, latency):
+    print(f"{sessions} sessions x {turns} overlapping turns, {latency * 1000:.0f} ms per turn")
+    await run("no control", sessions, turns, latency, unguarded)
+
+    global_lock = asyncio.Lock()
+
+    async def globally_locked(store, session_id, i, latency):
+        async with global_lock:
+            await turn(store, session_id, i, latency)
+
+    async def session_locked(store, session_id, i, latency):
+        async with store.lock(session_id):
+            await turn(store, session_id, i, latency)
+
+    await run("one global lock", sessions, turns, latency, globally_locked)
+    await run("per-session lock", sessions, turns, latency, session_locked)
+    await run("versions, retry", sessions, turns, latency, turn)
+
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    turns = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+    asyncio.run(main(sessions, turns, latency))
@@ -0,0 +1,76 @@
+"""Session export/import throughput in sessions per second, batched vs. one session at a time.
+
+"per session" seeds each session the way driving /chat would: one add_messages and one
+append_events call per turn. "import" writes the same sessions from exported records with
+import_sessions at several batch sizes; "export" streams them back out. With REDIS_URI set and
+--redis, the same runs go against RedisStore, where batching saves a network round trip per
+session (use a throwaway database: the sessions are written under a bench: prefix).
+
+Run from the repo root: python benchmarks/bench_sessions_bulk.py [sessions] [turns] [--redis]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from customstore import InMemoryStore, RedisStore
+from event_log import append_to_section, set_section
+
+
+def turn_events(turn: int):
+    return [
+        append_to_section("experience_section", {
+            "job_title": "Software Engineer", "company": f"Company {turn}", "start_date": "2020-01",
+            "end_date": None, "job_type": "Remote", "responsibilities": ["Built things", "Cut latency by 40%"]
+        }),
+        set_section("skills_section", {"languages": ["Python"], "frameworks": [], "developer_tools": [], "libraries": []})
+    ]
+
+
+def turn_messages(turn: int):
+    return [{"type": "human", "data": {"content": f"Turn {turn}: I worked at Company {turn}"}},
+            {"type": "ai", "data": {"content": "Added it. Anything else?"}}]
+
+
+def make_store(redis: bool):
+    if redis:
+        return RedisStore(prefix=f"bench:{time.time_ns()}:")
+    return InMemoryStore()
+
+
+def report(name: str, sessions: int, elapsed: float):
+    print(f"  {name:28s} {elapsed:7.3f} s   {sessions / elapsed:10.0f} sessions/s")
+
+
+def main(args):
+    store = make_store(args.redis)
+    start = time.perf_counter()
+    for i in range(args.sessions):
+        for turn in range(args.turns):
+            store.add_messages(f"s{i}", turn_messages(turn))
+            store.append_events(f"s{i}", turn_events(turn))
+    report("per session (like /chat)", args.sessions, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    records = [record for batch in store.export_sessions(100) for record in batch]
+    report("export, batch 100", len(records), time.perf_counter() - start)
+    # Through JSON, as the NDJSON endpoints would
+    lines = [json.dumps(record) for record in records]
+
+    for batch_size in (1, 10, 100, 1000):
+        target = make_store(args.redis)
+        start = time.perf_counter()
+        for i in range(0, len(lines), batch_size):
+            target.import_sessions([json.loads(line) for line in lines[i:i + batch_size]])
+        report(f"import, batch {batch_size}", len(lines), time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("sessions", type=int, nargs="?", default=2000)
+    parser.add_argument("turns", type=int, nargs="?", default=5)
+    parser.add_argument("--redis", action="store_true", help="run against RedisStore at REDIS_URI")
+    main(parser.parse_args())
@@ -0,0 +1,102 @@
+"""Cold start: `python -X importtime` breakdown of `import main`, then time to first response and to warm.
+
+Each measurement runs in a fresh interpreter. "first response" is the first /ready answer after
+the lifespan starts (the server is accepting requests); "warm" is when /ready first returns 200.
+
+Run from the repo root: python benchmarks/bench_startup.py [--top 15] [--max-import-ms N] [--json FILE]
+With --max-import-ms the script exits non-zero when `import main` is slower, so CI catches
+import-time regressions.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENV = dict(os.environ)
+for key in ("OPEN_AI_KEY", "OPENAI_API_VERSION", "LANGCHAIN_API_KEY", "LANGCHAIN_PROJECT", "REDIS_URI"):
+    ENV.setdefault(key, "bench")
+ENV.setdefault("AZURE_OPENAI_ENDPOINT", "https://bench.invalid")
+ENV.setdefault("SESSION_STORE", "memory")
+ENV["LANGCHAIN_TRACING_V2"] = "false"
+
+CHILD = r"""
+import asyncio, json, time
+import httpx
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def run():
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.get("/ready")
+            first_response = time.perf_counter()
+            while True:
+                response = await client.get("/ready")
+                if response.status_code == 200 or response.json()["status"] == "failed":
+                    return first_response, time.perf_counter(), response.json()
+                await asyncio.sleep(0.01)
+
+first_response, warm, status = asyncio.run(run())
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_response_ms": (first_response - start) * 1000,
+    "warm_ms": (warm - start) * 1000,
+    "ready": status,
+}))
+"""
+
+
+def import_breakdown(top: int):
+    """Top-level imports of `import main` by cumulative time, from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=ENV, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, raw_name = line[len("import time:"):].split("|", 2)
+        # One space before a top-level module, two more per nesting level
+        if raw_name[1:].startswith(" "):
+            continue
+        name = raw_name.strip()
+        modules.append((int(cumulative_us), name))
+    modules.sort(reverse=True)
+    return modules[:top], sum(us for us, _ in modules)
+
+
+def main(args):
+    modules, total_us = import_breakdown(args.top)
+    print(f"import main: {total_us / 1000:8.1f} ms across top-level imports (-X importtime)")
+    for cumulative_us, name in modules:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    child = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=ROOT, env=ENV, capture_output=True, text=True, check=True
+    )
+    timings = json.loads(child.stdout.strip().splitlines()[-1])
+    print(f"import main:            {timings['import_ms']:8.1f} ms")
+    print(f"first response (/ready): {timings['first_response_ms']:7.1f} ms")
+    print(f"warm (/ready 200):      {timings['warm_ms']:8.1f} ms   {timings['ready']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            imports = [{"module": name, "cumulative_ms": us / 1000} for us, name in modules]
+            json.dump({"imports": imports, **timings}, f, indent=2)
+    if args.max_import_ms is not None and timings["import_ms"] > args.max_import_ms:
+        print(f"FAIL: import main took {timings['import_ms']:.1f} ms, budget {args.max_import_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--top", type=int, default=15, help="how many top-level imports to list")
+    parser.add_argument("--max-import-ms", type=float, help="fail when import main is slower than this")
+    parser.add_argument("--json", help="also write the results to this file")
+    main(parser.parse_args())
@@ -0,0 +1,78 @@
+"""Time to first byte of /chat/stream vs. time to the full /chat response, against a fake streaming LLM.
+
+Run from the repo root: python benchmarks/bench_stream_ttfb.py [latency_seconds] [token_latency_seconds]
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# main.py copies these into os.environ at import time
+for key in ("OPEN_AI_KEY", "OPENAI_API_VERSION", "LANGCHAIN_API_KEY", "LANGCHAIN_PROJECT", "REDIS_URI"):
+    os.environ.setdefault(key, "bench")
+os.environ.setdefault("SESSION_STORE", "memory")
+
+from agent import ResumeAgentFactory
+from fake_llm import FakeChatModel
+from main import app
+
+# Keep the benchmark offline
+os.environ["LANGCHAIN_TRACING_V2"] = "false"
+
+
+async def post(path: str, body: dict):
+    """Drive the ASGI app directly so body chunks are timed as they are sent (httpx buffers them)."""
+    payload = json.dumps(body).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"content-type", b"application/json")],
+        "client": ("bench", 0), "server": ("bench", 80),
+    }
+    sent = False
+    first_byte = None
+    chunks = []
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal first_byte
+        if message["type"] == "http.response.body" and message.get("body"):
+            if first_byte is None:
+                first_byte = time.perf_counter()
+            chunks.append(message["body"])
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return first_byte - start, time.perf_counter() - start, b"".join(chunks)
+
+
+async def run(latency: float, token_latency: float):
+    model = FakeChatModel(
+        latency=latency,
+        token_latency=token_latency,
+        tool_calls=[{"name": "AddSkills", "args": {"languages": ["Python"]}}],
+        reply="Thanks! I added Python to your skills. Which frameworks and developer tools do you use day to day?"
+    )
+    app.state.agent_factory = ResumeAgentFactory(model=model, verbose=False)
+
+    ttfb, total, _ = await post("/chat", {"query": "I know Python", "session_id": "ttfb-chat"})
+    print(f"/chat         first byte {ttfb * 1000:8.1f} ms   complete {total * 1000:8.1f} ms")
+
+    ttfb, total, body = await post("/chat/stream", {"query": "I know Python", "session_id": "ttfb-stream"})
+    events = body.decode().count("event: ")
+    print(f"/chat/stream  first byte {ttfb * 1000:8.1f} ms   complete {total * 1000:8.1f} ms   ({events} events)")
+
+
+if __name__ == "__main__":
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+    token_latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.02
+    asyncio.run(run(latency, token_latency))
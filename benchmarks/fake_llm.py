@@ -0,0 +1,106 @@
+"""Offline stand-in for AzureChatOpenAI used by the benchmarks."""
+import asyncio
+import json
+import re
+import time
+from typing import Any, AsyncIterator, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# One user turn per resume tool, as a user filling in their resume would go
+RESUME_SCRIPT = [
+    [{"name": "AddPersonalInformation", "args": {
+        "name": "Jane Doe", "email": "jane@example.com", "phone": "+1 555 0100",
+        "github": "https://github.com/janedoe", "linkedin": "https://linkedin.com/in/janedoe"}}],
+    [{"name": "format_responsibilities", "args": {"text": "Built the payments API and cut its latency"}},
+     {"name": "AddExperience", "args": {
+         "company": "Acme & Co", "job_title": "Software Engineer", "start_date": "2021-01", "job_type": "Remote",
+         "responsibilities": ["Built the payments API", "Cut p99 latency by 40%"]}}],
+    [{"name": "AddEducation", "args": {
+        "institution": "State University", "degree": "B.Sc. Computer Science",
+        "graduation_date": "2020-05", "location": "Springfield"}}],
+    [{"name": "AddSkills", "args": {
+        "languages": ["Python", "SQL"], "frameworks": ["FastAPI"], "developer_tools": ["Docker"]}}],
+    [{"name": "AddProjects", "args": {
+        "title": "Resume Builder", "tech_stack": ["FastAPI", "LangChain"],
+        "features": ["Chat-driven editing", "PDF export"], "duration": "3 months"}}],
+]
+
+
+class FakeChatModel(BaseChatModel):
+    """Replies after `latency` seconds; emits `tool_calls` on a user turn and plain text once tools have run.
+
+    With a `script`, the Nth user turn of a conversation emits `script[N % len(script)]` instead, so
+    a session walks through the resume tools deterministically. Single-message prompts (bullet
+    formatting, history summaries) get canned answers in the format their callers parse.
+
+    When streamed, the text reply is sent word by word with `token_latency` between words.
+    """
+    latency: float = 0.0
+    token_latency: float = 0.0
+    tool_calls: List[dict] = []
+    script: List[List[dict]] = []
+    reply: str = "Got it, what else should go on your resume?"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _utility_reply(self, prompt: str) -> str:
+        if "numbered texts" in prompt:
+            numbers = re.findall(r"^\s*(\d+): ", prompt, re.MULTILINE)
+            return json.dumps({n: ["Developed a scripted feature", "Improved latency by 30%"] for n in numbers})
+        if "Text to transform" in prompt:
+            return "- Developed a scripted feature\n- Improved latency by 30%\n"
+        return "The user is building a software engineering resume."
+
+    def _tool_calls_for(self, messages: List[BaseMessage]) -> List[dict]:
+        if not self.script:
+            return self.tool_calls
+        turn = sum(isinstance(m, HumanMessage) for m in messages) - 1
+        return self.script[turn % len(self.script)]
+
+    def _respond(self, messages: List[BaseMessage]) -> ChatResult:
+        tool_calls = self._tool_calls_for(messages)
+        if len(messages) == 1:
+            message = AIMessage(content=self._utility_reply(str(messages[0].content)))
+        elif tool_calls and not isinstance(messages[-1], ToolMessage):
+            message = AIMessage(content="", tool_calls=[
+                {"name": call["name"], "args": call["args"], "id": f"call_{i}"}
+                for i, call in enumerate(tool_calls)
+            ])
+        else:
+            message = AIMessage(content=self.reply)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return self._respond(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._respond(messages)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        message = self._respond(messages).generations[0].message
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                for i, call in enumerate(message.tool_calls)
+            ]))
+            return
+        for word in re.findall(r"\S+\s*", message.content):
+            await asyncio.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word))
+            if run_manager:
+                await run_manager.on_llm_new_token(word, chunk=chunk)
+            yield chunk
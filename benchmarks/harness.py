@@ -0,0 +1,177 @@
+"""Offline benchmark suite: the FastAPI app, lifespan included, against a scripted fake LLM.
+
+Scenarios:
+  sessions  many sessions chatting at once, each walking through the five resume tools
+  long      one session holding a long conversation (shows cost growing with history)
+  pdf       concurrent /pdf renders of distinct resumes (skipped without pdflatex)
+
+Each prints p50/p95/p99 latency, requests per second and peak RSS; --json writes the same
+numbers to a file so CI can compare runs without network access.
+
+Run from the repo root: python benchmarks/harness.py [--scenario sessions long pdf] [--latency 0.05] [--json out.json]
+"""
+import argparse
+import asyncio
+import copy
+import json
+import math
+import os
+import resource
+import shutil
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# main.py copies these into os.environ at import time; the Azure client is built but never called
+for key in ("OPEN_AI_KEY", "OPENAI_API_VERSION", "LANGCHAIN_API_KEY", "LANGCHAIN_PROJECT", "REDIS_URI"):
+    os.environ.setdefault(key, "bench")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://bench.invalid")
+os.environ.setdefault("SESSION_STORE", "memory")
+os.environ.setdefault("HISTORY_SUMMARY", "false")
+# Queue every PDF request instead of answering 429 once the compile slots are busy
+os.environ.setdefault("PDF_MAX_PENDING", "100000")
+
+import httpx
+
+from agent import ResumeAgentFactory
+from bench_pdf_compile import SAMPLE_RESUME
+from fake_llm import RESUME_SCRIPT, FakeChatModel
+from main import app
+
+# Keep the benchmark offline
+os.environ["LANGCHAIN_TRACING_V2"] = "false"
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(name: str, latencies: List[float], elapsed: float, failures: int, **extra) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "failures": failures,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        **extra,
+    }
+
+
+def print_summary(result: dict):
+    print(f"{result['scenario']:9s} {result['requests']:6d} req  {result['failures']:4d} failed  "
+          f"p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  p99 {result['p99_ms']:8.1f} ms  "
+          f"{result['rps']:8.1f} req/s  peak RSS {result['peak_rss_mb']:7.1f} MiB")
+    for key, value in result.items():
+        if key not in ("scenario", "requests", "failures", "p50_ms", "p95_ms", "p99_ms", "rps", "peak_rss_mb"):
+            print(f"{'':9s} {key}: {value}")
+
+
+async def timed_post(client: httpx.AsyncClient, path: str, body: dict, latencies: List[float]) -> bool:
+    start = time.perf_counter()
+    response = await client.post(path, json=body)
+    latencies.append(time.perf_counter() - start)
+    return response.status_code == 200
+
+
+async def scenario_sessions(client, sessions: int, turns: int) -> dict:
+    latencies, failures = [], 0
+
+    async def session(i):
+        nonlocal failures
+        for turn in range(turns):
+            body = {"query": f"Turn {turn} of my resume", "session_id": f"bench-sessions-{i}"}
+            if not await timed_post(client, "/chat", body, latencies):
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    return summarize("sessions", latencies, time.perf_counter() - start, failures,
+                     sessions=sessions, turns_per_session=turns)
+
+
+async def scenario_long(client, turns: int) -> dict:
+    latencies, failures = [], 0
+    start = time.perf_counter()
+    for turn in range(turns):
+        body = {"query": f"Turn {turn}: here is more about my experience", "session_id": "bench-long"}
+        if not await timed_post(client, "/chat", body, latencies):
+            failures += 1
+    elapsed = time.perf_counter() - start
+    window = max(1, min(10, turns // 2))
+    first = sum(latencies[:window]) / window * 1000
+    last = sum(latencies[-window:]) / window * 1000
+    return summarize("long", latencies, elapsed, failures,
+                     turns=turns, first_turns_mean_ms=round(first, 1), last_turns_mean_ms=round(last, 1))
+
+
+async def scenario_pdf(client, requests: int) -> dict:
+    latencies, failures = [], 0
+
+    async def render(i):
+        nonlocal failures
+        resume_data = copy.deepcopy(SAMPLE_RESUME)
+        # Distinct content so every request misses the render cache
+        resume_data["personal_section"]["name"] = f"Jane Doe {i}"
+        if not await timed_post(client, "/pdf", {"resume_data": resume_data}, latencies):
+            failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(render(i) for i in range(requests)))
+    return summarize("pdf", latencies, time.perf_counter() - start, failures)
+
+
+async def main(args):
+    results = []
+    async with app.router.lifespan_context(app):
+        # Let the warm-up build its factory first so it cannot replace the fake one afterwards
+        await app.state.warmup
+        model = FakeChatModel(latency=args.latency, token_latency=args.token_latency, script=RESUME_SCRIPT)
+        app.state.agent_factory = ResumeAgentFactory(model=model, verbose=False)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for scenario in args.scenario:
+                if scenario == "sessions":
+                    result = await scenario_sessions(client, args.sessions, args.turns)
+                elif scenario == "long":
+                    result = await scenario_long(client, args.long_turns)
+                elif not shutil.which("pdflatex"):
+                    print("pdf       skipped: pdflatex is not on PATH")
+                    continue
+                else:
+                    result = await scenario_pdf(client, args.pdf_requests)
+                print_summary(result)
+                results.append(result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"latency": args.latency, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--scenario", nargs="+", choices=["sessions", "long", "pdf"],
+                        default=["sessions", "long", "pdf"])
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LLM latency per call, seconds")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="fake LLM delay between streamed words")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=5, help="turns per session in the sessions scenario")
+    parser.add_argument("--long-turns", type=int, default=100)
+    parser.add_argument("--pdf-requests", type=int, default=20)
+    parser.add_argument("--json", help="also write the results to this file")
+    asyncio.run(main(parser.parse_args()))
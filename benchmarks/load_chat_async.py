@@ -0,0 +1,54 @@
+"""Concurrent /chat sessions against a fake LLM: total time should stay near one round trip, not N of them.
+
+Run from the repo root: python benchmarks/load_chat_async.py [sessions] [latency_seconds]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# main.py copies these into os.environ at import time
+for key in ("OPEN_AI_KEY", "OPENAI_API_VERSION", "LANGCHAIN_API_KEY", "LANGCHAIN_PROJECT", "REDIS_URI"):
+    os.environ.setdefault(key, "bench")
+os.environ.setdefault("SESSION_STORE", "memory")
+
+import httpx
+
+from agent import ResumeAgentFactory
+from fake_llm import FakeChatModel
+from main import app
+
+# Keep the benchmark offline
+os.environ["LANGCHAIN_TRACING_V2"] = "false"
+
+
+async def run(sessions: int, latency: float):
+    model = FakeChatModel(latency=latency, tool_calls=[
+        {"name": "AddSkills", "args": {"languages": ["Python"], "frameworks": ["FastAPI"]}},
+    ])
+    app.state.agent_factory = ResumeAgentFactory(model=model, verbose=False)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i):
+            response = await client.post("/chat", json={"query": "I know Python", "session_id": f"load-{i}"})
+            response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(sessions)))
+        elapsed = time.perf_counter() - start
+
+    # Two LLM round trips per turn: the tool call and the final answer
+    serial = sessions * 2 * latency
+    print(f"sessions:             {sessions}")
+    print(f"fake LLM latency:     {latency * 1000:.0f} ms x 2 calls per turn")
+    print(f"wall time:            {elapsed:.3f} s")
+    print(f"if run one at a time: {serial:.3f} s")
+    print(f"effective overlap:    {serial / elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    asyncio.run(run(sessions, latency))
@@ -0,0 +1,335 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from langchain_core.prompts import PromptTemplate
+from langchain_core.language_models import BaseChatModel
+
+logger = logging.getLogger(__name__)
+
+# Part of every cache key; bump when the prompts change so old bullets are not served
+PROMPT_VERSION = "1"
+
+BULLET_RULES = """
+                Transform {what} into **at least 5 strong, impactful bullet points** based on these rules:
+                - **Start with powerful action verbs** (e.g., "Developed", "Optimized", "Implemented").
+                - **Include measurable impact** (e.g., "Increased efficiency by 30%").
+                - **Focus on achievements rather than generic tasks**.
+                - **Use present tense for current roles, past tense for previous roles**.
+                - **Keep each bullet concise (10-15 words max)**.
+"""
+
+FORMAT_RESPONSIBILITIES_PROMPT = PromptTemplate.from_template(
+    BULLET_RULES.replace("{what}", "the following text") + """
+                Text to transform:
+                {text}
+
+                **Return only the bullet points, one per line, starting with '- '**
+                """)
+
+FORMAT_RESPONSIBILITIES_BATCH_PROMPT = PromptTemplate.from_template(
+    BULLET_RULES.replace("{what}", "each of the numbered texts below") + """
+                Texts to transform:
+                {texts}
+
+                **Return only a JSON object mapping each text number to its list of bullet points**,
+                e.g. {{"1": ["Developed ...", "Optimized ..."], "2": ["Implemented ..."]}}
+                """)
+
+_WHITESPACE = re.compile(r"\s+")
+_BULLET_MARKER = re.compile(r"^(?:[-*•]|\d+[.)])\s+")
+_BATCH_HEADING = re.compile(r"^\s*(?:#+\s*)?(?:text\s*)?(\d+)\s*[:.)]?\s*$", re.IGNORECASE | re.MULTILINE)
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def text_key(text: str) -> str:
+    """Cache key of a responsibilities text; texts differing only in whitespace share it."""
+    return hashlib.sha256(f"{PROMPT_VERSION}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def parse_bullets(content) -> List[str]:
+    """Bullet lines of a model reply, without blank lines or list markers."""
+    if isinstance(content, list):
+        lines = [str(line) for line in content]
+    else:
+        lines = str(content).split("\n")
+    bullets = []
+    for line in lines:
+        line = _BULLET_MARKER.sub("", line.strip()).strip()
+        if line:
+            bullets.append(line)
+    return bullets
+
+
+def parse_batch(content: str, count: int) -> Dict[int, List[str]]:
+    """Bullets per text (0-based) of a batched reply; texts the reply does not cover are left out.
+
+    Accepts the requested JSON object, with or without a code fence, a JSON array of lists, or
+    failing that plain "1:" / "### 1" headings followed by bullet lines.
+    """
+    results = {}
+    start, end = content.find("{"), content.rfind("}")
+    if content.find("[") != -1 and (start == -1 or content.find("[") < start):
+        start, end = content.find("["), content.rfind("]")
+    if start != -1 and end > start:
+        try:
+            parsed = json.loads(content[start:end + 1])
+        except ValueError:
+            parsed = None
+        if isinstance(parsed, list):
+            parsed = {str(i + 1): value for i, value in enumerate(parsed)}
+        if isinstance(parsed, dict):
+            for number, value in parsed.items():
+                if str(number).strip().isdigit() and 0 < int(number) <= count:
+                    bullets = parse_bullets(value)
+                    if bullets:
+                        results[int(number) - 1] = bullets
+            if results:
+                return results
+
+    headings = list(_BATCH_HEADING.finditer(content))
+    for i, heading in enumerate(headings):
+        number = int(heading.group(1))
+        body_end = headings[i + 1].start() if i + 1 < len(headings) else len(content)
+        bullets = parse_bullets(content[heading.end():body_end])
+        if 0 < number <= count and bullets:
+            results[number - 1] = bullets
+    return results
+
+
+class BulletFormatter:
+    """Turns responsibility texts into resume bullets with as few LLM calls as possible.
+
+    Results are cached by normalized text hash in a bounded LRU and, when a Redis client is
+    given, in Redis so every worker shares them. Concurrent requests for the same text wait on
+    one in-flight call, and texts arriving within `batch_window` seconds of each other (up to
+    `max_batch`) go to the model together in a single prompt.
+
+    A batch mixes texts of different requests, so it runs in a context of its own rather than
+    the one of the request that happened to start it: the model call gets only `callbacks`, never
+    a request's run tree, and each waiter receives only its own bullets. On the async path Redis
+    is read and written once per batch, in a worker thread.
+    """
+
+    def __init__(self, model: BaseChatModel, max_entries: int = 1024, redis_client=None,
+                 ttl: Optional[int] = 7 * 24 * 60 * 60, batch_window: float = 0.02, max_batch: int = 8,
+                 callbacks: Optional[list] = None):
+        self.model = model
+        self.callbacks = list(callbacks or [])
+        self.max_entries = max_entries
+        self.redis = redis_client
+        self.ttl = ttl
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self._pending = []
+        self._flush_handle = None
+        self._tasks = set()
+        self._requests = 0
+        self._hits = 0
+        self._shared_hits = 0
+        self._coalesced = 0
+        self._llm_calls = 0
+        self._llm_texts = 0
+        self._saved_tokens = 0
+
+    def _lookup(self, key: str) -> Optional[List[str]]:
+        bullets = self._cache.get(key)
+        if bullets is not None:
+            self._cache.move_to_end(key)
+        return bullets
+
+    def _remember(self, key: str, bullets: List[str]):
+        self._cache[key] = bullets
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _shared_get(self, keys: List[str]) -> List[Optional[List[str]]]:
+        """Bullets cached in Redis for each key, None where there are none; blocking."""
+        if self.redis is None:
+            return [None] * len(keys)
+        try:
+            raw = self.redis.mget([f"bullets:{key}" for key in keys])
+        except Exception as e:
+            logger.warning("Shared bullet cache lookup failed: %s", e)
+            return [None] * len(keys)
+        return [json.loads(value) if value else None for value in raw]
+
+    def _shared_set(self, items: List[tuple]):
+        """Write (key, bullets) pairs to Redis in one pipeline; blocking."""
+        if self.redis is None or not items:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, bullets in items:
+                pipe.set(f"bullets:{key}", json.dumps(bullets), ex=self.ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Shared bullet cache write failed: %s", e)
+
+    def _shared_hit(self, key: str, text: str, bullets: List[str]):
+        self._remember(key, bullets)
+        self._hits += 1
+        self._shared_hits += 1
+        self._count_saved(text, bullets)
+
+    def _count_saved(self, text: str, bullets: List[str]):
+        # A reused result spares the whole prompt and the reply
+        self._saved_tokens += _estimate_tokens(FORMAT_RESPONSIBILITIES_PROMPT.template) \
+            + _estimate_tokens(text) + _estimate_tokens("\n".join(bullets))
+
+    def format(self, text: str) -> List[str]:
+        """Synchronous formatting: cached, but one model call per uncached text."""
+        self._requests += 1
+        key = text_key(text)
+        bullets = self._lookup(key)
+        if bullets is not None:
+            self._hits += 1
+            self._count_saved(text, bullets)
+            return list(bullets)
+        bullets = self._shared_get([key])[0]
+        if bullets is not None:
+            self._shared_hit(key, text, bullets)
+            return list(bullets)
+        self._llm_calls += 1
+        self._llm_texts += 1
+        result = self.model.invoke(FORMAT_RESPONSIBILITIES_PROMPT.format(text=text))
+        bullets = parse_bullets(result.content)
+        self._remember(key, bullets)
+        self._shared_set([(key, bullets)])
+        return list(bullets)
+
+    async def aformat(self, text: str) -> List[str]:
+        self._requests += 1
+        key = text_key(text)
+        bullets = self._lookup(key)
+        if bullets is not None:
+            self._hits += 1
+            self._count_saved(text, bullets)
+            return list(bullets)
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self._coalesced += 1
+            bullets = await asyncio.shield(future)
+            self._count_saved(text, bullets)
+            return list(bullets)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._in_flight[key] = future
+        self._pending.append((key, text, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush, context=contextvars.Context())
+        return list(await asyncio.shield(future))
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch), context=contextvars.Context())
+            self._tasks.add(task)
+            task.add_done_callback(lambda task: self._settle(task, batch))
+
+    def _settle(self, task, batch):
+        """Once a batch task is done, however it ended, fail every waiter it left without a result.
+
+        A done callback rather than a finally: a task cancelled before its first step never runs
+        its coroutine at all.
+        """
+        self._tasks.discard(task)
+        if task.cancelled():
+            error = RuntimeError("Bullet formatting was cancelled")
+        else:
+            error = task.exception() or RuntimeError("Bullet formatting returned no result")
+        for key, _, future in batch:
+            self._in_flight.pop(key, None)
+            if not future.done():
+                future.set_exception(error)
+                # Callers may have gone away; don't warn about an unretrieved exception
+                future.exception()
+
+    async def _run_batch(self, batch):
+        misses = batch
+        if self.redis is not None:
+            shared = await asyncio.to_thread(self._shared_get, [key for key, _, _ in batch])
+            for (key, text, future), bullets in zip(batch, shared):
+                if bullets is not None:
+                    self._shared_hit(key, text, bullets)
+                    future.set_result(bullets)
+            misses = [item for item, bullets in zip(batch, shared) if bullets is None]
+        if not misses:
+            return
+        results = await self._call_model([text for _, text, _ in misses])
+        for (key, _, future), bullets in zip(misses, results):
+            self._remember(key, bullets)
+            future.set_result(bullets)
+        if self.redis is not None:
+            fresh = [(key, bullets) for (key, _, _), bullets in zip(misses, results)]
+            await asyncio.to_thread(self._shared_set, fresh)
+
+    async def _call_single(self, text: str) -> List[str]:
+        self._llm_calls += 1
+        self._llm_texts += 1
+        result = await self.model.ainvoke(
+            FORMAT_RESPONSIBILITIES_PROMPT.format(text=text),
+            config={"tags": ["format_responsibilities"], "callbacks": self.callbacks}
+        )
+        return parse_bullets(result.content)
+
+    async def _call_model(self, texts: List[str]) -> List[List[str]]:
+        if len(texts) == 1:
+            return [await self._call_single(texts[0])]
+
+        self._llm_calls += 1
+        self._llm_texts += len(texts)
+        numbered = "\n\n".join(f"{i}: {text}" for i, text in enumerate(texts, start=1))
+        result = await self.model.ainvoke(
+            FORMAT_RESPONSIBILITIES_BATCH_PROMPT.format(texts=numbered),
+            config={"tags": ["format_responsibilities"], "callbacks": self.callbacks}
+        )
+        parsed = parse_batch(str(result.content), len(texts))
+        # The rules are sent once instead of once per text
+        self._saved_tokens += max(len(parsed) - 1, 0) * _estimate_tokens(FORMAT_RESPONSIBILITIES_PROMPT.template)
+
+        missing = [i for i in range(len(texts)) if i not in parsed]
+        if missing:
+            logger.warning("Batched bullet reply covered %d of %d texts; retrying the rest one by one",
+                           len(texts) - len(missing), len(texts))
+            retried = await asyncio.gather(*(self._call_single(texts[i]) for i in missing))
+            parsed.update(zip(missing, retried))
+        return [parsed[i] for i in range(len(texts))]
+
+    def stats(self) -> dict:
+        reused = self._hits + self._coalesced
+        return {
+            "requests": self._requests,
+            "hits": self._hits,
+            "shared_hits": self._shared_hits,
+            "coalesced": self._coalesced,
+            "hit_rate": reused / self._requests if self._requests else 0.0,
+            "llm_calls": self._llm_calls,
+            "llm_texts": self._llm_texts,
+            "saved_tokens": self._saved_tokens,
+            "entries": len(self._cache),
+            "max_entries": self.max_entries,
+            "in_flight": len(self._in_flight),
+        }
@@ -1,95 +1,1068 @@
-from langchain.schema import BaseChatMessageHistory
+from langchain_core.chat_history import BaseChatMessageHistory
+from event_log import replace_resume, revert_to
+from metrics import stage_timer
 from resume_builder import Resume
+from resume_model import ResumeData
+from collections import OrderedDict
 from typing import List
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import time
+import uuid
+import weakref
 from langchain_core.messages import (
     BaseMessage,
+    SystemMessage,
     message_to_dict,
     messages_from_dict,
 )
 
+logger = logging.getLogger(__name__)
+
+
+def default_resume_data():
+    return ResumeData().to_dict()
+
+
+class VersionConflict(Exception):
+    """Raised when a session changed between being read and being written back."""
+
+
+class SessionLocks:
+    """One asyncio.Lock per session id, dropped once nobody holds or waits on it."""
+
+    def __init__(self):
+        self._locks = weakref.WeakValueDictionary()
+
+    def get(self, session_id) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        return lock
+
+
+class AsyncStoreMethods:
+    """Coroutine versions of the store calls request handlers make.
+
+    A store whose client does network I/O sets `blocking`, and these run its synchronous methods
+    in a worker thread instead of stalling the event loop; otherwise they run inline.
+    """
+    blocking = False
+
+    async def _run(self, method, *args, **kwargs):
+        if self.blocking:
+            return await asyncio.to_thread(method, *args, **kwargs)
+        return method(*args, **kwargs)
+
+    async def aadd_messages(self, session_id, messages, ttl=None, expected_count=None):
+        return await self._run(self.add_messages, session_id, messages, ttl=ttl, expected_count=expected_count)
+
+    async def aget_messages_since(self, session_id, start):
+        return await self._run(self.get_messages_since, session_id, start)
+
+    async def aappend_events(self, session_id, events, ttl=None, expected_version=None, resume_data=None):
+        return await self._run(self.append_events, session_id, events, ttl=ttl,
+                               expected_version=expected_version, resume_data=resume_data)
+
+    async def acommit_turn(self, session_id, messages, events, ttl=None, expected_count=None,
+                           expected_version=None, resume_data=None):
+        return await self._run(self.commit_turn, session_id, messages, events, ttl=ttl,
+                               expected_count=expected_count, expected_version=expected_version,
+                               resume_data=resume_data)
+
+    async def aundo(self, session_id, steps=1, ttl=None, expected_version=None):
+        return await self._run(self.undo, session_id, steps, ttl=ttl, expected_version=expected_version)
+
+    async def ahas_session(self, session_id):
+        return await self._run(self.has_session, session_id)
+
+    async def aget_events(self, session_id, start=0):
+        return await self._run(self.get_events, session_id, start)
+
+    async def aget_resume(self, session_id):
+        return await self._run(self.get_resume, session_id)
+
+    async def aget_resume_at(self, session_id, version):
+        return await self._run(self.get_resume_at, session_id, version)
+
+    async def aimport_sessions(self, records, ttl=None):
+        return await self._run(self.import_sessions, records, ttl=ttl)
+
+    async def aexport_sessions(self, batch_size=100):
+        """Async `export_sessions`, reading one batch at a time."""
+        batches = self.export_sessions(batch_size)
+        while True:
+            batch = await self._run(next, batches, None)
+            if batch is None:
+                return
+            yield batch
+
+
+# In-memory message histories get an id from here whenever one is created or cleared
+_history_epochs = itertools.count(1)
+
+
+def _size_of(value):
+    """Approximate in-memory footprint of a stored value, measured as its JSON length."""
+    if isinstance(value, ResumeData):
+        return len(value.to_json())
+    return len(json.dumps(value, separators=(",", ":"), default=str))
+
 
 # Simple in-memory custom store
-class CustomStore:
-    _instance = None
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(CustomStore, cls).__new__(cls)
-            cls._instance.store = {}
-        return cls._instance
+class InMemoryStore(AsyncStoreMethods):
+    """Process-local session store; sessions are lost on restart and not shared between workers.
+
+    Sessions are kept in LRU order and evicted once there are more than `max_sessions` of them
+    or their estimated size passes `max_bytes`. A session idle for longer than its TTL (the last
+    `ttl` written with it, or `default_ttl`) is dropped the next time it is touched or swept.
+
+    The resume is kept as an append-only list of edit events (see event_log) plus its current
+    materialized state as a ResumeData, with a snapshot every `snapshot_every` events so any
+    earlier version is rebuilt by replaying at most that many events.
+
+    Writers can pass the resume version or message count they read as `expected_version` /
+    `expected_count`; the write then fails with VersionConflict if the session moved on since.
+    """
+
+    def __init__(self, max_sessions=None, max_bytes=None, default_ttl=None, snapshot_every=50):
+        self.store = OrderedDict()
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.snapshot_every = snapshot_every
+        # session_id -> [bytes, last access (monotonic), ttl]
+        self._meta = {}
+        # (earliest expiry, session_id); an entry may be stale if the session was touched since
+        self._expiry = []
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.locks = SessionLocks()
+
+    def lock(self, session_id) -> asyncio.Lock:
+        """Lock serializing chat turns of one session within this process."""
+        return self.locks.get(session_id)
+
+    def _drop(self, session_id):
+        del self.store[session_id]
+        self.current_bytes -= self._meta.pop(session_id)[0]
+
+    def _is_expired(self, session_id, now):
+        _, last_access, ttl = self._meta[session_id]
+        return ttl is not None and now - last_access > ttl
+
+    def _track(self, session_id, now, ttl):
+        self._meta[session_id] = [0, now, ttl]
+        if ttl is not None:
+            heapq.heappush(self._expiry, (now + ttl, session_id))
+
+    def _sweep_expired(self, now):
+        # Sessions have their own TTLs, so LRU order says nothing about which expire first
+        while self._expiry and self._expiry[0][0] < now:
+            _, session_id = heapq.heappop(self._expiry)
+            meta = self._meta.get(session_id)
+            if meta is None:
+                continue
+            if self._is_expired(session_id, now):
+                self._drop(session_id)
+                self.expirations += 1
+            elif meta[2] is not None:
+                # Touched or given a new TTL since this entry was pushed
+                heapq.heappush(self._expiry, (meta[1] + meta[2], session_id))
+
+    def _enforce_limits(self, keep):
+        while len(self.store) > 1 and (
+            (self.max_sessions is not None and len(self.store) > self.max_sessions)
+            or (self.max_bytes is not None and self.current_bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self.store))
+            if oldest == keep:
+                break
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _resize(self, session_id, delta, ttl):
+        meta = self._meta[session_id]
+        meta[0] += delta
+        if ttl is not None and ttl != meta[2]:
+            meta[2] = ttl
+            heapq.heappush(self._expiry, (meta[1] + ttl, session_id))
+        self.current_bytes += delta
+        self._enforce_limits(session_id)
 
     def get_or_create_session(self, session_id):
-        if session_id not in self.store:
-            self.store[session_id] = {
-                "messages": [],
-                "resume_data": {
-                    "personal_section": {},
-                    "experience_section": [],
-                    "education_section": [],
-                    "projects_section": [],
-                    "skills_section": {
-                        "languages": [],
-                        "frameworks": [],
-                        "developer_tools": [],
-                        "libraries": []
-                    }
-                }
-            }
-        return self.store[session_id]
-
-    def add_message(self, session_id, message):
+        now = time.monotonic()
+        if session_id in self.store and self._is_expired(session_id, now):
+            self._drop(session_id)
+            self.expirations += 1
+        if session_id in self.store:
+            self.hits += 1
+            self.store.move_to_end(session_id)
+            self._meta[session_id][1] = now
+            return self.store[session_id]
+
+        self.misses += 1
+        self._sweep_expired(now)
+        session = self._new_session(ResumeData())
+        self.store[session_id] = session
+        self._track(session_id, now, self.default_ttl)
+        self._resize(session_id, 2 * _size_of(session["resume_data"]), None)
+        return session
+
+    def has_session(self, session_id):
+        """Whether the session exists; unlike the other reads, this neither creates nor touches it."""
+        return session_id in self.store and not self._is_expired(session_id, time.monotonic())
+
+    def _new_session(self, resume_data):
+        return {
+            "messages": [],
+            "history_epoch": next(_history_epochs),
+            "events": [],
+            # snapshots[k] is the resume at version k * snapshot_every
+            "snapshots": [resume_data.copy()],
+            "resume_data": resume_data
+        }
+
+    def add_message(self, session_id, message, ttl=None):
+        self.add_messages(session_id, [message], ttl=ttl)
+
+    def add_messages(self, session_id, messages, ttl=None, expected_count=None):
         session = self.get_or_create_session(session_id)
-        session["messages"].append(message)
+        if expected_count is not None and len(session["messages"]) != expected_count:
+            raise VersionConflict(
+                f"Session {session_id} has {len(session['messages'])} messages, expected {expected_count}"
+            )
+        session["messages"].extend(messages)
+        self._resize(session_id, sum(_size_of(m) for m in messages), ttl)
 
     def get_messages(self, session_id):
         session = self.get_or_create_session(session_id)
         return session["messages"]
 
-    def update_resume(self, session_id, resume_data):
+    def get_messages_since(self, session_id, start):
+        """Return the history epoch, the total message count and the messages from index `start` on.
+
+        The epoch changes whenever the history is cleared or recreated, so a reader holding the
+        first `start` messages knows they are still the same messages if the epoch is unchanged.
+        """
+        session = self.get_or_create_session(session_id)
+        messages = session["messages"]
+        return session["history_epoch"], len(messages), messages[start:]
+
+    def clear_messages(self, session_id):
+        session = self.get_or_create_session(session_id)
+        freed = sum(_size_of(m) for m in session["messages"])
+        session["messages"] = []
+        session["history_epoch"] = next(_history_epochs)
+        self._resize(session_id, -freed, None)
+
+    def _resume_at(self, session, version):
+        snapshot = min(version // self.snapshot_every, len(session["snapshots"]) - 1)
+        events = session["events"][snapshot * self.snapshot_every:version]
+        return session["snapshots"][snapshot].copy().replay(events, lambda v: self._resume_at(session, v))
+
+    def append_events(self, session_id, events, ttl=None, expected_version=None, resume_data=None):
+        """Append resume edit events and return the session's new resume version.
+
+        Only the events are stored, so a turn costs the size of its edits rather than of the
+        whole resume. `resume_data` is accepted for parity with RedisStore; this store keeps
+        its own materialized copy.
+        """
+        session = self.get_or_create_session(session_id)
+        version = len(session["events"])
+        if expected_version is not None and version != expected_version:
+            raise VersionConflict(
+                f"Resume of session {session_id} is at version {version}, expected {expected_version}"
+            )
+        self._resize(session_id, self._apply_events(session, events), ttl)
+        return len(session["events"])
+
+    def commit_turn(self, session_id, messages, events, ttl=None, expected_count=None, expected_version=None,
+                    resume_data=None):
+        """Append a chat turn's messages and resume events together; returns the new resume version.
+
+        Both expectations are checked before anything is written, so a VersionConflict leaves
+        the session as it was.
+        """
         session = self.get_or_create_session(session_id)
-        session["resume_data"] = resume_data
+        if expected_count is not None and len(session["messages"]) != expected_count:
+            raise VersionConflict(
+                f"Session {session_id} has {len(session['messages'])} messages, expected {expected_count}"
+            )
+        if expected_version is not None and len(session["events"]) != expected_version:
+            raise VersionConflict(
+                f"Resume of session {session_id} is at version {len(session['events'])}, expected {expected_version}"
+            )
+        session["messages"].extend(messages)
+        delta = sum(_size_of(m) for m in messages) + self._apply_events(session, events)
+        self._resize(session_id, delta, ttl)
+        return len(session["events"])
+
+    def _apply_events(self, session, events):
+        """Append events to a session's log and materialized resume; returns the bytes added."""
+        delta = 0
+        for event in events:
+            session["resume_data"] = session["resume_data"].apply(event, lambda v: self._resume_at(session, v))
+            session["events"].append(event)
+            delta += _size_of(event)
+            if len(session["events"]) % self.snapshot_every == 0:
+                snapshot = session["resume_data"].copy()
+                session["snapshots"].append(snapshot)
+                delta += _size_of(snapshot)
+        return delta
+
+    def update_resume(self, session_id, resume_data, ttl=None, expected_version=None):
+        """Replace the whole resume and return the session's new resume version."""
+        return self.append_events(
+            session_id, [replace_resume(resume_data)], ttl=ttl, expected_version=expected_version
+        )
+
+    def undo(self, session_id, steps=1, ttl=None, expected_version=None):
+        """Return the resume to how it was `steps` events ago, itself recorded as an event."""
+        session = self.get_or_create_session(session_id)
+        version = len(session["events"])
+        if not 0 < steps <= version:
+            raise ValueError(f"Cannot undo {steps} edits of session {session_id} at version {version}")
+        return self.append_events(session_id, [revert_to(version - steps)], ttl=ttl, expected_version=expected_version)
+
+    def get_events(self, session_id, start=0):
+        """Return the resume version and the events from index `start` on."""
+        session = self.get_or_create_session(session_id)
+        return len(session["events"]), session["events"][start:]
 
     def get_resume(self, session_id):
+        """A private copy of the session's resume, tagged with the version it was read at."""
         session = self.get_or_create_session(session_id)
-        resume_object = Resume()
-        resume_object.resume_data = session["resume_data"]
-        return resume_object
+        return Resume(session["resume_data"].copy(), version=len(session["events"]))
+
+    def get_resume_at(self, session_id, version):
+        """The resume as it was after its first `version` events."""
+        session = self.get_or_create_session(session_id)
+        if not 0 <= version <= len(session["events"]):
+            raise ValueError(f"Session {session_id} has no resume version {version}")
+        return Resume(self._resume_at(session, version), version=version)
+
+    def export_sessions(self, batch_size=100):
+        """Yield lists of up to `batch_size` session records (see session_record), oldest-used first.
+
+        Reading doesn't count as an access, so exporting neither refreshes TTLs nor reorders the
+        LRU; sessions that expire or are evicted while the export runs are skipped.
+        """
+        now = time.monotonic()
+        session_ids = list(self.store)
+        for i in range(0, len(session_ids), batch_size):
+            batch = []
+            for session_id in session_ids[i:i + batch_size]:
+                session = self.store.get(session_id)
+                if session is None or self._is_expired(session_id, now):
+                    continue
+                batch.append(session_record(
+                    session_id, session["messages"], session["snapshots"][0].to_dict(), session["events"],
+                    session["resume_data"]
+                ))
+            if batch:
+                yield batch
+
+    def import_sessions(self, records, ttl=None):
+        """Create or replace one session per record; returns [(session_id, error)] for records that failed.
+
+        Each record's messages are decoded and its events replayed before it is stored, so a bad
+        one changes nothing.
+        """
+        failures = []
+        now = time.monotonic()
+        for record in records:
+            session_id = record["session_id"]
+            try:
+                session = self._new_session(ResumeData.from_dict(record_base(record)))
+                session["messages"] = _import_messages(record.get("messages"))
+                size = 2 * _size_of(session["resume_data"]) + sum(_size_of(m) for m in session["messages"])
+                size += self._apply_events(session, list(record.get("events") or []))
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                failures.append((session_id, str(e)))
+                continue
+            if session_id in self.store:
+                self._drop(session_id)
+            _history_cache.discard(session_id)
+            self.store[session_id] = session
+            self._track(session_id, now, ttl if ttl is not None else self.default_ttl)
+            self._resize(session_id, size, None)
+        return failures
+
+    def stats(self):
+        """Counters for sizing workers."""
+        return {
+            "sessions": len(self.store),
+            "bytes": self.current_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+def session_record(session_id, messages, base, events, resume_data):
+    """One exported session: messages, the resume at version 0 and the edit events after it.
+
+    `resume_data` (the resume after all events) and `version` are included for readers of the
+    export; import rebuilds both from `base` and `events`.
+    """
+    return {
+        "session_id": session_id,
+        "messages": list(messages),
+        "base": base,
+        "events": list(events),
+        "resume_data": resume_data.to_dict(),
+        "version": len(events)
+    }
+
+
+def record_base(record):
+    """The version 0 resume of an import record; a record with no events may give just resume_data."""
+    if record.get("base") is not None:
+        return record["base"]
+    return None if record.get("events") else record.get("resume_data")
+
+
+def rebuild_resume(base, events):
+    """Replay `events` onto the `base` resume dict; revert events rebuild the version they point at."""
+    return ResumeData.from_dict(base).replay(events, lambda version: rebuild_resume(base, events[:version]))
+
+
+class CustomStore(InMemoryStore):
+    """The process-wide in-memory store, kept as a singleton for existing callers."""
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(CustomStore, cls).__new__(cls)
+            InMemoryStore.__init__(cls._instance, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class RedisStore(AsyncStoreMethods):
+    """Session store backed by Redis, shared by every worker that points at the same server.
+
+    Each session is three keys: a list of JSON messages and a list of JSON resume edit events,
+    both appended with RPUSH, and a snapshot of the resume at some version, rewritten every
+    `snapshot_every` events. Reads replay the events after the snapshot. The resume version is
+    the length of the event list. A fourth key holds a random id for the message list, replaced
+    whenever it is cleared or recreated. All keys get the session TTL refreshed on every write.
+
+    Writes given an `expected_version` / `expected_count` WATCH the list they check and apply in
+    MULTI/EXEC, raising VersionConflict if another worker got there first.
+
+    The client is synchronous; request handlers use the `a`-prefixed methods, which run it in a
+    worker thread.
+    """
+    _pools = {}
+    blocking = True
+
+    def __init__(self, url=None, client=None, prefix="session:", max_connections=50, snapshot_every=50):
+        if client is None:
+            import redis
+
+            url = url or os.getenv("REDIS_URI")
+            # One connection pool per URL for the whole process
+            if url not in RedisStore._pools:
+                RedisStore._pools[url] = redis.ConnectionPool.from_url(url, max_connections=max_connections)
+            client = redis.Redis(connection_pool=RedisStore._pools[url])
+        self.client = client
+        self.prefix = prefix
+        self.snapshot_every = snapshot_every
+        self.locks = SessionLocks()
+
+    def lock(self, session_id) -> asyncio.Lock:
+        """Lock serializing chat turns of one session within this process; other workers are caught by versioning."""
+        return self.locks.get(session_id)
+
+    def _messages_key(self, session_id):
+        return f"{self.prefix}{session_id}:messages"
+
+    def _resume_key(self, session_id):
+        # Whole-resume blob written before resumes were event-sourced; read as the base resume
+        return f"{self.prefix}{session_id}:resume"
+
+    def _events_key(self, session_id):
+        return f"{self.prefix}{session_id}:events"
+
+    def _snapshot_key(self, session_id):
+        return f"{self.prefix}{session_id}:snapshot"
+
+    def _history_epoch_key(self, session_id):
+        return f"{self.prefix}{session_id}:history_epoch"
+
+    def _expire(self, pipe, session_id, ttl):
+        if ttl:
+            pipe.expire(self._messages_key(session_id), ttl)
+            pipe.expire(self._resume_key(session_id), ttl)
+            pipe.expire(self._events_key(session_id), ttl)
+            pipe.expire(self._snapshot_key(session_id), ttl)
+            pipe.expire(self._history_epoch_key(session_id), ttl)
+
+    def _compare_and_set(self, key, read, expected, write):
+        """WATCH `key`, check `read(pipe) == expected`, then apply `write(pipe, current)` in MULTI/EXEC."""
+        from redis.exceptions import WatchError
+
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    current = read(pipe)
+                    if expected is not None and current != expected:
+                        raise VersionConflict(f"{key} is at {current}, expected {expected}")
+                    pipe.multi()
+                    write(pipe, current)
+                    pipe.execute()
+                    return current
+                except WatchError:
+                    # Unconditional writes just retry against the new value
+                    if expected is not None:
+                        raise VersionConflict(f"{key} changed while it was being written")
+
+    def get_or_create_session(self, session_id):
+        return {
+            "messages": self.get_messages(session_id),
+            "resume_data": self.get_resume(session_id).resume_data
+        }
+
+    def has_session(self, session_id):
+        """Whether any of the session's keys exist."""
+        return bool(self.client.exists(
+            self._messages_key(session_id), self._resume_key(session_id), self._events_key(session_id),
+            self._snapshot_key(session_id)
+        ))
+
+    def add_message(self, session_id, message, ttl=None):
+        self.add_messages(session_id, [message], ttl=ttl)
+
+    def add_messages(self, session_id, messages, ttl=None, expected_count=None):
+        if not messages:
+            return
+        key = self._messages_key(session_id)
+        encoded = [json.dumps(m) for m in messages]
+
+        def write(pipe, _):
+            self._push_messages(pipe, session_id, encoded)
+            self._expire(pipe, session_id, ttl)
+
+        if expected_count is None:
+            pipe = self.client.pipeline(transaction=False)
+            write(pipe, None)
+            pipe.execute()
+        else:
+            self._compare_and_set(key, lambda pipe: pipe.llen(key), expected_count, write)
+
+    def _push_messages(self, pipe, session_id, encoded):
+        if encoded:
+            pipe.rpush(self._messages_key(session_id), *encoded)
+            # A list that expired or was never written starts a new epoch
+            pipe.set(self._history_epoch_key(session_id), uuid.uuid4().hex, nx=True)
+
+    def _push_events(self, pipe, session_id, encoded, version, resume_data):
+        if encoded:
+            pipe.rpush(self._events_key(session_id), *encoded)
+            new_version = version + len(encoded)
+            if resume_data is not None and new_version // self.snapshot_every > version // self.snapshot_every:
+                pipe.set(self._snapshot_key(session_id), json.dumps({"version": new_version, "data": resume_data}))
+
+    def get_messages(self, session_id):
+        return [json.loads(m) for m in self.client.lrange(self._messages_key(session_id), 0, -1)]
+
+    def get_messages_since(self, session_id, start):
+        """Return the history epoch, the total message count and the messages from index `start` on."""
+        pipe = self.client.pipeline()
+        pipe.get(self._history_epoch_key(session_id))
+        pipe.llen(self._messages_key(session_id))
+        pipe.lrange(self._messages_key(session_id), start, -1)
+        epoch, total, raw_messages = pipe.execute()
+        return epoch.decode() if epoch else None, total, [json.loads(m) for m in raw_messages]
+
+    def clear_messages(self, session_id):
+        pipe = self.client.pipeline()
+        pipe.delete(self._messages_key(session_id))
+        pipe.set(self._history_epoch_key(session_id), uuid.uuid4().hex, keepttl=True)
+        pipe.execute()
+
+    def _base_resume(self, session_id):
+        raw_resume = self.client.get(self._resume_key(session_id))
+        return json.loads(raw_resume) if raw_resume else default_resume_data()
+
+    def _snapshot(self, session_id):
+        """The latest snapshot as (version, resume_data), falling back to the base resume at version 0."""
+        raw_snapshot = self.client.get(self._snapshot_key(session_id))
+        if raw_snapshot:
+            snapshot = json.loads(raw_snapshot)
+            return snapshot["version"], snapshot["data"]
+        return 0, self._base_resume(session_id)
+
+    def _resume_at(self, session_id, version):
+        snapshot_version, resume_data = self._snapshot(session_id)
+        if version < snapshot_version:
+            snapshot_version, resume_data = 0, self._base_resume(session_id)
+        raw_events = self.client.lrange(self._events_key(session_id), snapshot_version, version - 1) \
+            if version > snapshot_version else []
+        if len(raw_events) != version - snapshot_version:
+            raise ValueError(f"Session {session_id} has no resume version {version}")
+        return ResumeData.from_dict(resume_data).replay(
+            [json.loads(e) for e in raw_events], lambda v: self._resume_at(session_id, v)
+        )
+
+    def append_events(self, session_id, events, ttl=None, expected_version=None, resume_data=None):
+        """Append resume edit events and return the session's new resume version.
+
+        Pass the resulting `resume_data` so that a write crossing a multiple of `snapshot_every`
+        stores it as the new snapshot in the same transaction.
+        """
+        key = self._events_key(session_id)
+        if not events:
+            return expected_version if expected_version is not None else self.client.llen(key)
+        encoded = [json.dumps(e) for e in events]
+
+        def write(pipe, version):
+            self._push_events(pipe, session_id, encoded, version, resume_data)
+            self._expire(pipe, session_id, ttl)
+
+        return self._compare_and_set(key, lambda pipe: pipe.llen(key), expected_version, write) + len(encoded)
+
+    def commit_turn(self, session_id, messages, events, ttl=None, expected_count=None, expected_version=None,
+                    resume_data=None):
+        """Append a chat turn's messages and resume events in one MULTI/EXEC; returns the new resume version.
+
+        Both lists are watched, so if either moved past what the caller read, VersionConflict is
+        raised and neither is written.
+        """
+        from redis.exceptions import WatchError
+
+        messages_key, events_key = self._messages_key(session_id), self._events_key(session_id)
+        encoded_messages = [json.dumps(m) for m in messages]
+        encoded_events = [json.dumps(e) for e in events]
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(messages_key, events_key)
+                    count, version = pipe.llen(messages_key), pipe.llen(events_key)
+                    if expected_count is not None and count != expected_count:
+                        raise VersionConflict(f"{messages_key} is at {count}, expected {expected_count}")
+                    if expected_version is not None and version != expected_version:
+                        raise VersionConflict(f"{events_key} is at {version}, expected {expected_version}")
+                    pipe.multi()
+                    self._push_messages(pipe, session_id, encoded_messages)
+                    self._push_events(pipe, session_id, encoded_events, version, resume_data)
+                    self._expire(pipe, session_id, ttl)
+                    pipe.execute()
+                    return version + len(encoded_events)
+                except WatchError:
+                    if expected_count is not None or expected_version is not None:
+                        raise VersionConflict(f"Session {session_id} changed while it was being written")
+
+    def update_resume(self, session_id, resume_data, ttl=None, expected_version=None):
+        """Replace the whole resume and return the session's new resume version."""
+        return self.append_events(
+            session_id, [replace_resume(resume_data)], ttl=ttl, expected_version=expected_version,
+            resume_data=resume_data
+        )
+
+    def undo(self, session_id, steps=1, ttl=None, expected_version=None):
+        """Return the resume to how it was `steps` events ago, itself recorded as an event."""
+        version = self.client.llen(self._events_key(session_id))
+        if not 0 < steps <= version:
+            raise ValueError(f"Cannot undo {steps} edits of session {session_id} at version {version}")
+        return self.append_events(
+            session_id, [revert_to(version - steps)], ttl=ttl, expected_version=expected_version,
+            resume_data=self._resume_at(session_id, version - steps).to_dict()
+        )
+
+    def get_events(self, session_id, start=0):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.llen(self._events_key(session_id))
+        pipe.lrange(self._events_key(session_id), start, -1)
+        total, raw_events = pipe.execute()
+        return total, [json.loads(e) for e in raw_events]
+
+    def get_resume(self, session_id):
+        """The session's resume, tagged with the version it was read at."""
+        snapshot_version, resume_data = self._snapshot(session_id)
+        raw_events = self.client.lrange(self._events_key(session_id), snapshot_version, -1)
+        resume_data = ResumeData.from_dict(resume_data).replay(
+            [json.loads(e) for e in raw_events], lambda v: self._resume_at(session_id, v)
+        )
+        return Resume(resume_data, version=snapshot_version + len(raw_events))
+
+    def get_resume_at(self, session_id, version):
+        """The resume as it was after its first `version` events."""
+        if version < 0:
+            raise ValueError(f"Session {session_id} has no resume version {version}")
+        return Resume(self._resume_at(session_id, version), version=version)
+
+    def _session_ids(self):
+        """Every session id with stored messages, events or a base resume, each once."""
+        seen = set()
+        for key in self.client.scan_iter(match=f"{self.prefix}*", count=1000):
+            key = key.decode() if isinstance(key, bytes) else key
+            session_id, _, kind = key[len(self.prefix):].rpartition(":")
+            if kind in ("messages", "events", "resume") and session_id not in seen:
+                seen.add(session_id)
+                yield session_id
+
+    def export_sessions(self, batch_size=100):
+        """Yield lists of up to `batch_size` session records, reading each batch in one pipeline."""
+        session_ids = self._session_ids()
+        while True:
+            batch_ids = [session_id for _, session_id in zip(range(batch_size), session_ids)]
+            if not batch_ids:
+                return
+            pipe = self.client.pipeline(transaction=False)
+            for session_id in batch_ids:
+                pipe.lrange(self._messages_key(session_id), 0, -1)
+                pipe.get(self._resume_key(session_id))
+                pipe.lrange(self._events_key(session_id), 0, -1)
+            replies = pipe.execute()
+            batch = []
+            for i, session_id in enumerate(batch_ids):
+                raw_messages, raw_base, raw_events = replies[3 * i:3 * i + 3]
+                base = json.loads(raw_base) if raw_base else default_resume_data()
+                events = [json.loads(e) for e in raw_events]
+                batch.append(session_record(
+                    session_id, [json.loads(m) for m in raw_messages], base, events, rebuild_resume(base, events)
+                ))
+            yield batch
+
+    def import_sessions(self, records, ttl=None):
+        """Create or replace one session per record, writing the whole batch in one pipeline.
+
+        Returns [(session_id, error)] for records whose messages don't decode or whose events don't
+        replay; those are not written.
+        """
+        failures = []
+        pipe = self.client.pipeline(transaction=False)
+        for record in records:
+            session_id = record["session_id"]
+            try:
+                base = record_base(record) or default_resume_data()
+                events = list(record.get("events") or [])
+                resume_data = rebuild_resume(base, events)
+                messages = [json.dumps(m) for m in _import_messages(record.get("messages"))]
+                encoded_events = [json.dumps(e) for e in events]
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                failures.append((session_id, str(e)))
+                continue
+            pipe.delete(self._messages_key(session_id), self._resume_key(session_id),
+                        self._events_key(session_id), self._snapshot_key(session_id))
+            pipe.set(self._history_epoch_key(session_id), uuid.uuid4().hex)
+            pipe.set(self._resume_key(session_id), json.dumps(ResumeData.from_dict(base).to_dict()))
+            if messages:
+                pipe.rpush(self._messages_key(session_id), *messages)
+            if encoded_events:
+                pipe.rpush(self._events_key(session_id), *encoded_events)
+                pipe.set(self._snapshot_key(session_id),
+                         json.dumps({"version": len(events), "data": resume_data.to_dict()}))
+            self._expire(pipe, session_id, ttl)
+            _history_cache.discard(session_id)
+        pipe.execute()
+        return failures
+
+
+_default_store = None
+
+
+def _env_int(name):
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def get_store():
+    """Return the configured session store: SESSION_STORE=redis|memory, defaulting to Redis when REDIS_URI is set."""
+    global _default_store
+    if _default_store is None:
+        backend = os.getenv("SESSION_STORE") or ("redis" if os.getenv("REDIS_URI") else "memory")
+        if backend == "redis":
+            _default_store = RedisStore(snapshot_every=_env_int("RESUME_SNAPSHOT_EVERY") or 50)
+        elif backend == "memory":
+            _default_store = CustomStore(
+                max_sessions=_env_int("SESSION_MAX_COUNT"),
+                max_bytes=_env_int("SESSION_MAX_BYTES"),
+                snapshot_every=_env_int("RESUME_SNAPSHOT_EVERY") or 50
+            )
+        else:
+            raise ValueError(f"Unknown SESSION_STORE backend: {backend}")
+    return _default_store
+
+
+def _to_message_dict(msg):
+    if isinstance(msg, dict):
+        # Fix legacy format with "role"
+        if "role" in msg and "type" not in msg:
+            msg_type = "human" if msg["role"] == "user" else "ai"
+            return {"type": msg_type, "content": msg["content"]}
+        return msg  # Already in message_to_dict format
+    return message_to_dict(msg)  # Convert BaseMessage if needed
+
+
+def _import_messages(messages):
+    """An import record's messages as stored, checked to decode the way history reads decode them."""
+    messages = list(messages or [])
+    try:
+        messages_from_dict([_to_message_dict(m) for m in messages])
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise ValueError(f"malformed message: {e!r}") from e
+    return messages
+
+
+def _estimate_tokens(message):
+    # Roughly four characters per token plus per-message overhead; good enough for budgeting
+    return len(str(message.content)) // 4 + 4
+
+
+class _HistoryEntry:
+    __slots__ = ("epoch", "messages", "tokens", "window_start", "window_tokens", "summary")
+
+    def __init__(self):
+        self.epoch = None
+        self.messages = []
+        self.tokens = []
+        self.window_start = 0
+        self.window_tokens = 0
+        self.summary = None
+
+    def append(self, message):
+        tokens = _estimate_tokens(message)
+        self.messages.append(message)
+        self.tokens.append(tokens)
+        self.window_tokens += tokens
+
+
+class HistoryCache:
+    """Decoded messages per session, so each turn only decodes what was appended since the last one.
+
+    An entry is only extended while the store reports the same history epoch it was read at; a
+    history cleared or expired and regrown by another worker, even to the same length, is reloaded.
+    """
+
+    def __init__(self, max_sessions=1024):
+        self.entries = OrderedDict()
+        self.max_sessions = max_sessions
+
+    def get(self, session_id):
+        entry = self.entries.get(session_id)
+        if entry is None:
+            entry = self.entries[session_id] = _HistoryEntry()
+            if len(self.entries) > self.max_sessions:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(session_id)
+        return entry
+
+    def discard(self, session_id):
+        self.entries.pop(session_id, None)
+
+
+_history_cache = HistoryCache()
+
+SUMMARY_PROMPT = """Progressively summarize the conversation between a user and a resume builder assistant.
+Keep every concrete resume detail (names, dates, companies, skills, projects). Return only the new summary.
+
+Current summary:
+{summary}
+
+New lines of conversation:
+{lines}
+"""
+
 
 # Custom chat message history compatible with LangChain
 class CustomChatMessageHistory(BaseChatMessageHistory):
-    def __init__(self, session_id, ttl=None):
+    """Chat history for one session.
+
+    With `max_token_limit` set, `get_context_messages` returns only the newest messages that fit
+    the budget; if a `summarizer` chat model is given, messages that fall out of the window are
+    folded once into a rolling summary that is sent ahead of them.
+
+    With `optimistic` set, `add_messages` fails with VersionConflict if the session gained
+    messages since this history last read it.
+
+    With `defer_writes` set, added messages are only collected in `pending_messages`, for the
+    caller to write together with the turn's resume edits (see `acommit_turn`).
+    """
+
+    def __init__(self, session_id, ttl=None, store=None, max_token_limit=None, summarizer=None, optimistic=False,
+                 defer_writes=False):
         self.session_id = session_id
-        self.store = CustomStore()
-        self.ttl = ttl  # Not implemented, kept for compatibility
+        self.defer_writes = defer_writes
+        self.pending_messages = []
+        self.store = store or get_store()
+        self.ttl = ttl  # Session expiry in seconds, refreshed on every write
+        self.max_token_limit = max_token_limit
+        self.summarizer = summarizer
+        self.optimistic = optimistic
+        self.loaded_count = None  # Stored message count as of the last read
+
+    @staticmethod
+    def _is_stale(entry, epoch, total, new_messages):
+        # The session was cleared, expired or replaced underneath the cache
+        return entry.messages and (epoch != entry.epoch or total != len(entry.messages) + len(new_messages))
+
+    def _extend(self, entry, epoch, total, new_messages):
+        entry.epoch = epoch
+        for message in messages_from_dict([_to_message_dict(m) for m in new_messages]):
+            entry.append(message)
+        self.loaded_count = total
+        return entry
+
+    def _load(self):
+        """Decode only the messages stored since the last call for this session."""
+        entry = _history_cache.get(self.session_id)
+        with stage_timer("history_read"):
+            epoch, total, new_messages = self.store.get_messages_since(self.session_id, len(entry.messages))
+            if self._is_stale(entry, epoch, total, new_messages):
+                _history_cache.discard(self.session_id)
+                entry = _history_cache.get(self.session_id)
+                epoch, total, new_messages = self.store.get_messages_since(self.session_id, 0)
+        return self._extend(entry, epoch, total, new_messages)
+
+    async def _aload(self):
+        """Async `_load`; the store is read without blocking the event loop."""
+        entry = _history_cache.get(self.session_id)
+        with stage_timer("history_read"):
+            epoch, total, new_messages = await self.store.aget_messages_since(self.session_id, len(entry.messages))
+            if self._is_stale(entry, epoch, total, new_messages):
+                _history_cache.discard(self.session_id)
+                entry = _history_cache.get(self.session_id)
+                epoch, total, new_messages = await self.store.aget_messages_since(self.session_id, 0)
+        return self._extend(entry, epoch, total, new_messages)
+
+    def _trim(self, entry):
+        """Where the window would start to fit the budget: (start, window tokens, messages that fall out).
+
+        The entry is left as is; `_slide` moves the window once the dropped messages are summarized.
+        """
+        start, tokens = entry.window_start, entry.window_tokens
+        if self.max_token_limit is not None:
+            while tokens > self.max_token_limit and start < len(entry.messages) - 1:
+                tokens -= entry.tokens[start]
+                start += 1
+        return start, tokens, entry.messages[entry.window_start:start]
+
+    def _slide(self, entry, start, tokens, summary=None):
+        if summary is not None:
+            entry.summary = summary
+        entry.window_start, entry.window_tokens = start, tokens
+
+    def _summary_failed(self, dropped):
+        # The window stays where it was, so the next turn summarizes the same messages again
+        logger.warning("Summarizing %d history messages of %s failed; retrying next turn", len(dropped),
+                       self.session_id, exc_info=True)
+
+    def _summary_prompt(self, entry, dropped):
+        lines = "\n".join(f"{m.type}: {m.content}" for m in dropped)
+        return SUMMARY_PROMPT.format(summary=entry.summary or "", lines=lines)
+
+    def _context(self, entry, start=None):
+        window = entry.messages[entry.window_start if start is None else start:]
+        if entry.summary:
+            return [SystemMessage(content=f"Summary of the earlier conversation:\n{entry.summary}")] + window
+        return window
 
     @property
     def messages(self):
-        """Retrieve messages, converting to BaseMessage objects, newest first."""
-        stored_messages = self.store.get_messages(self.session_id)
-        # Handle legacy format and ensure compatibility
-        formatted_items = []
-        for msg in stored_messages[::-1]:  # Newest first
-            if isinstance(msg, dict):
-                # Fix legacy format with "role"
-                if "role" in msg and "type" not in msg:
-                    msg_type = "human" if msg["role"] == "user" else "ai"
-                    formatted_items.append({"type": msg_type, "content": msg["content"]})
-                else:
-                    formatted_items.append(msg)  # Already in message_to_dict format
-            else:
-                formatted_items.append(message_to_dict(msg))  # Convert BaseMessage if needed
-        return messages_from_dict(formatted_items)
+        """Retrieve all messages as BaseMessage objects, oldest first."""
+        return list(self._load().messages)
+
+    def get_context_messages(self) -> List[BaseMessage]:
+        """Messages to send to the model: the rolling summary, if any, then the newest messages within budget."""
+        entry = self._load()
+        start, tokens, dropped = self._trim(entry)
+        summary = None
+        if dropped and self.summarizer is not None:
+            try:
+                summary = self.summarizer.invoke(self._summary_prompt(entry, dropped)).content
+            except Exception:
+                self._summary_failed(dropped)
+                # This turn still gets a window within budget, with the previous summary
+                return self._context(entry, start)
+        self._slide(entry, start, tokens, summary)
+        return self._context(entry)
+
+    async def aload(self) -> None:
+        """Read the history for a turn that writes without asking for context messages.
+
+        An optimistic write is then checked against what was read, as after `aget_context_messages`.
+        """
+        await self._aload()
+
+    async def aget_context_messages(self) -> List[BaseMessage]:
+        """Async `get_context_messages`."""
+        entry = await self._aload()
+        start, tokens, dropped = self._trim(entry)
+        summary = None
+        if dropped and self.summarizer is not None:
+            try:
+                summary = (await self.summarizer.ainvoke(self._summary_prompt(entry, dropped))).content
+            except Exception:
+                self._summary_failed(dropped)
+                return self._context(entry, start)
+        self._slide(entry, start, tokens, summary)
+        return self._context(entry)
 
     def add_message(self, message: BaseMessage) -> None:
         """Add a single message, storing as a dict."""
         msg_dict = message_to_dict(message)  # {"type": "human" or "ai", "content": "..."}
-        self.store.add_message(self.session_id, msg_dict)
+        self.store.add_message(self.session_id, msg_dict, ttl=self.ttl)
 
     def add_messages(self, messages: List[BaseMessage]) -> None:
-        """Add multiple messages."""
-        for message in messages:
-            self.add_message(message)
+        """Add multiple messages in one store write."""
+        if self.defer_writes:
+            self.pending_messages.extend(message_to_dict(m) for m in messages)
+            return
+        expected_count = self.loaded_count if self.optimistic else None
+        with stage_timer("history_write"):
+            self.store.add_messages(
+                self.session_id, [message_to_dict(m) for m in messages], ttl=self.ttl, expected_count=expected_count
+            )
+        if self.loaded_count is not None:
+            self.loaded_count += len(messages)
+
+    async def aadd_messages(self, messages: List[BaseMessage]) -> None:
+        """Async `add_messages`."""
+        if self.defer_writes:
+            self.pending_messages.extend(message_to_dict(m) for m in messages)
+            return
+        expected_count = self.loaded_count if self.optimistic else None
+        with stage_timer("history_write"):
+            await self.store.aadd_messages(
+                self.session_id, [message_to_dict(m) for m in messages], ttl=self.ttl, expected_count=expected_count
+            )
+        if self.loaded_count is not None:
+            self.loaded_count += len(messages)
+
+    async def acommit_turn(self, resume: Resume, resume_data=None) -> int:
+        """Write the deferred messages and `resume`'s pending events in one store transaction.
+
+        Returns the new resume version. Raises VersionConflict, having written nothing, if the
+        session's messages (when `optimistic`) or resume moved on since they were read.
+        """
+        with stage_timer("store_write"):
+            version = await self.store.acommit_turn(
+                self.session_id, self.pending_messages, resume.pending_events, ttl=self.ttl,
+                expected_count=self.loaded_count if self.optimistic else None,
+                expected_version=resume.version, resume_data=resume_data
+            )
+        if self.loaded_count is not None:
+            self.loaded_count += len(self.pending_messages)
+        self.pending_messages = []
+        return version
 
     def clear(self) -> None:
         """Clear session messages."""
-        session = self.store.get_or_create_session(self.session_id)
-        session["messages"] = []
\ No newline at end of file
+        self.store.clear_messages(self.session_id)
+        _history_cache.discard(self.session_id)
@@ -0,0 +1,24 @@
+# Resume edits are stored as small events instead of whole resume_data blobs:
+#   {"op": "set", "section": ..., "value": ...}     replace one section
+#   {"op": "append", "section": ..., "value": ...}  add an entry to a list section
+#   {"op": "replace", "value": ...}                  replace the whole resume
+#   {"op": "revert", "to": version}                  go back to the resume as it was at `version`
+# A session's version is the number of events it has; replaying them in order (ResumeData.replay)
+# rebuilds the resume.
+
+
+def set_section(section: str, value) -> dict:
+    return {"op": "set", "section": section, "value": value}
+
+
+def append_to_section(section: str, value) -> dict:
+    return {"op": "append", "section": section, "value": value}
+
+
+def replace_resume(resume_data: dict) -> dict:
+    return {"op": "replace", "value": resume_data}
+
+
+def revert_to(version: int) -> dict:
+    return {"op": "revert", "to": version}
+
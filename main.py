@@ -1,25 +1,123 @@
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi import FastAPI, HTTPException
-from langchain_openai import AzureChatOpenAI
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder, PromptTemplate
-from langchain.tools import tool
-from langchain.memory import ConversationBufferMemory
-from langchain.agents import create_tool_calling_agent, AgentExecutor
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from contextlib import AsyncExitStack, asynccontextmanager
+import asyncio
+import base64
+import importlib
 import json
 import os
+import re
+import secrets
+import time
 from pydantic import BaseModel, Field
-from typing import Dict, List, Union
-from customstore import CustomChatMessageHistory
-from tools import PersonalInformation,  ExperienceTool, EducationTool, SkillsTool, ProjectsTool
-import subprocess
+from typing import Dict, List, Optional, Union
+from batch_render import BatchQueueFull, arender_batch, create_batch_executor, stream_zip
+from customstore import CustomChatMessageHistory, VersionConflict, get_store
+from metrics import HTTP_SECONDS, REGISTRY, register_gauges, stage_timer
+from pdf_renderers import LatexPdfRenderer, create_html_renderer
+from pdf_service import CompileQueueFull, LatexCompileService
+from render_cache import IncrementalLatexRenderer, RenderCache, diff_sections, resume_content_hash
+from tools.latex_converter import LaTeXResumeConverter
 import logging
 
 
 load_dotenv()
-app=FastAPI()
-logging.basicConfig(level=logging.INFO)
+
+
+async def warm_up(app: FastAPI):
+    """Build the agent, too slow for the import path; runs once the server accepts requests, see /ready."""
+    start = time.perf_counter()
+    try:
+        # langchain_openai and langchain.agents take seconds to import, so they load here, off the event loop
+        agent = await asyncio.to_thread(importlib.import_module, "agent")
+        # Build the model client, prompt, tools and executor once per worker
+        app.state.agent_factory = await asyncio.to_thread(agent.ResumeAgentFactory)
+        register_gauges("resume_bullet_cache", "format_responsibilities cache, coalescing and batching.",
+                        app.state.agent_factory.bullet_formatter.stats,
+                        ["requests", "hits", "coalesced", "hit_rate", "llm_calls", "llm_texts", "saved_tokens", "entries"])
+    except Exception:
+        logger.exception("Warm-up failed")
+        raise
+    app.state.startup_seconds = time.perf_counter() - start
+    logger.info("Warm-up finished in %.2fs", app.state.startup_seconds)
+
+
+async def warm_up_pdf(app: FastAPI):
+    """Start the pdflatex workers and warm the default PDF renderer, apart from the agent warm-up.
+
+    /pdf never waits for this, renders warm up lazily anyway, and a failure here (weasyprint's
+    native libraries missing, an unknown PDF_RENDERER) is only logged and reported on /ready, so
+    it can't take /chat down with it.
+    """
+    try:
+        await app.state.pdf_service.start()
+        if PDF_RENDERER not in app.state.pdf_renderers:
+            raise ValueError(f"PDF_RENDERER={PDF_RENDERER} is not one of {', '.join(app.state.pdf_renderers)}")
+        await asyncio.to_thread(app.state.pdf_renderers[PDF_RENDERER].warm)
+    except Exception as e:
+        logger.exception("PDF warm-up failed")
+        app.state.pdf_warmup_error = str(e)
+
+
+async def get_agent_factory():
+    """The agent factory, waiting for the warm-up to finish building it if it is still running."""
+    warmup = getattr(app.state, "warmup", None)
+    if warmup is not None:
+        await asyncio.shield(warmup)
+    return app.state.agent_factory
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.render_cache = RenderCache(
+        max_bytes=int(os.getenv("RENDER_CACHE_BYTES", 64 * 1024 * 1024)),
+        disk_dir=os.getenv("RENDER_CACHE_DIR") or None
+    )
+    app.state.latex_renderer = IncrementalLatexRenderer(latex_converter)
+    app.state.pdf_service = LatexCompileService(
+        max_concurrency=int(os.getenv("PDF_MAX_CONCURRENCY", 0)) or None,
+        max_pending=int(os.getenv("PDF_MAX_PENDING", 16)),
+        timeout=float(os.getenv("PDF_TIMEOUT", 30)),
+        preamble=latex_converter.generate_preamble()
+    )
+    app.state.pdf_renderers = {
+        "latex": LatexPdfRenderer(latex_converter, app.state.pdf_service, app.state.latex_renderer,
+                                  app.state.render_cache),
+        "html": create_html_renderer()
+    }
+    app.state.batch_executor = create_batch_executor(
+        int(os.getenv("BATCH_MAX_WORKERS", 0)) or None,
+        max_pending=int(os.getenv("BATCH_MAX_PENDING", 256))
+    )
+
+    store = get_store()
+    if hasattr(store, "stats"):
+        register_gauges("resume_session_store", "In-memory session store size and counters.",
+                        store.stats, ["sessions", "bytes", "hits", "misses", "evictions", "expirations"])
+    register_gauges("resume_render_cache", "Rendered LaTeX/PDF cache size and counters.",
+                    app.state.render_cache.stats,
+                    ["entries", "bytes", "hits", "misses", "disk_hits", "evictions", "hit_ratio"])
+    register_gauges("resume_pdf_compiles", "pdflatex compiles running or waiting for a slot.",
+                    app.state.pdf_service.stats, ["in_flight", "max_concurrency", "max_pending"])
+    register_gauges("resume_html_pdf_renders", "weasyprint renders running or waiting for a thread.",
+                    app.state.pdf_renderers["html"].stats, ["in_flight", "max_concurrency", "max_pending"])
+    app.state.pdf_warmup_error = None
+    app.state.warmup = asyncio.create_task(warm_up(app))
+    app.state.pdf_warmup = asyncio.create_task(warm_up_pdf(app))
+    yield
+    app.state.warmup.cancel()
+    app.state.pdf_warmup.cancel()
+    app.state.batch_executor.shutdown(cancel_futures=True)
+    for renderer in app.state.pdf_renderers.values():
+        await renderer.close()
+
+
+app=FastAPI(lifespan=lifespan)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
+latex_converter = LaTeXResumeConverter()
 
 os.environ["OPEN_AI_KEY"] = os.getenv("OPEN_AI_KEY")
 os.environ["OPENAI_API_VERSION"] = os.getenv("OPENAI_API_VERSION")
@@ -28,6 +126,20 @@ os.environ["LANGCHAIN_PROJECT"] = os.getenv("LANGCHAIN_PROJECT")
 os.environ["REDIS_URI"] = os.getenv("REDIS_URI")
 os.environ["LANGCHAIN_TRACING_V2"] = "true"
 
+# Sessions expire after two days without activity
+SESSION_TTL = int(os.getenv("SESSION_TTL", 2 * 24 * 60 * 60))
+# Chat history sent to the model per turn; older turns are summarized when HISTORY_SUMMARY is on
+HISTORY_TOKEN_LIMIT = int(os.getenv("HISTORY_TOKEN_LIMIT", 3000))
+HISTORY_SUMMARY = os.getenv("HISTORY_SUMMARY", "true").lower() == "true"
+# Apply pasted JSON / "key: value" resume input through the tools directly instead of via the model
+STRUCTURED_FAST_PATH = os.getenv("STRUCTURED_FAST_PATH", "true").lower() == "true"
+# Resumes accepted in one /pdf/batch request
+BATCH_MAX_RESUMES = int(os.getenv("BATCH_MAX_RESUMES", 100))
+# PDF backend when a request does not pick one: latex (pdflatex) or html (weasyprint, in-process)
+PDF_RENDERER = os.getenv("PDF_RENDERER", "latex")
+# Bearer token for the /sessions/export and /sessions/import admin endpoints; unset, they answer 404
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
 # Enable Cors
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +149,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    HTTP_SECONDS.observe(
+        time.perf_counter() - start, request.method, route.path if route else "unmatched", response.status_code
+    )
+    return response
+
+
 class ResumeResponse(BaseModel):
     content: str
     resume_data: dict
@@ -44,9 +167,16 @@ class ResumeResponse(BaseModel):
 class ChatRequest(BaseModel):
     query: str
     session_id:str
+    # Return only the resume sections this turn changed, as resume_diff
+    diff: bool = False
 
 class ResumeConversion(BaseModel):
     resume_data:dict
+    # Lets live previews of a chat session reuse the LaTeX of unchanged sections
+    session_id: Optional[str] = None
+
+class BatchConversion(BaseModel):
+    resumes: List[dict]
     
 
 @app.post("/chat")
@@ -54,172 +184,426 @@ async def read_root(request: ChatRequest):
     try:
         query = request.query
         session_id = request.session_id
-        model = AzureChatOpenAI(
-            model="gpt-4",
-            api_key=os.getenv("OPEN_AI_KEY"),
-            api_version=os.getenv("OPENAI_API_VERSION")
-        )
+        agent_factory = await get_agent_factory()
 
-        custom_history = CustomChatMessageHistory(session_id=session_id, ttl=2)
-        store = custom_history.store
-        resume_object = store.get_resume(session_id)
-        
-        system_message = """
-You are an AI-powered resume builder assistant. Your role is to:
-
-1. Collect all required information from the user through a series of questions.
-2. Ensure completeness and ask for missing details when necessary.  
-3. Format responsibilities and project details into structured bullet points using the `format_responsibilities` tool.  
-
-Resume structure (for reference):
-
-{{
-    "personal_info": {{
-        "name": "string",
-        "email": "string",
-        "phone": "string",
-        "github": "string",
-        "linkedin": "string"
-    }},
-    "experience": [{{
-        "company": "string",
-        "title": "string",
-        "start_date": "string",
-        "end_date": "string or null",
-        "job_type": "string",
-        "responsibilities": ["string"]
-    }}],
-    "education": [{{
-        "institution": "string",
-        "location": "string or null",
-        "degree": "string",
-        "graduation_date": "string"
-    }}],
-    "projects": [{{
-        "title": "string",
-        "tech_stack": ["string"],
-        "features": ["string"],
-        "duration": "string"
-    }}],
-    "skills": {{
-        "languages": ["string"],
-        "frameworks": ["string"],
-        "developer_tools": ["string"],
-        "libraries": ["string"]
-    }}
-}}
-
-"""
-
-        memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            chat_memory=custom_history, 
-            return_messages=True
-        )
-
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", system_message),
-            MessagesPlaceholder("chat_history", optional=True),
-            ("human", "{input}"),
-            MessagesPlaceholder(variable_name='agent_scratchpad')
-        ])
-
-        @tool
-        def format_responsibilities(text: str) -> List[str]:
-            """Breaks down long text into well-structured, impactful bullet points for better readability."""
-            try:
-                format_large_prompt = PromptTemplate.from_template("""
-                Transform the following text into **at least 5 strong, impactful bullet points** based on these rules:
-                - **Start with powerful action verbs** (e.g., "Developed", "Optimized", "Implemented").
-                - **Include measurable impact** (e.g., "Increased efficiency by 30%").
-                - **Focus on achievements rather than generic tasks**.
-                - **Use present tense for current roles, past tense for previous roles**.
-                - **Keep each bullet concise (10-15 words max)**.
-
-                Text to transform:  
-                {text}
-                
-                **Return only the bullet points, one per line, starting with '- '**
-                """)
-                result = model.invoke(format_large_prompt.format(text=text))
-                return result.content.split("\n")
-            except Exception as e:
-                return [f"Error breaking into bullet points: {str(e)}"]
-
-        tools = [
-            PersonalInformation(resume=resume_object),
-            ExperienceTool(resume=resume_object),
-            EducationTool(resume=resume_object),
-            SkillsTool(resume=resume_object),
-            ProjectsTool(resume=resume_object),
-            format_responsibilities
-        ]
-        
-        agent = create_tool_calling_agent(
-            llm=model,
-            tools=tools,
-            prompt=prompt,
+        custom_history = CustomChatMessageHistory(
+            session_id=session_id,
+            ttl=SESSION_TTL,
+            max_token_limit=HISTORY_TOKEN_LIMIT,
+            summarizer=agent_factory.model if HISTORY_SUMMARY else None,
+            optimistic=True,
+            # The turn's messages are written with its resume edits, in one transaction
+            defer_writes=True
         )
-        
-        agent_executor = AgentExecutor(
-            agent=agent,
-            tools=tools,
-            verbose=True,
-            memory=memory,
-            handle_parsing_errors=True
-        )
-        
-        response = agent_executor.invoke({"input": query})
+        store = custom_history.store
+        # Turns of one session run one at a time in this worker; versioning catches other workers
+        async with store.lock(session_id):
+            with stage_timer("store_read"):
+                resume_object = await store.aget_resume(session_id)
+            before = resume_object.data.section_fingerprints() if request.diff else None
 
-        # Save updated resume data back to Redis
-        store.update_resume(session_id, resume_object.resume_data)
-        print("Stored Messages:", [str(msg) for msg in custom_history.messages])
-        print("Raw Stored Data:", store.get_messages(session_id))      
+            response = None
+            if STRUCTURED_FAST_PATH:
+                with stage_timer("structured_input"):
+                    response = await agent_factory.aapply_structured(query, resume_object, custom_history)
+            if response is None:
+                response = await agent_factory.ainvoke(query, resume_object, custom_history)
+            resume_data = resume_object.resume_data
+            # Save the exchange and append this turn's resume edits to the session's event log
+            version = await custom_history.acommit_turn(resume_object, resume_data)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Stored messages for %s: %s", session_id, [str(msg) for msg in await custom_history.aget_messages()])
+        if request.diff:
+            return {
+                "content": response['output'],
+                "resume_diff": diff_sections(before, resume_data, resume_object.data.section_fingerprints()),
+                "version": version
+            }
         try:
-            return {"content": response['output'], "resume_data": resume_object.resume_data}
+            return {"content": response['output'], "resume_data": resume_data, "version": version}
         except json.JSONDecodeError:
-            return {"content": response['output'], "resume_data": resume_object.resume_data}
+            return {"content": response['output'], "resume_data": resume_data, "version": version}
         
+    except VersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
 
-    temp_dir = tempfile.mkdtemp()  # Temporary directory for files
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Same turn as /chat, streamed as Server-Sent Events: token, tool_start, tool_end, then resume_data."""
+    query = request.query
+    session_id = request.session_id
+    agent_factory = await get_agent_factory()
+
+    custom_history = CustomChatMessageHistory(
+        session_id=session_id,
+        ttl=SESSION_TTL,
+        max_token_limit=HISTORY_TOKEN_LIMIT,
+        summarizer=agent_factory.model if HISTORY_SUMMARY else None,
+        optimistic=True,
+        defer_writes=True
+    )
+    store = custom_history.store
+
+    async def event_stream():
+        output = ""
+        try:
+            async with store.lock(session_id):
+                with stage_timer("store_read"):
+                    resume_object = await store.aget_resume(session_id)
+                response = None
+                if STRUCTURED_FAST_PATH:
+                    with stage_timer("structured_input"):
+                        response = await agent_factory.aapply_structured(query, resume_object, custom_history)
+                if response is not None:
+                    output = response["output"]
+                    for name, args, result in response["tool_calls"]:
+                        yield sse_event("tool_start", {"name": name, "input": args})
+                        yield sse_event("tool_end", {"name": name, "output": result})
+                    yield sse_event("token", {"content": output})
+                else:
+                    async for event in agent_factory.astream_events(query, resume_object, custom_history):
+                        kind = event["event"]
+                        if kind == "on_chat_model_stream":
+                            content = event["data"]["chunk"].content
+                            if content:
+                                yield sse_event("token", {"content": content})
+                        elif kind == "on_tool_start":
+                            yield sse_event("tool_start", {"name": event["name"], "input": event["data"].get("input")})
+                        elif kind == "on_tool_end":
+                            yield sse_event("tool_end", {"name": event["name"], "output": event["data"].get("output")})
+                        elif kind == "on_chain_end" and not event["parent_ids"]:
+                            output = event["data"]["output"]["output"]
+
+                resume_data = resume_object.resume_data
+                version = await custom_history.acommit_turn(resume_object, resume_data)
+            yield sse_event("resume_data", {
+                "content": output, "resume_data": resume_data, "version": version
+            })
+        except Exception as e:
+            logger.exception("Streaming chat failed")
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def require_session(store, session_id: str):
+    """404 for a session that doesn't exist, rather than creating an empty one by reading it."""
+    if not await store.ahas_session(session_id):
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+
+
+@app.get("/sessions/{session_id}/resume")
+async def get_session_resume(session_id: str, version: Optional[int] = None):
+    """The session's resume, or with ?version=N the resume as it was at that version."""
+    store = get_store()
+    await require_session(store, session_id)
     try:
-        latex_content = generate_latex_content(request.resume_data)
-        tex_file = os.path.join(temp_dir, "resume.tex")
-        pdf_file = os.path.join(temp_dir, "resume.pdf")
-        
-        logger.info("Writing LaTeX content to %s", tex_file)
-        with open(tex_file, "w") as f:
-            f.write(latex_content)
-        
-        logger.info("Compiling LaTeX to PDF")
-        result = subprocess.run(
-            ["pdflatex", "-output-directory", temp_dir, tex_file],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=30  # 30-second timeout
+        if version is None:
+            resume_object = await store.aget_resume(session_id)
+        else:
+            resume_object = await store.aget_resume_at(session_id, version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"version": resume_object.version, "resume_data": resume_object.resume_data}
+
+
+@app.get("/sessions/{session_id}/events")
+async def get_session_events(session_id: str, start: int = 0):
+    """The resume edit events of a session from index `start` on."""
+    store = get_store()
+    await require_session(store, session_id)
+    version, events = await store.aget_events(session_id, start)
+    return {"version": version, "events": events}
+
+
+@app.post("/sessions/{session_id}/undo")
+async def undo_session_edits(session_id: str, steps: int = 1):
+    """Revert the last `steps` resume edits; the revert is itself an edit that can be undone."""
+    store = get_store()
+    async with store.lock(session_id):
+        await require_session(store, session_id)
+        try:
+            version = await store.aundo(session_id, steps, ttl=SESSION_TTL)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"version": version, "resume_data": (await store.aget_resume(session_id)).resume_data}
+
+
+def require_admin(authorization: Optional[str] = Header(None)):
+    """Allow the request only with "Authorization: Bearer <ADMIN_TOKEN>"."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.strip().encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token", headers={"WWW-Authenticate": "Bearer"})
+
+
+@app.get("/sessions/export", dependencies=[Depends(require_admin)])
+async def export_sessions(batch_size: int = 100):
+    """Stream every session as NDJSON: one {"session_id", "messages", "base", "events", "resume_data", "version"} per line.
+
+    Sessions are read from the store `batch_size` at a time, so memory is bounded by one batch.
+    The last line is {"summary": {"sessions", "seconds", "sessions_per_second"}}.
+    """
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be at least 1")
+    store = get_store()
+
+    async def ndjson_lines():
+        start = time.perf_counter()
+        exported = 0
+        async for batch in store.aexport_sessions(batch_size):
+            exported += len(batch)
+            yield "".join(json.dumps(record) + "\n" for record in batch)
+        elapsed = time.perf_counter() - start
+        logger.info("Exported %d sessions in %.2fs", exported, elapsed)
+        yield json.dumps({"summary": {
+            "sessions": exported,
+            "seconds": elapsed,
+            "sessions_per_second": exported / elapsed if elapsed else 0.0
+        }}) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+@app.post("/sessions/import", dependencies=[Depends(require_admin)])
+async def import_sessions(http_request: Request, batch_size: int = 100):
+    """Create or replace sessions from an NDJSON body in the /sessions/export format.
+
+    The body is read as it arrives and written to the store `batch_size` sessions at a time.
+    A record may carry only session_id, messages and resume_data to seed a session at version 0.
+    Lines that fail to parse, decode or replay are skipped and counted in "failed"; the first 100
+    are described in "errors". Each batch waits for chat turns on its sessions to finish.
+    """
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be at least 1")
+    store = get_store()
+    start = time.perf_counter()
+    imported = failed = 0
+    errors = []
+    batch = []
+
+    def fail(error: dict):
+        nonlocal failed
+        failed += 1
+        # Enough to find the bad lines without keeping or echoing a huge error list
+        if len(errors) < 100:
+            errors.append(error)
+
+    def parse(line_number, line):
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            fail({"line": line_number, "error": str(e)})
+            return
+        if not isinstance(record, dict) or "summary" in record:
+            return
+        if not isinstance(record.get("session_id"), str) or not all(
+            isinstance(record.get(key) or [], list) for key in ("messages", "events")
+        ):
+            fail({"line": line_number, "error": "session_id, messages or events missing or malformed"})
+            return
+        batch.append(record)
+
+    async def flush():
+        nonlocal imported, batch
+        if batch:
+            # Replace sessions between chat turns, never in the middle of one; sorted, so two
+            # imports of overlapping batches can't deadlock
+            async with AsyncExitStack() as locks:
+                for session_id in sorted({record["session_id"] for record in batch}):
+                    await locks.enter_async_context(store.lock(session_id))
+                with stage_timer("session_import"):
+                    failures = await store.aimport_sessions(batch, ttl=SESSION_TTL)
+            imported += len(batch) - len(failures)
+            for session_id, error in failures:
+                fail({"session_id": session_id, "error": error})
+            batch = []
+
+    buffer = b""
+    line_number = 0
+    async for chunk in http_request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                parse(line_number, line)
+            if len(batch) >= batch_size:
+                await flush()
+    if buffer.strip():
+        parse(line_number + 1, buffer)
+    await flush()
+
+    elapsed = time.perf_counter() - start
+    logger.info("Imported %d sessions in %.2fs, %d errors", imported, elapsed, failed)
+    return {
+        "imported": imported,
+        "failed": failed,
+        "errors": errors,
+        "seconds": elapsed,
+        "sessions_per_second": imported / elapsed if elapsed else 0.0
+    }
+
+
+def get_pdf_renderer(name: Optional[str] = None):
+    try:
+        return app.state.pdf_renderers[name or PDF_RENDERER]
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"renderer must be one of {', '.join(app.state.pdf_renderers)}")
+
+
+async def render_resume_pdf(resume_data: dict, session_id: Optional[str] = None, renderer=None):
+    """Return the content hash and PDF for `resume_data`, rendering only when the cache has no copy."""
+    renderer = renderer or get_pdf_renderer()
+    render_cache = app.state.render_cache
+    key = resume_content_hash(resume_data, renderer.cache_version)
+    pdf_content = render_cache.get_pdf(key)
+    if pdf_content is None:
+        pdf_content = await renderer.render(resume_data, session_id, cache_key=key)
+        render_cache.put_pdf(key, pdf_content)
+    return key, pdf_content
+
+
+# One entity-tag in an If-None-Match list; the opaque part may itself contain commas
+ENTITY_TAG = re.compile(r'\s*(?:W/)?"([^"]*)"\s*(?:,|$)')
+
+
+def if_none_match_matches(if_none_match: str, key: str) -> bool:
+    """Whether an If-None-Match header matches the ETag `"key"`, by weak comparison (RFC 9110 13.1.2).
+
+    Weak comparison ignores the W/ prefix on either side; "*" matches any current representation.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return any(match.group(1) == key for match in ENTITY_TAG.finditer(if_none_match))
+
+
+@app.post("/pdf")
+async def generate_pdf(request: ResumeConversion, http_request: Request, format: str = "pdf",
+                       renderer: Optional[str] = None):
+    """Return the resume as application/pdf (default) or, with ?format=base64, as base64 inside JSON.
+
+    ?renderer=latex|html picks the backend, defaulting to PDF_RENDERER.
+
+    The ETag is the resume content hash, so a client sending it back in If-None-Match gets a 304
+    without the PDF being rendered or sent again.
+    """
+    pdf_renderer = get_pdf_renderer(renderer)
+    try:
+        key = resume_content_hash(request.resume_data, pdf_renderer.cache_version)
+        etag = f'"{key}"'
+        if if_none_match_matches(http_request.headers.get("if-none-match", ""), key):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        _, pdf_content = await render_resume_pdf(request.resume_data, request.session_id, pdf_renderer)
+        if format == "base64":
+            return Response(
+                content=json.dumps({
+                    "message": "PDF generated successfully",
+                    "pdf": base64.b64encode(pdf_content).decode("ascii")
+                }),
+                media_type="application/json",
+                headers={"ETag": etag}
+            )
+        return Response(
+            content=pdf_content,
+            media_type="application/pdf",
+            headers={
+                "ETag": etag,
+                "Cache-Control": "private, no-cache",
+                "Content-Disposition": 'inline; filename="resume.pdf"'
+            }
         )
-        
-        if not os.path.exists(pdf_file):
-            raise Exception(f"PDF file not generated: {result.stderr.decode()}")
-        
-        logger.info("Reading PDF content")
-        with open(pdf_file, "rb") as f:
-            pdf_content = f.read()
-        
-        return {
-            "message": "PDF generated successfully",
-            "pdf": pdf_content.hex()
-        }
-    except subprocess.TimeoutExpired as e:
-        raise HTTPException(status_code=500, detail=f"PDF generation timed out: {e.stderr.decode()}")
-    except subprocess.CalledProcessError as e:
-        raise HTTPException(status_code=500, detail=f"PDF generation failed: {e.stderr.decode()}")
+    except CompileQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        logger.info("Cleaning up temporary directory %s", temp_dir)
-        shutil.rmtree(temp_dir, ignore_errors=True)
\ No newline at end of file
+
+
+@app.post("/pdf/batch")
+async def generate_pdf_batch(request: BatchConversion, format: str = "zip"):
+    """Render many resumes on the process pool, streamed as they finish.
+
+    format=zip (default) streams a ZIP with resume-<index>.pdf, or resume-<index>.error.txt for a
+    resume that failed; format=ndjson streams one JSON line per resume with base64 PDF or error.
+
+    A batch may hold at most BATCH_MAX_RESUMES resumes (413 otherwise); while other batches keep
+    the process pool busy past BATCH_MAX_PENDING resumes, the request gets a 429.
+    """
+    if format not in ("zip", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be zip or ndjson")
+    if len(request.resumes) > BATCH_MAX_RESUMES:
+        raise HTTPException(status_code=413, detail=f"A batch may hold at most {BATCH_MAX_RESUMES} resumes")
+    try:
+        app.state.batch_executor.check_capacity(len(request.resumes))
+    except BatchQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    results = arender_batch(request.resumes, app.state.batch_executor)
+
+    if format == "zip":
+        return StreamingResponse(
+            stream_zip(results),
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="resumes.zip"'}
+        )
+
+    async def ndjson_lines():
+        async for result in results:
+            if result.error is None:
+                line = {"index": result.index, "ok": True, "pdf": base64.b64encode(result.pdf).decode("ascii")}
+            else:
+                line = {"index": result.index, "ok": False, "error": result.error}
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+@app.get("/pdf/cache")
+async def pdf_cache_stats():
+    return app.state.render_cache.stats()
+
+
+@app.get("/bullets/cache")
+async def bullet_cache_stats():
+    return (await get_agent_factory()).bullet_formatter.stats()
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness: 200 once the agent is warmed up, 503 while starting or if its warm-up failed.
+
+    The PDF warm-up is reported alongside but doesn't gate readiness; a PDF backend that
+    failed to warm up only fails /pdf.
+    """
+    warmup = app.state.warmup
+    if not warmup.done():
+        return JSONResponse(status_code=503, content={"status": "cold"})
+    if warmup.cancelled() or warmup.exception() is not None:
+        detail = "cancelled" if warmup.cancelled() else str(warmup.exception())
+        return JSONResponse(status_code=503, content={"status": "failed", "detail": detail})
+    return {
+        "status": "warm",
+        "startup_seconds": app.state.startup_seconds,
+        "pdf_renderer": PDF_RENDERER,
+        "pdf_warm": app.state.pdf_warmup.done() and app.state.pdf_warmup_error is None,
+        "pdf_preamble_warm": app.state.pdf_service.warm,
+        "pdf_warmup_error": app.state.pdf_warmup_error
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Stage timings, token counts and cache/store gauges in the Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,216 @@
+import bisect
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Seconds; spans cache hits (sub-millisecond) up to slow LLM round trips and cold pdflatex runs
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> Iterable[str]:
+        return ()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, *labels):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Gauge(Metric):
+    """A gauge read at scrape time from `collect`, which returns {label values tuple: value}."""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), collect: Optional[Callable[[], Dict[Tuple, float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def samples(self):
+        if self.collect is None:
+            return
+        for labels, value in self.collect().items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [count per bucket (last one is +Inf), sum]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        series = self._values.get(labels)
+        if series is None:
+            series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def samples(self):
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            cumulative += counts[-1]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {total}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Timer:
+    """Context manager observing the elapsed perf_counter time into a histogram."""
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: Tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "resume_stage_seconds", "Time spent per request stage.", ["stage"]
+))
+TOOL_SECONDS = REGISTRY.register(Histogram(
+    "resume_tool_seconds", "Time spent per agent tool call.", ["tool"]
+))
+HTTP_SECONDS = REGISTRY.register(Histogram(
+    "resume_http_request_seconds", "Time to response headers per route.", ["method", "route", "status"]
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "resume_llm_tokens_total", "Tokens reported by the chat model.", ["kind"]
+))
+
+
+def stage_timer(stage: str) -> Timer:
+    """Time a block as one request stage: with stage_timer("store_read"): ..."""
+    return Timer(STAGE_SECONDS, (stage,))
+
+
+def register_gauges(name: str, documentation: str, stats: Callable[[], dict], keys: Sequence[str]):
+    """Expose selected numeric fields of a stats() dict as one gauge labelled by field."""
+    def collect():
+        values = stats()
+        return {(key,): values[key] for key in keys if isinstance(values.get(key), (int, float))}
+
+    REGISTRY.register(Gauge(name, documentation, ["field"], collect))
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """LangChain callbacks feeding the LLM, prompt and tool timings and token counts."""
+    run_inline = True
+
+    def __init__(self):
+        self._started: Dict = {}
+
+    def _start(self, run_id, label):
+        self._started[run_id] = (time.perf_counter(), label)
+
+    def _end(self, run_id, histogram):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            histogram.observe(time.perf_counter() - started[0], started[1])
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, "llm")
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, "llm")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._end(run_id, STAGE_SECONDS)
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens, completion_tokens = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+        if not usage:
+            for generations in response.generations:
+                for generation in generations:
+                    metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    prompt_tokens += metadata.get("input_tokens", 0)
+                    completion_tokens += metadata.get("output_tokens", 0)
+        if prompt_tokens:
+            LLM_TOKENS.inc(prompt_tokens, "prompt")
+        if completion_tokens:
+            LLM_TOKENS.inc(completion_tokens, "completion")
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, STAGE_SECONDS)
+
+    def on_chain_start(self, serialized, inputs, *, run_id, **kwargs):
+        if kwargs.get("name") == "ChatPromptTemplate":
+            self._start(run_id, "prompt_build")
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id, STAGE_SECONDS)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, STAGE_SECONDS)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id, kwargs.get("name") or (serialized or {}).get("name", "unknown"))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id, TOOL_SECONDS)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, TOOL_SECONDS)
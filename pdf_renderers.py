@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from metrics import stage_timer
+from pdf_service import CompileError, CompileQueueFull
+from tools.html_converter import STYLESHEET, HtmlResumeConverter
+
+logger = logging.getLogger(__name__)
+
+
+class PdfRenderer:
+    """A PDF backend: turns resume_data into PDF bytes.
+
+    `cache_version` goes into the render cache key and ETag, so the same resume rendered by two
+    backends (or two template versions) never shares a cached PDF.
+    """
+    name = ""
+    cache_version = ""
+
+    async def render(self, resume_data: dict, session_id: Optional[str] = None,
+                     cache_key: Optional[str] = None) -> bytes:
+        """`cache_key` is the content hash the caller already computed, for caching intermediates."""
+        raise NotImplementedError
+
+    def warm(self):
+        """Load whatever the first render would otherwise pay for; called from the startup warm-up."""
+
+    def stats(self) -> dict:
+        return {}
+
+    async def close(self):
+        pass
+
+
+class LatexPdfRenderer(PdfRenderer):
+    """LaTeXResumeConverter + pdflatex through the LatexCompileService worker pool."""
+    name = "latex"
+
+    def __init__(self, converter, compile_service, incremental_renderer=None, render_cache=None):
+        self.converter = converter
+        self.compile_service = compile_service
+        self.incremental_renderer = incremental_renderer
+        self.render_cache = render_cache
+        # Same key as before renderers were pluggable, so existing cached PDFs stay valid
+        self.cache_version = converter.TEMPLATE_VERSION
+
+    def latex(self, resume_data: dict, session_id: Optional[str] = None) -> str:
+        with stage_timer("latex"):
+            if session_id and self.incremental_renderer is not None:
+                return self.incremental_renderer.render(session_id, resume_data)
+            return self.converter.convert_json_to_latex(resume_data)
+
+    async def render(self, resume_data, session_id=None, cache_key=None):
+        latex_content = None
+        if cache_key and self.render_cache is not None:
+            latex_content = self.render_cache.get_latex(cache_key)
+        if latex_content is None:
+            latex_content = self.latex(resume_data, session_id)
+            if cache_key and self.render_cache is not None:
+                self.render_cache.put_latex(cache_key, latex_content)
+        return await self.compile_service.compile(latex_content)
+
+    def stats(self) -> dict:
+        return self.compile_service.stats()
+
+    async def close(self):
+        await self.compile_service.close()
+
+
+class HtmlPdfRenderer(PdfRenderer):
+    """HtmlResumeConverter + weasyprint, rendered in-process straight into a bytes buffer.
+
+    No subprocess, temp files or TeX installation. The parsed STYLESHEET and the font
+    configuration are built once and shared by every render. weasyprint layout is pure Python
+    and holds the GIL, so renders run on `max_concurrency` threads (default 1) just to keep the
+    event loop responsive; scale PDF throughput with worker processes. Like the LaTeX service,
+    at most `max_pending` renders wait for a thread before CompileQueueFull is raised.
+    """
+    name = "html"
+
+    def __init__(self, converter: Optional[HtmlResumeConverter] = None,
+                 max_concurrency: int = 1, max_pending: int = 16):
+        self.converter = converter or HtmlResumeConverter()
+        self.cache_version = f"html-{self.converter.TEMPLATE_VERSION}"
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="html-pdf")
+        self._in_flight = 0
+        self._stylesheet = None
+        self._font_config = None
+
+    def warm(self):
+        # Importing weasyprint (cairo/pango bindings) and parsing the stylesheet dominate the first render
+        if self._stylesheet is not None:
+            return
+        from weasyprint import CSS
+        try:
+            from weasyprint.text.fonts import FontConfiguration
+        except ImportError:
+            # weasyprint < 53
+            from weasyprint.fonts import FontConfiguration
+        font_config = FontConfiguration()
+        self._stylesheet = CSS(string=STYLESHEET, font_config=font_config)
+        self._font_config = font_config
+
+    def render_sync(self, resume_data: dict) -> bytes:
+        from weasyprint import HTML
+
+        self.warm()
+        html_content = self.converter.convert_json_to_html(resume_data)
+        with stage_timer("weasyprint"):
+            pdf_content = HTML(string=html_content).write_pdf(
+                stylesheets=[self._stylesheet], font_config=self._font_config
+            )
+        if not pdf_content:
+            raise CompileError("weasyprint produced no PDF")
+        return pdf_content
+
+    async def render(self, resume_data, session_id=None, cache_key=None):
+        if self._in_flight >= self.max_concurrency + self.max_pending:
+            raise CompileQueueFull(f"{self._in_flight} PDF renders already running or queued")
+        self._in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self.render_sync, resume_data)
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "max_pending": self.max_pending,
+            "warm": self._stylesheet is not None
+        }
+
+    async def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_html_renderer() -> HtmlPdfRenderer:
+    return HtmlPdfRenderer(
+        max_concurrency=int(os.getenv("HTML_PDF_THREADS", 1)),
+        max_pending=int(os.getenv("PDF_MAX_PENDING", 16))
+    )
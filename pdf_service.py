@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+from typing import List, Optional
+
+from metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+# Name of the dumped preamble format, loaded with -fmt=FORMAT_NAME
+FORMAT_NAME = "resume_preamble"
+
+
+def format_dump_command(directory: str, preamble: str, pdflatex: str = "pdflatex") -> List[str]:
+    """Write `preamble` to `directory`; returns the pdflatex command (run there) that dumps it to FORMAT_NAME.fmt."""
+    with open(os.path.join(directory, "preamble.tex"), "w") as f:
+        f.write(preamble)
+        f.write("\n\\begin{document}\n\\end{document}\n")
+    return [pdflatex, "-ini", "-interaction=nonstopmode", "-halt-on-error",
+            f"-jobname={FORMAT_NAME}", "&pdflatex", "mylatexformat.ltx", "preamble.tex"]
+
+
+class CompileQueueFull(Exception):
+    """Raised when every compile slot is busy and the wait queue is full."""
+
+
+class CompileTimeout(Exception):
+    """Raised when pdflatex runs past the timeout and is killed."""
+
+
+class CompileError(Exception):
+    """Raised when pdflatex fails or produces no PDF."""
+
+
+class LatexCompileService:
+    """Compiles LaTeX to PDF with pdflatex subprocesses, without blocking the event loop.
+
+    At most `max_concurrency` compiles run at once and at most `max_pending` more may wait for
+    a slot; beyond that `compile` raises CompileQueueFull straight away. A compile that runs
+    longer than `timeout` seconds is killed.
+
+    Each slot is a long-lived worker directory. When `preamble` is given, `start` dumps it once
+    into a format file (mylatexformat) that every worker loads, so a render skips re-reading the
+    preamble packages and only typesets the document body. If the dump fails, compiles run cold.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, max_pending: int = 16,
+                 timeout: float = 30, pdflatex: str = "pdflatex", preamble: Optional[str] = None):
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pdflatex = pdflatex
+        self.preamble = preamble
+        self.warm = False
+        self._in_flight = 0
+        self._root = None
+        self._workers = None
+        self._start_lock = asyncio.Lock()
+
+    async def start(self):
+        """Create the worker directories and dump the preamble format."""
+        async with self._start_lock:
+            if self._workers is not None:
+                return
+            self._root = tempfile.mkdtemp(prefix="latex-workers-")
+            if self.preamble:
+                try:
+                    await self._dump_format()
+                    self.warm = True
+                except (CompileError, CompileTimeout, OSError) as e:
+                    logger.warning("Could not precompile the LaTeX preamble, compiling cold: %s", e)
+
+            workers = asyncio.Queue()
+            for i in range(self.max_concurrency):
+                work_dir = os.path.join(self._root, f"worker-{i}")
+                os.makedirs(work_dir)
+                if self.warm:
+                    os.symlink(self._format_path(), os.path.join(work_dir, f"{FORMAT_NAME}.fmt"))
+                workers.put_nowait(work_dir)
+            self._workers = workers
+
+    async def close(self):
+        if self._root:
+            shutil.rmtree(self._root, ignore_errors=True)
+        self._root = None
+        self._workers = None
+        self.warm = False
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "max_pending": self.max_pending,
+            "warm": self.warm
+        }
+
+    def _format_path(self) -> str:
+        return os.path.join(self._root, f"{FORMAT_NAME}.fmt")
+
+    async def _dump_format(self):
+        logger.info("Dumping LaTeX preamble format to %s", self._format_path())
+        output, returncode = await self._run(format_dump_command(self._root, self.preamble, self.pdflatex), self._root)
+        if returncode != 0 or not os.path.exists(self._format_path()):
+            raise CompileError(f"Format dump failed: {output[-2000:]}")
+
+    async def _run(self, args: List[str], cwd: str):
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            cwd=cwd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            # Kill overtime (or abandoned) compiles so they don't keep burning CPU
+            process.kill()
+            await process.wait()
+            if isinstance(e, asyncio.TimeoutError):
+                raise CompileTimeout(f"PDF generation timed out after {self.timeout}s")
+            raise
+        return stdout.decode(errors="replace"), process.returncode
+
+    async def compile(self, latex_content: str) -> bytes:
+        if self._in_flight >= self.max_concurrency + self.max_pending:
+            raise CompileQueueFull(f"{self._in_flight} PDF compiles already running or queued")
+        self._in_flight += 1
+        try:
+            if self._workers is None:
+                await self.start()
+            work_dir = await self._workers.get()
+            try:
+                return await self._compile(latex_content, work_dir)
+            finally:
+                self._workers.put_nowait(work_dir)
+        finally:
+            self._in_flight -= 1
+
+    async def _compile(self, latex_content: str, work_dir: str) -> bytes:
+        tex_file = os.path.join(work_dir, "resume.tex")
+        pdf_file = os.path.join(work_dir, "resume.pdf")
+        try:
+            logger.info("Writing LaTeX content to %s", tex_file)
+            with open(tex_file, "w") as f:
+                f.write(latex_content)
+
+            logger.info("Compiling LaTeX to PDF")
+            args = [self.pdflatex, "-interaction=nonstopmode", "-halt-on-error"]
+            if self.warm:
+                args.append(f"-fmt={FORMAT_NAME}")
+            with stage_timer("pdflatex"):
+                output, returncode = await self._run(args + ["resume.tex"], work_dir)
+
+            if returncode != 0 or not os.path.exists(pdf_file):
+                raise CompileError(f"PDF generation failed: {output[-2000:]}")
+
+            logger.info("Reading PDF content")
+            with open(pdf_file, "rb") as f:
+                return f.read()
+        finally:
+            # Leave the worker directory holding only the format link for the next render
+            for name in os.listdir(work_dir):
+                if not name.endswith(".fmt"):
+                    os.remove(os.path.join(work_dir, name))
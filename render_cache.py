@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def resume_content_hash(resume_data: dict, template_version: str) -> str:
+    """Canonical hash of a resume: key order and whitespace don't change it, the template version does."""
+    canonical = json.dumps(resume_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{template_version}\n{canonical}".encode()).hexdigest()
+
+
+def _canonical(value) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+
+
+def section_fingerprints(resume_data: dict) -> Dict[str, str]:
+    """Fingerprint of every top-level resume_data section."""
+    return {key: hashlib.blake2b(_canonical(value), digest_size=16).hexdigest() for key, value in resume_data.items()}
+
+
+def diff_sections(before: Dict[str, str], resume_data: dict, after: Optional[Dict[str, str]] = None) -> dict:
+    """The sections of `resume_data` whose fingerprint differs from `before`.
+
+    `after` is the fingerprints of `resume_data` when the caller already has them, e.g. from
+    ResumeData.section_fingerprints; `before` must then come from the same place.
+    """
+    if after is None:
+        after = section_fingerprints(resume_data)
+    return {key: resume_data[key] for key, fingerprint in after.items() if before.get(key) != fingerprint}
+
+
+class IncrementalLatexRenderer:
+    """Renders a session's resume to LaTeX, regenerating only the sections that changed.
+
+    Each session keeps a fingerprint and the rendered LaTeX fragment per section (LRU over
+    `max_sessions`); a tool call that touches one section makes only that section dirty.
+    Output is identical to `converter.convert_json_to_latex`.
+    """
+
+    def __init__(self, converter, max_sessions: int = 1024):
+        self.converter = converter
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # session_id -> {section: (fingerprint, fragment)}
+        self.sections_rendered = 0
+        self.sections_reused = 0
+
+    def render(self, session_id: str, resume_data: dict) -> str:
+        if any(key not in self.converter.SECTION_ORDER for key in resume_data):
+            # Legacy or unknown keys are only handled by the full converter
+            return self.converter.convert_json_to_latex(resume_data)
+
+        fragments = self._sessions.get(session_id)
+        if fragments is None:
+            fragments = self._sessions[session_id] = {}
+            if len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+
+        chunks = [self.converter.generate_preamble(), "\\begin{document}\n"]
+        fingerprints = section_fingerprints(resume_data)
+        for key in self.converter.SECTION_ORDER:
+            if key not in resume_data:
+                continue
+            cached = fragments.get(key)
+            if cached is not None and cached[0] == fingerprints[key]:
+                fragment = cached[1]
+                self.sections_reused += 1
+            else:
+                fragment = self.converter.render_section(key, resume_data[key])
+                fragments[key] = (fingerprints[key], fragment)
+                self.sections_rendered += 1
+            if fragment:
+                chunks.append(fragment)
+        chunks.append("\\end{document}")
+        return "\n".join(chunks)
+
+    def discard(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+
+class RenderCache:
+    """Generated LaTeX and compiled PDFs keyed by resume content hash.
+
+    The memory tier is an LRU bounded by `max_bytes`. When `disk_dir` is set, entries are also
+    written there and read back on a memory miss, so they survive restarts and can be shared by
+    workers on the same host.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self._entries = OrderedDict()  # (key, kind) -> bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _disk_path(self, key: str, kind: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.{kind}")
+
+    def _remember(self, entry_key, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        if entry_key in self._entries:
+            self.current_bytes -= len(self._entries.pop(entry_key))
+        self._entries[entry_key] = value
+        self.current_bytes += len(value)
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= len(evicted)
+            self.evictions += 1
+
+    def _get(self, key: str, kind: str) -> Optional[bytes]:
+        entry_key = (key, kind)
+        value = self._entries.get(entry_key)
+        if value is not None:
+            self._entries.move_to_end(entry_key)
+            self.hits += 1
+            return value
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key, kind), "rb") as f:
+                    value = f.read()
+            except FileNotFoundError:
+                value = None
+            if value is not None:
+                self.disk_hits += 1
+                self._remember(entry_key, value)
+                return value
+        self.misses += 1
+        return None
+
+    def _put(self, key: str, kind: str, value: bytes):
+        self._remember((key, kind), value)
+        if self.disk_dir:
+            # Write then rename so concurrent readers never see a partial file
+            fd, temp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(temp_path, self._disk_path(key, kind))
+
+    def get_latex(self, key: str) -> Optional[str]:
+        value = self._get(key, "tex")
+        return value.decode() if value is not None else None
+
+    def put_latex(self, key: str, latex_content: str):
+        self._put(key, "tex", latex_content.encode())
+
+    def get_pdf(self, key: str) -> Optional[bytes]:
+        return self._get(key, "pdf")
+
+    def put_pdf(self, key: str, pdf_content: bytes):
+        self._put(key, "pdf", pdf_content)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0
+        }
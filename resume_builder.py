@@ -1,7 +1,41 @@
+from contextvars import ContextVar
+from typing import Optional
+from event_log import append_to_section, set_section
+from resume_model import ResumeData
+
+
 class Resume:
-    def __init__(self):
-          self.resume_data = {"personal_section": {},
-                            "experience_section": [],
-                            "education_section": {},
-                            "skills_section": [],
-                            "projects_section": []}
\ No newline at end of file
+    def __init__(self, data: Optional[ResumeData] = None, version: Optional[int] = None):
+          self.data = data if data is not None else ResumeData()
+          # Store version the resume was read at, for optimistic writes
+          self.version = version
+          # Edit events applied since it was read, for the store to append
+          self.pending_events = []
+
+    @property
+    def resume_data(self) -> dict:
+        """The resume as a plain dict, for JSON responses and the converters."""
+        return self.data.to_dict()
+
+    @resume_data.setter
+    def resume_data(self, resume_data: dict):
+        self.data = ResumeData.from_dict(resume_data)
+
+    def apply(self, event: dict):
+        """Apply a resume edit event and keep it for the next store write."""
+        self.data = self.data.apply(event)
+        self.pending_events.append(event)
+
+    def set_section(self, section: str, value):
+        """Replace a section with a resume_model object and record it as a set event."""
+        self.data.set_section(section, value)
+        self.pending_events.append(set_section(section, value.to_dict()))
+
+    def append_to_section(self, section: str, value):
+        """Append a resume_model entry to a list section and record it as an append event."""
+        self.data.append_to_section(section, value)
+        self.pending_events.append(append_to_section(section, value.to_dict()))
+
+
+# Resume the shared tools operate on for the current request
+current_resume: ContextVar[Optional[Resume]] = ContextVar("current_resume", default=None)
@@ -0,0 +1,279 @@
+import copy
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+# Typed resume_data. The dict/JSON shape is unchanged (personal_section, experience_section, ...),
+# so stored events, snapshots, the API and the LaTeX/HTML converters keep working on dicts; the
+# model is what requests and the in-memory store hold, since copying slotted objects is much
+# cheaper than deepcopy of nested dicts. Keys a section's class doesn't know are dropped.
+#
+# ResumeData keeps each section's JSON once it has been serialized, so to_json, fingerprint and
+# section_fingerprints only re-serialize the sections edited since. Edit it through set_section,
+# append_to_section and apply, which drop the edited section's JSON; changing an entry object in
+# place would leave it stale.
+
+
+def _strings(values) -> List[str]:
+    return [str(value) for value in values or []]
+
+
+@dataclass(slots=True)
+class PersonalInfo:
+    name: str = ""
+    email: str = ""
+    phone: str = ""
+    github: str = ""
+    linkedin: str = ""
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PersonalInfo":
+        return cls(data.get("name") or "", data.get("email") or "", data.get("phone") or "",
+                   data.get("github") or "", data.get("linkedin") or "")
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "email": self.email, "phone": self.phone,
+                "github": self.github, "linkedin": self.linkedin}
+
+    def copy(self) -> "PersonalInfo":
+        return PersonalInfo(self.name, self.email, self.phone, self.github, self.linkedin)
+
+
+@dataclass(slots=True)
+class Experience:
+    job_title: str = ""
+    company: str = ""
+    start_date: str = ""
+    end_date: Optional[str] = None
+    job_type: str = "Not Specified"
+    responsibilities: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Experience":
+        return cls(data.get("job_title") or "", data.get("company") or "", data.get("start_date") or "",
+                   data.get("end_date"), data.get("job_type") or "Not Specified",
+                   _strings(data.get("responsibilities")))
+
+    def to_dict(self) -> dict:
+        return {"job_title": self.job_title, "company": self.company, "start_date": self.start_date,
+                "end_date": self.end_date, "job_type": self.job_type,
+                "responsibilities": list(self.responsibilities)}
+
+    def copy(self) -> "Experience":
+        return Experience(self.job_title, self.company, self.start_date, self.end_date, self.job_type,
+                          list(self.responsibilities))
+
+
+@dataclass(slots=True)
+class Education:
+    degree: str = ""
+    institution: str = ""
+    graduation_date: str = ""
+    location: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Education":
+        return cls(data.get("degree") or "", data.get("institution") or "",
+                   data.get("graduation_date") or "", data.get("location"))
+
+    def to_dict(self) -> dict:
+        return {"degree": self.degree, "institution": self.institution,
+                "graduation_date": self.graduation_date, "location": self.location}
+
+    def copy(self) -> "Education":
+        return Education(self.degree, self.institution, self.graduation_date, self.location)
+
+
+@dataclass(slots=True)
+class Project:
+    title: str = ""
+    tech_stack: List[str] = field(default_factory=list)
+    features: List[str] = field(default_factory=list)
+    duration: str = ""
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Project":
+        return cls(data.get("title") or "", _strings(data.get("tech_stack")), _strings(data.get("features")),
+                   data.get("duration") or "")
+
+    def to_dict(self) -> dict:
+        return {"title": self.title, "tech_stack": list(self.tech_stack), "features": list(self.features),
+                "duration": self.duration}
+
+    def copy(self) -> "Project":
+        return Project(self.title, list(self.tech_stack), list(self.features), self.duration)
+
+
+@dataclass(slots=True)
+class Skills:
+    languages: List[str] = field(default_factory=list)
+    frameworks: List[str] = field(default_factory=list)
+    developer_tools: List[str] = field(default_factory=list)
+    libraries: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data) -> "Skills":
+        # Resumes created before the defaults were unified had an empty list here
+        if not isinstance(data, dict):
+            return cls()
+        return cls(_strings(data.get("languages")), _strings(data.get("frameworks")),
+                   _strings(data.get("developer_tools")), _strings(data.get("libraries")))
+
+    def to_dict(self) -> dict:
+        return {"languages": list(self.languages), "frameworks": list(self.frameworks),
+                "developer_tools": list(self.developer_tools), "libraries": list(self.libraries)}
+
+    def copy(self) -> "Skills":
+        return Skills(list(self.languages), list(self.frameworks), list(self.developer_tools), list(self.libraries))
+
+
+# Section key -> (attribute, entry class, is a list of entries)
+SECTIONS = {
+    "personal_section": ("personal", PersonalInfo, False),
+    "experience_section": ("experience", Experience, True),
+    "education_section": ("education", Education, False),
+    "projects_section": ("projects", Project, True),
+    "skills_section": ("skills", Skills, False),
+}
+
+
+@dataclass(slots=True)
+class ResumeData:
+    """A whole resume. Personal info and education are None until set and serialize as {}."""
+    personal: Optional[PersonalInfo] = None
+    experience: List[Experience] = field(default_factory=list)
+    education: Optional[Education] = None
+    projects: List[Project] = field(default_factory=list)
+    skills: Skills = field(default_factory=Skills)
+    # Top-level sections this model doesn't know, kept as given
+    extra: Dict[str, object] = field(default_factory=dict)
+    # Section key -> its JSON, filled by _section_json and dropped when the section is edited
+    _json: Dict[str, str] = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "ResumeData":
+        """Build from resume_data; education may also be a list, of which the last entry is kept."""
+        data = data or {}
+        personal = data.get("personal_section")
+        education = data.get("education_section")
+        if isinstance(education, list):
+            education = next((entry for entry in reversed(education) if entry), None)
+        return cls(
+            PersonalInfo.from_dict(personal) if personal else None,
+            [Experience.from_dict(entry) for entry in data.get("experience_section") or []],
+            Education.from_dict(education) if education else None,
+            [Project.from_dict(entry) for entry in data.get("projects_section") or []],
+            Skills.from_dict(data.get("skills_section")),
+            {key: copy.deepcopy(value) for key, value in data.items() if key not in SECTIONS}
+        )
+
+    def to_dict(self) -> dict:
+        data = {
+            "personal_section": self.personal.to_dict() if self.personal else {},
+            "experience_section": [entry.to_dict() for entry in self.experience],
+            "education_section": self.education.to_dict() if self.education else {},
+            "projects_section": [entry.to_dict() for entry in self.projects],
+            "skills_section": self.skills.to_dict(),
+        }
+        if self.extra:
+            data.update(copy.deepcopy(self.extra))
+        return data
+
+    @classmethod
+    def from_json(cls, raw) -> "ResumeData":
+        return cls.from_dict(json.loads(raw))
+
+    def _section_json(self, section: str) -> str:
+        cached = self._json.get(section)
+        if cached is None:
+            if section in SECTIONS:
+                attribute, _, is_list = SECTIONS[section]
+                value = getattr(self, attribute)
+                value = [entry.to_dict() for entry in value] if is_list else value.to_dict() if value else {}
+            else:
+                value = self.extra[section]
+            cached = self._json[section] = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        return cached
+
+    def to_json(self) -> str:
+        """Compact JSON of to_dict(), built from the cached section JSON.
+
+        Same text as json.dumps(self.to_dict(), separators=(",", ":"), ensure_ascii=False), not
+        the default json.dumps output: no spaces after separators and non-ASCII left unescaped.
+        """
+        sections = [*SECTIONS, *self.extra]
+        return "{" + ",".join(f"{json.dumps(section, ensure_ascii=False)}:{self._section_json(section)}"
+                              for section in sections) + "}"
+
+    def copy(self) -> "ResumeData":
+        return ResumeData(
+            self.personal.copy() if self.personal else None,
+            [entry.copy() for entry in self.experience],
+            self.education.copy() if self.education else None,
+            [entry.copy() for entry in self.projects],
+            self.skills.copy(),
+            copy.deepcopy(self.extra) if self.extra else {},
+            dict(self._json)
+        )
+
+    def section_fingerprints(self) -> Dict[str, str]:
+        """Fingerprint of every top-level section, e.g. to tell which sections a turn changed."""
+        return {section: hashlib.blake2b(self._section_json(section).encode("utf-8"), digest_size=16).hexdigest()
+                for section in [*SECTIONS, *self.extra]}
+
+    def fingerprint(self) -> str:
+        """Structural hash for cache keys; field order is fixed, so no key sorting is needed."""
+        return hashlib.blake2b(self.to_json().encode("utf-8"), digest_size=16).hexdigest()
+
+    def set_section(self, section: str, value):
+        """Replace a section with a model object, or with its dict/list form."""
+        self._json.pop(section, None)
+        if section not in SECTIONS:
+            self.extra[section] = copy.deepcopy(value)
+            return
+        attribute, entry_class, is_list = SECTIONS[section]
+        if is_list:
+            value = [entry if isinstance(entry, entry_class) else entry_class.from_dict(entry) for entry in value or []]
+        elif isinstance(value, list):
+            # Same leniency as from_dict for a list-shaped education section
+            value = next((entry for entry in reversed(value) if entry), None)
+        if not is_list and not isinstance(value, entry_class):
+            value = entry_class.from_dict(value) if value or entry_class is Skills else None
+        setattr(self, attribute, value)
+
+    def append_to_section(self, section: str, value):
+        self._json.pop(section, None)
+        if section not in SECTIONS:
+            existing = self.extra.get(section)
+            if not isinstance(existing, list):
+                existing = self.extra[section] = []
+            existing.append(copy.deepcopy(value))
+            return
+        attribute, entry_class, is_list = SECTIONS[section]
+        if not is_list:
+            raise ValueError(f"Cannot append to {section}; it is not a list section")
+        getattr(self, attribute).append(value if isinstance(value, entry_class) else entry_class.from_dict(value))
+
+    def apply(self, event: dict, resolve: Optional[Callable[[int], "ResumeData"]] = None) -> "ResumeData":
+        """Apply one event_log event; returns the resulting resume (a new one for replace and revert)."""
+        op = event["op"]
+        if op == "set":
+            self.set_section(event["section"], event["value"])
+        elif op == "append":
+            self.append_to_section(event["section"], event["value"])
+        elif op == "replace":
+            return ResumeData.from_dict(event["value"])
+        elif op == "revert":
+            if resolve is None:
+                raise ValueError("Cannot apply a revert event without earlier versions")
+            return resolve(event["to"])
+        else:
+            raise ValueError(f"Unknown resume event op: {op}")
+        return self
+
+    def replay(self, events, resolve: Optional[Callable[[int], "ResumeData"]] = None) -> "ResumeData":
+        resume_data = self
+        for event in events:
+            resume_data = resume_data.apply(event, resolve)
+        return resume_data
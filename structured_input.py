@@ -0,0 +1,287 @@
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Chat input that already is structured resume data is applied straight through the resume
+# tools instead of going through the model. parse_structured_input recognizes:
+#   - our own resume_data JSON (personal_section, experience_section, ...)
+#   - a JSON Resume document (https://jsonresume.org/schema: basics, work, education, ...)
+#   - a flat JSON form submission ({"name": ..., "email": ..., "languages": [...], ...})
+#   - "key: value" lines, e.g. "email: jane@example.com, phone: +1 555 0100"
+# and returns the tool calls it maps to. Anything it can't map completely returns None, so the
+# turn goes to the agent as before; a half-applied paste would be worse than a slow one.
+
+ToolCall = Tuple[str, dict]
+
+PERSONAL_TOOL = "AddPersonalInformation"
+EXPERIENCE_TOOL = "AddExperience"
+EDUCATION_TOOL = "AddEducation"
+PROJECTS_TOOL = "AddProjects"
+SKILLS_TOOL = "AddSkills"
+
+# Field name variants users and forms send, mapped to the tool argument they fill
+PERSONAL_ALIASES = {
+    "name": "name", "full name": "name", "fullname": "name",
+    "email": "email", "e-mail": "email", "mail": "email", "email address": "email",
+    "phone": "phone", "phone number": "phone", "mobile": "phone", "tel": "phone", "telephone": "phone",
+    "github": "github", "github url": "github", "github profile": "github",
+    "linkedin": "linkedin", "linkedin url": "linkedin", "linkedin profile": "linkedin",
+}
+SKILL_ALIASES = {
+    "languages": "languages", "programming languages": "languages", "language": "languages",
+    "frameworks": "frameworks", "framework": "frameworks",
+    "developer tools": "developer_tools", "developer_tools": "developer_tools", "tools": "developer_tools",
+    "libraries": "libraries", "library": "libraries",
+}
+SECTION_TOOLS = {
+    "personal_section": PERSONAL_TOOL,
+    "experience_section": EXPERIENCE_TOOL,
+    "education_section": EDUCATION_TOOL,
+    "projects_section": PROJECTS_TOOL,
+    "skills_section": SKILLS_TOOL,
+}
+JSON_RESUME_KEYS = {"basics", "work", "education", "projects", "skills"}
+# Form fields holding one entry, or a list of entries, for a list tool
+ENTRY_FIELDS = {"experience": EXPERIENCE_TOOL, "experiences": EXPERIENCE_TOOL, "work": EXPERIENCE_TOOL,
+                "education": EDUCATION_TOOL, "projects": PROJECTS_TOOL}
+# "key: value" lines are also how people talk ("name: can you change it?"), so line parsing leaves
+# out the keys that commonly start a sentence and checks each value's shape (_LINE_VALUES)
+_CONVERSATIONAL_KEYS = {"name", "mail", "tel", "language", "tools"}
+LINE_ALIASES = {key: field for key, field in {**PERSONAL_ALIASES, **SKILL_ALIASES}.items()
+                if key not in _CONVERSATIONAL_KEYS}
+
+# "key: value" pairs; a comma starts a new pair only when a "key:" follows it
+_PAIR_SEPARATOR = re.compile(r",\s*(?=[A-Za-z][A-Za-z _-]{0,30}\s*[:=])")
+_PAIR = re.compile(r"^\s*(?:[-*•]\s*)?([A-Za-z][A-Za-z _-]{0,30}?)\s*[:=]\s*(.*?)\s*$")
+_LIST_SEPARATOR = re.compile(r"\s*[,;]\s*")
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+_PHONE = re.compile(r"^\+?[\d\s().-]{7,20}$")
+_NAME = re.compile(r"^[^\W\d_]+(?:[ .'-]+[^\W\d_]+){0,4}\.?$")
+_LIST_ITEM = re.compile(r"^[^?!]{1,40}$")
+
+
+def _profile_url(host: str):
+    return re.compile(rf"^(?:https?://)?(?:www\.)?{host}/\S+$", re.IGNORECASE)
+
+
+# Tool argument -> whether a "key: value" line's value looks like data for it
+_LINE_VALUES = {
+    "name": _NAME.match,
+    "email": _EMAIL.match,
+    "phone": lambda value: _PHONE.match(value) and sum(c.isdigit() for c in value) >= 7,
+    "github": _profile_url(r"github\.com").match,
+    "linkedin": _profile_url(r"linkedin\.com").match,
+}
+
+
+def _list_value(value: str) -> bool:
+    # Short items like "Python, Go"; a sentence such as "I mostly use VS Code" is left to the agent
+    return all(_LIST_ITEM.match(item) and len(item.split()) <= 4 for item in _as_list(value))
+
+
+def _alias(aliases: Dict[str, str], key: str) -> Optional[str]:
+    key = str(key).strip().lower()
+    return aliases.get(key) or aliases.get(key.replace("_", " ").replace("-", " "))
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [item for item in _LIST_SEPARATOR.split(value.strip()) if item]
+    return value
+
+
+def _month(date) -> str:
+    # JSON Resume dates are ISO 8601 (YYYY-MM-DD); the tools expect YYYY-MM
+    return str(date)[:7] if date else ""
+
+
+def _from_resume_data(data: dict) -> Optional[List[ToolCall]]:
+    calls = []
+    for section, value in data.items():
+        tool = SECTION_TOOLS.get(section)
+        if tool is None:
+            return None
+        if not value:
+            continue
+        entries = value if isinstance(value, list) else [value]
+        if not all(isinstance(entry, dict) for entry in entries if entry):
+            return None
+        calls.extend((tool, entry) for entry in entries if entry)
+    return calls
+
+
+def _skill_category(name: str) -> Optional[str]:
+    name = name.lower()
+    for needle, category in (("language", "languages"), ("framework", "frameworks"),
+                             ("librar", "libraries"), ("tool", "developer_tools")):
+        if needle in name:
+            return category
+    return None
+
+
+def _dicts(value) -> bool:
+    """Whether `value` is a list of JSON objects, as every JSON Resume list section is."""
+    return isinstance(value, list) and all(isinstance(entry, dict) for entry in value)
+
+
+def _from_json_resume(data: dict) -> Optional[List[ToolCall]]:
+    calls = []
+    basics = data.get("basics") or {}
+    if not isinstance(basics, dict) or not all(
+        _dicts(data.get(key) or []) for key in ("work", "education", "projects", "skills")
+    ) or not _dicts(basics.get("profiles") or []):
+        return None
+    if basics:
+        personal = {"name": basics.get("name") or "", "email": basics.get("email") or "",
+                    "phone": basics.get("phone") or ""}
+        for profile in basics.get("profiles") or []:
+            network = str(profile.get("network") or "").lower()
+            if network in ("github", "linkedin"):
+                personal[network] = profile.get("url") or profile.get("username") or ""
+        calls.append((PERSONAL_TOOL, personal))
+    for work in data.get("work") or []:
+        highlights = work.get("highlights") or ([work["summary"]] if work.get("summary") else [])
+        calls.append((EXPERIENCE_TOOL, {
+            "company": work.get("name") or work.get("company") or "",
+            "job_title": work.get("position") or "",
+            "start_date": _month(work.get("startDate")),
+            "end_date": _month(work.get("endDate")) or None,
+            "responsibilities": highlights,
+        }))
+    for education in data.get("education") or []:
+        calls.append((EDUCATION_TOOL, {
+            "institution": education.get("institution") or "",
+            "degree": " ".join(filter(None, [education.get("studyType"), education.get("area")])),
+            "graduation_date": _month(education.get("endDate")),
+            "location": education.get("location"),
+        }))
+    for project in data.get("projects") or []:
+        dates = [_month(project.get("startDate")), _month(project.get("endDate"))]
+        calls.append((PROJECTS_TOOL, {
+            "title": project.get("name") or "",
+            "tech_stack": project.get("keywords") or [],
+            "features": project.get("highlights") or ([project["description"]] if project.get("description") else []),
+            "duration": " - ".join(filter(None, dates)),
+        }))
+    if data.get("skills"):
+        skills = {}
+        for group in data["skills"]:
+            category = _skill_category(str(group.get("name") or ""))
+            if category is None:
+                # "Web Development" etc. has no obvious AddSkills field; let the agent sort it out
+                return None
+            skills.setdefault(category, []).extend(group.get("keywords") or [])
+        calls.append((SKILLS_TOOL, skills))
+    return calls
+
+
+def _from_fields(fields: Dict[str, object]) -> Optional[List[ToolCall]]:
+    """Flat form fields: personal and skill fields, plus optional experience/education/projects entries."""
+    personal, skills, calls = {}, {}, []
+    for key, value in fields.items():
+        normalized = str(key).strip().lower()
+        if _alias(PERSONAL_ALIASES, normalized):
+            personal[_alias(PERSONAL_ALIASES, normalized)] = value
+        elif _alias(SKILL_ALIASES, normalized):
+            skills[_alias(SKILL_ALIASES, normalized)] = _as_list(value)
+        elif normalized == "skills" and isinstance(value, dict):
+            for skill_key, skill_value in value.items():
+                category = _alias(SKILL_ALIASES, skill_key)
+                if category is None:
+                    return None
+                skills[category] = _as_list(skill_value)
+        elif normalized in ENTRY_FIELDS:
+            entries = value if isinstance(value, list) else [value]
+            if not _dicts(entries):
+                return None
+            calls.extend((ENTRY_FIELDS[normalized], entry) for entry in entries)
+        else:
+            return None
+    if personal:
+        calls.insert(0, (PERSONAL_TOOL, personal))
+    if skills:
+        calls.append((SKILLS_TOOL, skills))
+    return calls
+
+
+def _from_json(data) -> Optional[List[ToolCall]]:
+    if not isinstance(data, dict) or not data:
+        return None
+    if set(data) & set(SECTION_TOOLS):
+        return _from_resume_data(data)
+    if "basics" in data or "work" in data:
+        if not set(data) <= JSON_RESUME_KEYS | {"$schema", "meta"}:
+            return None
+        return _from_json_resume(data)
+    return _from_fields(data)
+
+
+def _from_lines(text: str) -> Optional[List[ToolCall]]:
+    fields = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        for piece in _PAIR_SEPARATOR.split(line):
+            match = _PAIR.match(piece)
+            if match is None or not match.group(2):
+                return None
+            key, value = match.group(1).lower(), match.group(2)
+            field = _alias(LINE_ALIASES, key)
+            if field is None or not _LINE_VALUES.get(field, _list_value)(value):
+                return None
+            fields[key] = value
+    return _from_fields(fields) if fields else None
+
+
+def parse_structured_input(query: str) -> Optional[List[ToolCall]]:
+    """The resume tool calls `query` maps to, or None when it is (or contains) free text."""
+    text = query.strip()
+    if not text:
+        return None
+    if text[0] in "{[":
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return None
+        calls = _from_json(data)
+    elif ":" in text or "=" in text:
+        calls = _from_lines(text)
+    else:
+        return None
+    return calls or None
+
+
+def keep_existing_fields(calls: List[ToolCall], resume_data) -> List[ToolCall]:
+    """Merge partial personal info and skills into what `resume_data` (a ResumeData) already has.
+
+    Both tools replace their whole section, so "phone: ..." on its own must not clear the name.
+    """
+    merged = []
+    for name, args in calls:
+        if name == PERSONAL_TOOL and resume_data.personal is not None:
+            args = {**resume_data.personal.to_dict(), **{k: v for k, v in args.items() if v}}
+        elif name == SKILLS_TOOL:
+            args = {**resume_data.skills.to_dict(), **args}
+        merged.append((name, args))
+    return merged
+
+
+def describe_tool_calls(calls: List[ToolCall]) -> str:
+    """Reply for a turn applied without the model, e.g. "Added personal information and 2 jobs ..."."""
+    counts = {}
+    for name, _ in calls:
+        counts[name] = counts.get(name, 0) + 1
+    parts = []
+    for name, singular, plural in (
+        (PERSONAL_TOOL, "personal information", "personal information"),
+        (EXPERIENCE_TOOL, "1 job", "{} jobs"),
+        (EDUCATION_TOOL, "education", "education"),
+        (PROJECTS_TOOL, "1 project", "{} projects"),
+        (SKILLS_TOOL, "skills", "skills"),
+    ):
+        if counts.get(name):
+            parts.append(singular if counts[name] == 1 else plural.format(counts[name]))
+    added = parts[0] if len(parts) == 1 else ", ".join(parts[:-1]) + " and " + parts[-1]
+    return f"Added {added} to your resume. Tell me what else you'd like to add or change."
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# main.py copies these into os.environ at import time; the Azure client is built but never called
+for key in ("OPEN_AI_KEY", "OPENAI_API_VERSION", "LANGCHAIN_API_KEY", "LANGCHAIN_PROJECT", "REDIS_URI"):
+    os.environ.setdefault(key, "test")
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "https://test.invalid")
+os.environ.setdefault("SESSION_STORE", "memory")
+os.environ.setdefault("HISTORY_SUMMARY", "false")
+
+
+@pytest.fixture(autouse=True)
+def offline_tracing(monkeypatch):
+    # main.py turns LangSmith tracing on when it is imported; keep tests offline
+    monkeypatch.setenv("LANGCHAIN_TRACING_V2", "false")
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import batch_render
+from batch_render import BatchQueueFull, arender_batch, create_batch_executor, render_batch
+
+
+@pytest.fixture
+def fake_render(monkeypatch):
+    """render_pdf stand-in that records how many renders ran at once."""
+    state = {"running": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def render_pdf(resume_data):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.01)
+        with lock:
+            state["running"] -= 1
+        if resume_data.get("fail"):
+            raise RuntimeError("bad resume")
+        return str(resume_data["n"]).encode()
+
+    monkeypatch.setattr(batch_render, "render_pdf", render_pdf)
+    return state
+
+
+def test_render_batch_bounds_submissions(fake_render):
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(render_batch([{"n": i, "fail": i == 3} for i in range(20)], executor, max_in_flight=4))
+    assert sorted(r.index for r in results) == list(range(20))
+    assert fake_render["peak"] <= 4
+    assert [r.error for r in results if r.error] == ["bad resume"]
+
+
+def test_arender_batch_bounds_submissions(fake_render):
+    async def collect():
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            return [r async for r in arender_batch([{"n": i} for i in range(20)], executor, max_in_flight=3)]
+
+    results = asyncio.run(collect())
+    assert sorted(r.pdf for r in results) == sorted(str(i).encode() for i in range(20))
+    assert fake_render["peak"] <= 3
+
+
+def test_batch_executor_capacity_and_cleanup():
+    executor = create_batch_executor(1, max_pending=4)
+    try:
+        # Start the worker so its work directory exists
+        executor.submit(abs, -1).result()
+        assert len(os.listdir(executor.root)) == 1
+        executor.check_capacity(100)  # an idle pool takes any batch
+        executor.pending = 3
+        executor.check_capacity(1)
+        with pytest.raises(BatchQueueFull):
+            executor.check_capacity(2)
+        executor.pending = 0
+    finally:
+        executor.shutdown()
+    assert not os.path.exists(executor.root)
+
+
+def test_abandoned_batch_releases_pending():
+    executor = create_batch_executor(1, max_pending=10)
+
+    async def take_one():
+        # Without pdflatex each render fails fast, which still counts as finished
+        results = arender_batch([{"n": i} for i in range(5)], executor)
+        async for _ in results:
+            assert executor.pending == 4
+            break
+        await results.aclose()
+
+    try:
+        asyncio.run(take_one())
+        assert executor.pending == 0
+    finally:
+        executor.shutdown()
+
+
+def test_stopped_batch_cancels_queued_pool_work(monkeypatch):
+    started = []
+
+    def render_pdf(resume_data):
+        started.append(resume_data["n"])
+        time.sleep(0.05)
+        return b"%PDF"
+
+    monkeypatch.setattr(batch_render, "render_pdf", render_pdf)
+    submitted = []
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        def submit(self, *args, **kwargs):
+            future = super().submit(*args, **kwargs)
+            submitted.append(future)
+            return future
+
+    async def take_one(executor):
+        results = arender_batch([{"n": i} for i in range(10)], executor, max_in_flight=4)
+        async for _ in results:
+            break
+        await results.aclose()
+        # Cancelled as the iteration stops, not once the event loop gets round to it
+        return [future.cancelled() for future in submitted]
+
+    with RecordingExecutor(max_workers=1) as executor:
+        cancelled = asyncio.run(take_one(executor))
+    # The first render finished and the second is running; the other two never start
+    assert cancelled == [False, False, True, True]
+    assert started == [0, 1]
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+import pytest
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import RunnableLambda
+
+from bullet_service import BulletFormatter
+from fake_llm import FakeChatModel
+
+
+class RecordingHandler(BaseCallbackHandler):
+    def __init__(self):
+        self.prompts = []
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.prompts.append(messages[0][0].content)
+
+
+def test_batch_does_not_report_to_the_request_that_started_it():
+    shared = RecordingHandler()
+    formatter = BulletFormatter(FakeChatModel(latency=0.01), batch_window=0.05, callbacks=[shared])
+    tool = RunnableLambda(formatter.aformat)
+    session_a, session_b = RecordingHandler(), RecordingHandler()
+
+    async def turns():
+        return await asyncio.gather(
+            tool.ainvoke("Built the billing service", config={"callbacks": [session_a]}),
+            tool.ainvoke("Ran the on-call rotation", config={"callbacks": [session_b]}),
+        )
+
+    bullets_a, bullets_b = asyncio.run(turns())
+    assert bullets_a and bullets_b
+    # One batched call for both texts, seen only by the formatter's own handler
+    assert len(shared.prompts) == 1
+    assert "Built the billing service" in shared.prompts[0] and "Ran the on-call rotation" in shared.prompts[0]
+    assert session_a.prompts == [] and session_b.prompts == []
+
+
+def test_batched_reply_covers_every_text_without_a_retry(caplog):
+    handler = RecordingHandler()
+    formatter = BulletFormatter(FakeChatModel(latency=0.01), batch_window=0.05, callbacks=[handler])
+    texts = ["Built the billing service", "Ran the on-call rotation", "Cut p99 latency"]
+
+    async def format_all():
+        return await asyncio.gather(*(formatter.aformat(text) for text in texts))
+
+    assert all(asyncio.run(format_all()))
+    assert len(handler.prompts) == 1
+    assert formatter.stats()["llm_calls"] == 1 and formatter.stats()["llm_texts"] == len(texts)
+    assert "retrying" not in caplog.text
+
+
+def test_cancelled_batch_fails_its_waiters():
+    formatter = BulletFormatter(FakeChatModel(latency=60), batch_window=0.01)
+
+    async def cancel_batch():
+        waiter = asyncio.ensure_future(formatter.aformat("Built the billing service"))
+        while not formatter._tasks:
+            await asyncio.sleep(0.01)
+        for task in formatter._tasks:
+            task.cancel()
+        return await asyncio.wait_for(waiter, timeout=5)
+
+    with pytest.raises(RuntimeError, match="cancelled"):
+        asyncio.run(cancel_batch())
+    assert formatter.stats()["in_flight"] == 0
+
+
+def test_shared_cache_is_read_off_the_event_loop():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    first = BulletFormatter(FakeChatModel(), redis_client=client, batch_window=0.01)
+    second = BulletFormatter(FakeChatModel(), redis_client=client, batch_window=0.01)
+    threads = []
+    shared_get = second._shared_get
+
+    def record_thread(keys):
+        threads.append(threading.current_thread())
+        return shared_get(keys)
+
+    second._shared_get = record_thread
+
+    async def format_twice():
+        bullets = await first.aformat("Built the billing service")
+        return bullets, await second.aformat("Built  the billing service ")
+
+    bullets, reused = asyncio.run(format_twice())
+    assert reused == bullets
+    assert second.stats()["shared_hits"] == 1 and second.stats()["llm_calls"] == 0
+    assert threads and threading.main_thread() not in threads
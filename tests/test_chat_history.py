@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from customstore import CustomChatMessageHistory, InMemoryStore, RedisStore, VersionConflict
+from event_log import set_section
+from resume_model import Skills
+
+
+def redis_store():
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisStore(client=fakeredis.FakeRedis(), prefix="test:")
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request):
+    return InMemoryStore() if request.param == "memory" else redis_store()
+
+
+def turn(i):
+    return [{"type": "human", "data": {"content": f"question {i}"}}, {"type": "ai", "data": {"content": f"answer {i}"}}]
+
+
+def contents(history):
+    return [m.content for m in history.messages]
+
+
+def test_history_reads_only_new_messages(store):
+    history = CustomChatMessageHistory("h1", store=store)
+    history.add_messages([HumanMessage(content="question 0"), AIMessage(content="answer 0")])
+    assert contents(history) == ["question 0", "answer 0"]
+    store.add_messages("h1", turn(1))
+    assert contents(history) == ["question 0", "answer 0", "question 1", "answer 1"]
+    assert history.loaded_count == 4
+
+
+def test_clear_and_regrowth_to_same_length_is_not_served_from_cache(store):
+    history = CustomChatMessageHistory("h2", store=store)
+    store.add_messages("h2", turn(0))
+    assert contents(history) == ["question 0", "answer 0"]
+    # Another worker clears the session and writes a new turn of the same length
+    store.clear_messages("h2")
+    store.add_messages("h2", turn(1))
+    assert contents(history) == ["question 1", "answer 1"]
+
+
+def test_replaced_session_is_reloaded(store):
+    history = CustomChatMessageHistory("h3", store=store)
+    store.add_messages("h3", turn(0))
+    assert contents(history) == ["question 0", "answer 0"]
+    store.import_sessions([{"session_id": "h3", "messages": turn(7), "resume_data": None}])
+    assert contents(history) == ["question 7", "answer 7"]
+
+
+@pytest.mark.parametrize("messages", [["x"], [{"content": "no type"}], [{"type": "human"}], [42]])
+def test_import_rejects_messages_history_reads_cannot_decode(store, messages):
+    store.add_messages("h4", turn(0))
+    failures = store.import_sessions([{"session_id": "h4", "messages": messages, "resume_data": None}])
+    assert [session_id for session_id, _ in failures] == ["h4"]
+    # The session is left as it was and still reads
+    assert contents(CustomChatMessageHistory("h4", store=store)) == ["question 0", "answer 0"]
+
+
+SKILLS = {"languages": ["Python"], "frameworks": [], "developer_tools": [], "libraries": []}
+
+
+def deferred_turn(store, session_id):
+    history = CustomChatMessageHistory(session_id, store=store, optimistic=True, defer_writes=True)
+    history.messages  # read, as a turn does before calling the model
+    resume = store.get_resume(session_id)
+    resume.set_section("skills_section", Skills.from_dict(SKILLS))
+    asyncio.run(history.aadd_messages([HumanMessage(content="I know Python"), AIMessage(content="Added it")]))
+    assert store.get_messages(session_id) == []
+    return history, resume
+
+
+def test_commit_turn_writes_messages_and_edits_together(store):
+    history, resume = deferred_turn(store, "t1")
+    assert asyncio.run(history.acommit_turn(resume, resume.resume_data)) == 1
+    assert contents(history) == ["I know Python", "Added it"]
+    assert store.get_resume("t1").resume_data["skills_section"]["languages"] == ["Python"]
+
+
+@pytest.mark.parametrize("race", ["resume", "messages"])
+def test_conflicting_commit_writes_nothing(store, race):
+    history, resume = deferred_turn(store, "t2")
+    # Another worker finishes a turn first
+    if race == "resume":
+        store.append_events("t2", [set_section("skills_section", SKILLS)])
+    else:
+        store.add_messages("t2", turn(9))
+    with pytest.raises(VersionConflict):
+        asyncio.run(history.acommit_turn(resume, resume.resume_data))
+    assert len(store.get_messages("t2")) == (0 if race == "resume" else 2)
+    assert store.get_resume("t2").version == (1 if race == "resume" else 0)
+
+
+class FlakySummarizer:
+    """Summarizer whose first `failures` calls raise; records the prompts of the calls that succeed."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.prompts = []
+
+    async def ainvoke(self, prompt):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("model unavailable")
+        self.prompts.append(prompt)
+        return AIMessage(content="summary of the early turns")
+
+
+def test_failed_summary_keeps_dropped_turns_for_the_next_try(store):
+    for i in range(4):
+        store.add_messages("h-summary", turn(i))
+    summarizer = FlakySummarizer(failures=1)
+    # About 6 tokens per message, so only the last turn fits
+    history = CustomChatMessageHistory("h-summary", store=store, max_token_limit=12, summarizer=summarizer)
+
+    context = asyncio.run(history.aget_context_messages())
+    # The turn goes ahead within budget, without a summary
+    assert [m.content for m in context] == ["question 3", "answer 3"]
+
+    context = asyncio.run(history.aget_context_messages())
+    assert context[0].content.endswith("summary of the early turns")
+    assert [m.content for m in context[1:]] == ["question 3", "answer 3"]
+    # The retry summarized every dropped message, including those of the failed attempt
+    assert all(f"question {i}" in summarizer.prompts[0] for i in range(3))
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import time
+
+from agent import ResumeAgentFactory
+from fake_llm import FakeChatModel
+from main import app
+
+REPLY = "Thanks! I added Python to your skills. Which frameworks and developer tools do you use day to day?"
+
+
+class TimedChatModel(FakeChatModel):
+    """FakeChatModel that records when each streamed reply finished."""
+    finished: list = []
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            yield chunk
+        self.finished.append(time.perf_counter())
+
+
+async def post(path, body):
+    """Drive the ASGI app directly, timing each body chunk as it is sent (httpx would buffer them)."""
+    payload = json.dumps(body).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [(b"content-type", b"application/json")],
+        "client": ("test", 0), "server": ("test", 80),
+    }
+    sent = False
+    chunks = []
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks.append((time.perf_counter(), message["body"].decode()))
+
+    await app(scope, receive, send)
+    return chunks
+
+
+def test_stream_sends_first_event_before_the_model_finishes(monkeypatch):
+    model = TimedChatModel(latency=0.05, token_latency=0.02, reply=REPLY,
+                           tool_calls=[{"name": "AddSkills", "args": {"languages": ["Python"]}}])
+    monkeypatch.setattr(app.state, "agent_factory", ResumeAgentFactory(model=model, verbose=False), raising=False)
+    monkeypatch.setattr(app.state, "warmup", None, raising=False)
+
+    chunks = asyncio.run(post("/chat/stream", {"query": "I know Python", "session_id": "stream-ttfb"}))
+
+    # Two model calls: the tool call, then the streamed reply
+    assert len(model.finished) == 2
+    first_event_at, first_event = chunks[0]
+    assert first_event.startswith("event: tool_start")
+    assert first_event_at < model.finished[-1]
+    # The reply is sent token by token, not buffered until the model is done with it
+    first_token_at = next(at for at, body in chunks if body.startswith("event: token"))
+    assert first_token_at < model.finished[-1] - 10 * model.token_latency
+
+    events = "".join(body for _, body in chunks)
+    assert events.count("event: token") == len(REPLY.split())
+    final = json.loads(chunks[-1][1].split("data: ", 1)[1])
+    assert final["content"] == REPLY
+    assert final["resume_data"]["skills_section"]["languages"] == ["Python"]
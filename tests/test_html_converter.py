@@ -0,0 +1,88 @@
+from html.parser import HTMLParser
+
+from tools.html_converter import STYLESHEET, HtmlResumeConverter
+
+RESUME = {
+    # Sections come out in SECTION_ORDER, not in the order the dict holds them
+    "skills_section": {"languages": ["C++", "C#"], "frameworks": [], "build_systems": ["Bazel"]},
+    "experience_section": [{"job_title": "Engineer", "company": "R&D <Labs>", "start_date": "2020-01",
+                            "end_date": None, "job_type": "Remote",
+                            "responsibilities": ["- Cut costs by 40%", "", "  ", "• Shipped <b>v2</b>"]}],
+    "personal_section": {"name": "Jane <O'Neil>", "email": "jane@example.com", "phone": "+1 555 0100",
+                         "github": "https://github.com/jane/", "linkedin": 'https://x.test/"onmouseover="1'},
+    "education_section": {"institution": "State University", "location": "Springfield", "degree": "BSc",
+                          "graduation_date": "2019"},
+    "projects_section": [],
+}
+
+
+class TagCollector(HTMLParser):
+    """Tags and text of a document, which only parse as intended if everything was escaped."""
+
+    def __init__(self):
+        super().__init__()
+        self.tags = []
+        self.text = []
+
+    def handle_starttag(self, tag, attrs):
+        self.tags.append((tag, dict(attrs)))
+
+    def handle_data(self, data):
+        self.text.append(data)
+
+
+def parse(html):
+    collector = TagCollector()
+    collector.feed(html)
+    return collector
+
+
+def test_text_and_attributes_are_escaped():
+    html = HtmlResumeConverter().convert_json_to_html(RESUME)
+    document = parse(html)
+    assert "Jane <O'Neil>" in document.text
+    assert "Shipped <b>v2</b>" in document.text
+    assert "R&D <Labs>" in document.text
+    # Institution, job title and two skill labels; none from the escaped bullet
+    assert [tag for tag, _ in document.tags].count("b") == 4
+    links = [attrs["href"] for tag, attrs in document.tags if tag == "a"]
+    assert links == ["mailto:jane@example.com", 'https://x.test/"onmouseover="1', "https://github.com/jane/"]
+    assert all("onmouseover" not in attrs for _, attrs in document.tags)
+
+
+def test_sections_follow_section_order_and_skip_empty_ones():
+    converter = HtmlResumeConverter()
+    html = converter.convert_json_to_html(RESUME)
+    headings = ["<header>", "<h2>Education</h2>", "<h2>Experience</h2>", "<h2>Technical Skills</h2>"]
+    positions = [html.index(heading) for heading in headings]
+    assert positions == sorted(positions)
+    assert "Projects" not in html
+    assert "<style>" not in html
+    assert html.startswith("<!DOCTYPE html>") and html.endswith("</body></html>\n")
+    assert html == ('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Resume</title></head><body>\n'
+                    + "".join(converter.iter_sections(RESUME)) + "</body></html>\n")
+    assert STYLESHEET in converter.convert_json_to_html(RESUME, inline_css=True)
+
+
+def test_section_markup():
+    converter = HtmlResumeConverter()
+    assert converter.render_experience_section(RESUME["experience_section"]) == (
+        '<section><h2>Experience</h2><div class="entry"><div class="row"><span><b>Engineer</b></span>'
+        '<span class="right">2020-01 – Present</span></div><div class="row subrow"><span>R&amp;D &lt;Labs&gt;</span>'
+        '<span class="right">Remote</span></div>'
+        "<ul><li>Cut costs by 40%</li><li>Shipped &lt;b&gt;v2&lt;/b&gt;</li></ul></div></section>\n"
+    )
+    assert converter.render_skills_section(RESUME["skills_section"]) == (
+        '<section class="skills"><h2>Technical Skills</h2><p><b>Languages</b>: C++, C#</p>'
+        "<p><b>Build Systems</b>: Bazel</p></section>\n"
+    )
+    # AddEducation stores one dict; a list renders the same
+    education = RESUME["education_section"]
+    assert converter.render_education_section(education) == converter.render_education_section([education])
+    project = {"title": "Compiler", "tech_stack": ["C", "LLVM"], "duration": "2021"}
+    assert converter.render_projects_section([project]) == (
+        '<section><h2>Projects</h2><div class="entry"><div class="row"><span><b>Compiler</b> | <i>C, LLVM</i></span>'
+        '<span class="right">2021</span></div></div></section>\n'
+    )
+    assert converter.render_personal_section({}) == ""
+    assert converter.render_skills_section(["Python"]) == ""
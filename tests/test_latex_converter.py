@@ -0,0 +1,56 @@
+import pytest
+
+from tools.latex_converter import LATEX_SPECIAL_CHARS, LaTeXResumeConverter
+from tools.latex_templates import compile_template, render_bullets
+
+
+@pytest.mark.parametrize("text, escaped", [
+    ("R&D cut 40% of $ costs", "R\\&D cut 40\\% of \\$ costs"),
+    ("C:\\path\\{x}", "C:\\textbackslash{}path\\textbackslash{}\\{x\\}"),
+    ("a\\b", "a\\textbackslash{}b"),
+    ("~^_#", "\\textasciitilde{}\\textasciicircum{}\\_\\#"),
+    # NUL is dropped, never turned into a backslash
+    ("a\x00b", "ab"),
+    ("a\x00b\\c", "ab\\textbackslash{}c"),
+    (42, "42"),
+])
+def test_escape_latex(text, escaped):
+    assert LaTeXResumeConverter().escape_latex(text) == escaped
+
+
+def lines(latex):
+    # The format_* methods leave a blank line after each entry; the templates don't
+    return [line for line in latex.splitlines() if line.strip()]
+
+
+def test_experience_template_matches_hand_written_formatter():
+    converter = LaTeXResumeConverter()
+    experiences = [{
+        "job_title": f"Engineer {i}", "company": f"R&D Company {i}", "start_date": "2020-01", "end_date": "2021-06",
+        "job_type": "Remote", "responsibilities": ["Cut costs by 40%", "Owned the billing_service"]
+    } for i in range(3)]
+    # format_experience reads title/location rather than job_title/job_type
+    legacy = [dict(entry, title=entry["job_title"], location=entry["job_type"]) for entry in experiences]
+    assert lines(converter.render_experience_section(experiences)) == lines("\n".join(converter.format_experience(legacy)))
+
+
+def test_skills_template_matches_hand_written_formatter():
+    converter = LaTeXResumeConverter()
+    templated = converter.render_skills_section({"languages": ["Python", "C#"], "frameworks": ["React"]})
+    hand_written = "\n".join(converter.format_skills({"Languages": ["Python", "C#"], "Frameworks": ["React"]}))
+    assert templated == hand_written.replace("C#", "C\\#")
+
+
+def test_compiled_template_keeps_literal_text():
+    render = compile_template("\\textbf{$name} $$5 {'quoted'} \"$name\"\n")
+    assert render(name="Jane") == "\\textbf{Jane} $5 {'quoted'} \"Jane\"\n"
+    assert render_bullets([]) == ""
+    assert render_bullets(["a", "b"]) == (
+        "  \\resumeItemListStart\n    \\resumeItem{a}\n    \\resumeItem{b}\n  \\resumeItemListEnd")
+
+
+def test_escape_latex_matches_a_per_character_reference():
+    reference = {**LATEX_SPECIAL_CHARS, "\x00": ""}
+    samples = ["\\{}\\", "~\\^", "a\\%b_\x00c{d}\\", "R&D: 40% of $costs #1 {a_b} ~x^y", "plain text", ""]
+    for text in samples:
+        assert LaTeXResumeConverter().escape_latex(text) == "".join(reference.get(char, char) for char in text)
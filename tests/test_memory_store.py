@@ -0,0 +1,158 @@
+import pytest
+
+import customstore
+from customstore import InMemoryStore, _size_of
+from event_log import append_to_section, replace_resume, revert_to, set_section
+from resume_model import ResumeData
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(customstore, "time", clock)
+    return clock
+
+
+SKILLS = {"languages": ["Python"], "frameworks": [], "developer_tools": [], "libraries": []}
+
+
+def job(company):
+    return {"job_title": "Engineer", "company": company, "start_date": "2020-01", "end_date": None,
+            "job_type": "Remote", "responsibilities": ["Built things"]}
+
+
+def companies(resume):
+    return [entry["company"] for entry in resume.resume_data["experience_section"]]
+
+
+def message(text):
+    return {"type": "human", "data": {"content": text}}
+
+
+def footprint(store, session_id):
+    session = store.store[session_id]
+    return (2 * _size_of(session["snapshots"][0]) + sum(_size_of(m) for m in session["messages"])
+            + sum(_size_of(e) for e in session["events"]) + sum(_size_of(s) for s in session["snapshots"][1:]))
+
+
+def test_least_recently_used_session_is_evicted(clock):
+    store = InMemoryStore(max_sessions=2)
+    store.get_messages("a")
+    store.get_messages("b")
+    store.get_messages("a")
+    store.get_messages("c")
+    assert list(store.store) == ["a", "c"]
+    assert store.stats()["evictions"] == 1
+
+
+def test_idle_ttl_counts_from_the_last_access(clock):
+    store = InMemoryStore(default_ttl=10)
+    store.add_messages("a", [message("hi")])
+    clock.now = 8
+    assert store.get_messages("a") == [message("hi")]
+    clock.now = 16
+    assert store.get_messages("a") == [message("hi")]
+    clock.now = 27
+    assert store.get_messages("a") == []
+    assert store.stats()["expirations"] == 1
+
+
+def test_sweep_reclaims_expired_sessions_behind_a_live_one(clock):
+    store = InMemoryStore()
+    store.add_messages("long", [message("hi")], ttl=100)
+    store.add_messages("short", [message("hi")], ttl=5)
+    store.add_messages("touched", [message("hi")], ttl=5)
+    clock.now = 4
+    store.get_messages("touched")
+    clock.now = 6
+    store.get_messages("new")
+    assert list(store.store) == ["long", "touched", "new"]
+    clock.now = 10
+    store.get_messages("newer")
+    assert list(store.store) == ["long", "new", "newer"]
+    assert store.stats()["expirations"] == 2
+    assert store.current_bytes == sum(footprint(store, s) for s in store.store)
+
+
+def test_byte_budget_tracks_every_write(clock):
+    store = InMemoryStore(snapshot_every=2)
+    store.add_messages("a", [message("x" * 100)])
+    store.append_events("a", [set_section("summary_section", "one"), set_section("summary_section", "two")])
+    store.undo("a")
+    assert store.current_bytes == footprint(store, "a")
+    store.clear_messages("a")
+    assert store.current_bytes == footprint(store, "a")
+
+    size = store.current_bytes
+    store.max_bytes = 2 * size + 50
+    store.add_messages("b", [])
+    store.add_messages("c", [message("y" * 100)])
+    # "a" is the LRU head, so it goes to get back under the budget
+    assert list(store.store) == ["b", "c"]
+    assert store.current_bytes == sum(footprint(store, s) for s in store.store) <= store.max_bytes
+    assert store.stats()["evictions"] == 1
+
+
+def test_has_session_neither_creates_nor_touches(clock):
+    store = InMemoryStore(default_ttl=10)
+    assert not store.has_session("a")
+    assert "a" not in store.store
+    store.get_messages("a")
+    clock.now = 8
+    assert store.has_session("a")
+    clock.now = 11
+    assert not store.has_session("a")
+
+
+def test_undo_revert_and_replace():
+    store = InMemoryStore(snapshot_every=2)
+    store.append_events("s", [set_section("skills_section", SKILLS),
+                              append_to_section("experience_section", job("A"))])
+    store.update_resume("s", {"experience_section": [job("X")]})
+    store.append_events("s", [append_to_section("experience_section", job("B"))])
+    assert companies(store.get_resume("s")) == ["X", "B"]
+    assert store.get_resume("s").resume_data["skills_section"]["languages"] == []
+
+    assert store.undo("s", 2) == 5
+    assert companies(store.get_resume("s")) == ["A"]
+    assert store.get_resume("s").resume_data["skills_section"] == SKILLS
+    # The undo is an edit too, so undoing it brings the replaced resume back
+    assert store.undo("s") == 6
+    assert companies(store.get_resume("s")) == ["X", "B"]
+    assert store.get_events("s", 4) == (6, [revert_to(2), revert_to(4)])
+    with pytest.raises(ValueError):
+        store.undo("s", 7)
+
+
+def test_replaying_events_over_snapshots_matches_a_full_replay():
+    events = [set_section("skills_section", SKILLS)]
+    events += [append_to_section("experience_section", job(f"C{i}")) for i in range(4)]
+    events += [revert_to(2), replace_resume({"summary_section": "New"}),
+               append_to_section("experience_section", job("D")), revert_to(6), revert_to(3),
+               set_section("summary_section", "Last")]
+    store = InMemoryStore(snapshot_every=3)
+    for event in events:
+        store.append_events("s", [event])
+
+    # Reference: every version rebuilt from the empty resume, without snapshots
+    versions = [ResumeData()]
+    for event in events:
+        versions.append(versions[-1].copy().apply(event, lambda v: versions[v].copy()))
+    assert len(store.store["s"]["snapshots"]) == 1 + len(events) // 3
+    for version, expected in enumerate(versions):
+        assert store.get_resume_at("s", version).resume_data == expected.to_dict()
+    assert store.get_resume("s").resume_data == versions[-1].to_dict()
+
+    # An export replays the same events into the same resume on import
+    imported = InMemoryStore(snapshot_every=4)
+    assert imported.import_sessions([record for batch in store.export_sessions() for record in batch]) == []
+    assert imported.get_resume("s").resume_data == versions[-1].to_dict()
+    assert imported.get_resume_at("s", 5).resume_data == versions[5].to_dict()
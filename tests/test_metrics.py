@@ -0,0 +1,95 @@
+import asyncio
+
+import httpx
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+
+from agent import ResumeAgentFactory
+from fake_llm import FakeChatModel
+from main import app
+from metrics import Counter, Gauge, Histogram, Registry
+
+USAGE = {"input_tokens": 10, "output_tokens": 3, "total_tokens": 13}
+
+
+def test_exposition_format():
+    registry = Registry()
+    counter = registry.register(Counter("test_tokens_total", "Tokens.", ["kind"]))
+    registry.register(Gauge("test_cache", "Cache stats.", ["field"], lambda: {("hits",): 3, ('a"b\\',): 1.5}))
+    histogram = registry.register(Histogram("test_seconds", "Latency.", ["stage"], buckets=(0.1, 1)))
+    counter.inc(2, "prompt")
+    counter.inc(3, "prompt")
+    for value in (0.05, 0.1, 0.5, 5):
+        histogram.observe(value, "llm")
+
+    assert registry.render() == "\n".join([
+        "# HELP test_tokens_total Tokens.",
+        "# TYPE test_tokens_total counter",
+        'test_tokens_total{kind="prompt"} 5',
+        "# HELP test_cache Cache stats.",
+        "# TYPE test_cache gauge",
+        'test_cache{field="hits"} 3',
+        'test_cache{field="a\\"b\\\\"} 1.5',
+        "# HELP test_seconds Latency.",
+        "# TYPE test_seconds histogram",
+        # Buckets are cumulative and include their upper bound
+        'test_seconds_bucket{stage="llm",le="0.1"} 2',
+        'test_seconds_bucket{stage="llm",le="1"} 3',
+        'test_seconds_bucket{stage="llm",le="+Inf"} 4',
+        'test_seconds_sum{stage="llm"} 5.65',
+        'test_seconds_count{stage="llm"} 4',
+    ]) + "\n"
+
+
+class MeteredChatModel(FakeChatModel):
+    """FakeChatModel reporting USAGE for every call, streamed or not."""
+
+    def _respond(self, messages):
+        result = super()._respond(messages)
+        result.generations[0].message.usage_metadata = USAGE
+        return result
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=USAGE))
+
+
+def samples(text):
+    values = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            values[name] = float(value)
+    return values
+
+
+def test_metrics_after_a_chat_turn(monkeypatch):
+    model = MeteredChatModel(tool_calls=[{"name": "AddSkills", "args": {"languages": ["Python"]}}])
+    monkeypatch.setattr(app.state, "agent_factory", ResumeAgentFactory(model=model, verbose=False), raising=False)
+    monkeypatch.setattr(app.state, "warmup", None, raising=False)
+
+    async def turn():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            before = await client.get("/metrics")
+            chat = await client.post("/chat", json={"query": "I know Python", "session_id": "metrics-turn"})
+            assert chat.status_code == 200
+            return before, await client.get("/metrics")
+
+    before, after = asyncio.run(turn())
+    assert after.headers["content-type"].startswith("text/plain; version=0.0.4")
+    before, after = samples(before.text), samples(after.text)
+
+    def delta(name):
+        return after.get(name, 0) - before.get(name, 0)
+
+    # One model call asks for the tool, the second replies
+    assert delta('resume_llm_tokens_total{kind="prompt"}') == 20
+    assert delta('resume_llm_tokens_total{kind="completion"}') == 6
+    assert delta('resume_stage_seconds_count{stage="llm"}') == 2
+    assert delta('resume_stage_seconds_count{stage="prompt_build"}') == 2
+    assert delta('resume_stage_seconds_count{stage="store_read"}') == 1
+    assert delta('resume_tool_seconds_count{tool="AddSkills"}') == 1
+    assert delta('resume_http_request_seconds_count{method="POST",route="/chat",status="200"}') == 1
+    assert (after['resume_stage_seconds_bucket{stage="llm",le="+Inf"}']
+            == after['resume_stage_seconds_count{stage="llm"}'])
@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+from agent import ResumeAgentFactory
+from customstore import CustomChatMessageHistory, InMemoryStore
+from fake_llm import FakeChatModel
+from resume_builder import Resume
+
+
+class DelayedFormatter:
+    """Bullet formatter whose call for "<seconds> ..." finishes after that many seconds."""
+
+    async def aformat(self, text):
+        await asyncio.sleep(float(text.split()[0]))
+        return [text]
+
+    def stats(self):
+        return {}
+
+
+def run_turn(calls, max_tool_concurrency):
+    factory = ResumeAgentFactory(model=FakeChatModel(tool_calls=calls), verbose=False,
+                                 max_tool_concurrency=max_tool_concurrency, bullet_formatter=DelayedFormatter())
+    resume = Resume()
+    history = CustomChatMessageHistory(f"parallel-{time.perf_counter_ns()}", store=InMemoryStore())
+    start = time.perf_counter()
+    asyncio.run(factory.ainvoke("Here are my jobs", resume, history))
+    return resume, time.perf_counter() - start
+
+
+def job(company):
+    return {"name": "AddExperience", "args": {"company": company, "job_title": "Engineer"}}
+
+
+def bullets(seconds, name):
+    return {"name": "format_responsibilities", "args": {"text": f"{seconds} {name}"}}
+
+
+def test_resume_edits_apply_in_emitted_order_when_calls_finish_out_of_order():
+    # Earlier calls finish last, so completion order is the reverse of emission order
+    calls = [bullets(0.15, "a"), job("A"), bullets(0.1, "b"), job("B"), bullets(0.05, "c"), job("C"), job("D")]
+    resume, _ = run_turn(calls, max_tool_concurrency=4)
+    assert [entry["company"] for entry in resume.resume_data["experience_section"]] == ["A", "B", "C", "D"]
+
+
+def test_resume_edits_waiting_for_their_turn_hold_no_slots():
+    # With two slots, the four 0.2 s bullet calls take two rounds; jobs waiting in between must
+    # not take the second round's slots and push it to a third and fourth
+    calls = [bullets(0.2, "a"), job("A"), bullets(0.2, "b"), job("B"), bullets(0.2, "c"), job("C"),
+             bullets(0.2, "d"), job("D")]
+    resume, elapsed = run_turn(calls, max_tool_concurrency=2)
+    assert [entry["company"] for entry in resume.resume_data["experience_section"]] == ["A", "B", "C", "D"]
+    assert elapsed < 0.6
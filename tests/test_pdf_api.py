@@ -0,0 +1,77 @@
+import asyncio
+
+import httpx
+import pytest
+
+from main import app
+from pdf_renderers import PdfRenderer
+from render_cache import RenderCache, resume_content_hash
+
+RESUME = {"personal_section": {"name": "Jane Doe"}}
+
+
+class FakeRenderer(PdfRenderer):
+    name = "fake"
+    cache_version = "fake-1"
+
+    def __init__(self):
+        self.renders = 0
+
+    async def render(self, resume_data, session_id=None, cache_key=None):
+        self.renders += 1
+        return b"%PDF-fake"
+
+
+@pytest.fixture
+def renderer(monkeypatch):
+    renderer = FakeRenderer()
+    monkeypatch.setattr(app.state, "pdf_renderers", {"fake": renderer}, raising=False)
+    monkeypatch.setattr(app.state, "render_cache", RenderCache(), raising=False)
+    return renderer
+
+
+def post_pdf(headers=None):
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/pdf?renderer=fake", json={"resume_data": RESUME}, headers=headers)
+    return asyncio.run(send())
+
+
+ETAG = f'"{resume_content_hash(RESUME, FakeRenderer.cache_version)}"'
+
+
+def test_pdf_carries_its_etag(renderer):
+    response = post_pdf()
+    assert response.status_code == 200
+    assert response.content == b"%PDF-fake"
+    assert response.headers["etag"] == ETAG
+
+
+@pytest.mark.parametrize("if_none_match", [
+    ETAG,
+    f"W/{ETAG}",
+    f'"other", {ETAG}',
+    f'W/"other",W/{ETAG} ',
+    '"a,b", ' + ETAG,
+    "*",
+])
+def test_matching_if_none_match_gets_a_304_without_rendering(renderer, if_none_match):
+    response = post_pdf({"If-None-Match": if_none_match})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == ETAG
+    assert renderer.renders == 0
+
+
+@pytest.mark.parametrize("if_none_match", [
+    '"other"',
+    '"other", W/"different"',
+    ETAG.strip('"'),
+    f'"{ETAG}"',
+    "",
+])
+def test_other_if_none_match_gets_the_pdf(renderer, if_none_match):
+    response = post_pdf({"If-None-Match": if_none_match})
+    assert response.status_code == 200
+    assert response.content == b"%PDF-fake"
+    assert renderer.renders == 1
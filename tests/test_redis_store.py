@@ -0,0 +1,151 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from customstore import CustomChatMessageHistory, RedisStore, VersionConflict
+from event_log import append_to_section, set_section
+from langchain_core.messages import AIMessage, HumanMessage
+from resume_model import Experience
+
+fakeredis = pytest.importorskip("fakeredis")
+
+SKILLS = {"languages": ["Python"], "frameworks": [], "developer_tools": [], "libraries": []}
+
+
+def job(company):
+    return {"job_title": "Engineer", "company": company, "start_date": "2020-01", "end_date": None,
+            "job_type": "Remote", "responsibilities": ["Built things"]}
+
+
+def message(content, kind="human"):
+    return {"type": kind, "data": {"content": content}}
+
+
+@pytest.fixture
+def store():
+    return RedisStore(client=fakeredis.FakeRedis(), prefix="test:", snapshot_every=3)
+
+
+def test_messages_round_trip(store):
+    store.add_messages("s1", [message("hi"), message("hello", "ai")])
+    store.add_message("s1", message("more"))
+    assert [m["data"]["content"] for m in store.get_messages("s1")] == ["hi", "hello", "more"]
+    epoch, total, since = store.get_messages_since("s1", 2)
+    assert total == 3 and since == [message("more")]
+    store.clear_messages("s1")
+    assert store.get_messages("s1") == []
+    assert store.get_messages_since("s1", 0)[0] != epoch
+
+
+def test_resume_events_and_versions(store):
+    assert store.get_resume("s1").version == 0
+    version = store.append_events("s1", [set_section("skills_section", SKILLS)])
+    for i in range(4):
+        version = store.append_events("s1", [append_to_section("experience_section", job(f"C{i}"))])
+    assert version == 5
+    resume = store.get_resume("s1")
+    assert resume.version == 5
+    assert [e["company"] for e in resume.resume_data["experience_section"]] == ["C0", "C1", "C2", "C3"]
+    assert store.get_resume_at("s1", 2).resume_data["experience_section"][0]["company"] == "C0"
+    assert len(store.get_resume_at("s1", 2).resume_data["experience_section"]) == 1
+    assert store.get_events("s1", 4)[0] == 5
+
+
+def test_snapshot_written_when_crossing_interval(store):
+    resume = store.get_resume("s1")
+    for i in range(3):
+        resume.append_to_section("experience_section", Experience.from_dict(job(f"C{i}")))
+    store.append_events("s1", resume.pending_events, resume_data=resume.resume_data)
+    snapshot = json.loads(store.client.get("test:s1:snapshot"))
+    assert snapshot["version"] == 3
+    assert len(snapshot["data"]["experience_section"]) == 3
+    assert store.get_resume("s1").resume_data == resume.resume_data
+
+
+def test_ttl_refreshed_on_write(store):
+    store.add_messages("s1", [message("hi")], ttl=60)
+    store.append_events("s1", [set_section("skills_section", SKILLS)], ttl=120)
+    assert 0 < store.client.ttl("test:s1:messages") <= 120
+    assert 60 < store.client.ttl("test:s1:events") <= 120
+
+
+def test_version_conflicts(store):
+    store.add_messages("s1", [message("hi")])
+    with pytest.raises(VersionConflict):
+        store.add_messages("s1", [message("again")], expected_count=0)
+    store.add_messages("s1", [message("again")], expected_count=1)
+
+    store.append_events("s1", [set_section("skills_section", SKILLS)], expected_version=0)
+    with pytest.raises(VersionConflict):
+        store.append_events("s1", [set_section("skills_section", SKILLS)], expected_version=0)
+    assert store.get_resume("s1").version == 1
+    assert len(store.get_messages("s1")) == 2
+
+
+def test_write_raced_by_another_client_conflicts(store):
+    other = RedisStore(client=store.client, prefix="test:")
+    key = store._events_key("s1")
+
+    def read(pipe):
+        # Another worker appends between our WATCH and MULTI
+        other.append_events("s1", [set_section("skills_section", SKILLS)])
+        return pipe.llen(key)
+
+    with pytest.raises(VersionConflict):
+        store._compare_and_set(key, read, 1, lambda pipe, version: pipe.rpush(key, "{}"))
+    assert store.client.llen(key) == 1
+
+
+def test_import_writes_batch_in_one_pipeline(store):
+    source = RedisStore(client=fakeredis.FakeRedis(), prefix="src:", snapshot_every=3)
+    for session_id in ("a", "b"):
+        source.add_messages(session_id, [message(f"hi {session_id}")])
+        source.append_events(session_id, [append_to_section("experience_section", job(session_id))])
+    records = [record for batch in source.export_sessions(10) for record in batch]
+    records.append({"session_id": "bad", "events": [{"op": "nope"}]})
+
+    executed = []
+    pipeline = store.client.pipeline
+
+    def counting_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+        pipe.execute = lambda *a, **k: executed.append(len(pipe.command_stack)) or execute(*a, **k)
+        return pipe
+
+    store.client.pipeline = counting_pipeline
+    failures = store.import_sessions(records, ttl=60)
+    assert [session_id for session_id, _ in failures] == ["bad"]
+    assert len(executed) == 1
+    for session_id in ("a", "b"):
+        resume = store.get_resume(session_id)
+        assert resume.version == 1
+        assert resume.resume_data["experience_section"][0]["company"] == session_id
+        assert store.get_messages(session_id) == [message(f"hi {session_id}")]
+        assert 0 < store.client.ttl(f"test:{session_id}:events") <= 60
+    assert not store.client.exists("test:bad:events")
+
+
+def test_async_methods_run_off_the_event_loop(store):
+    threads = []
+    get_messages_since = store.get_messages_since
+
+    def record_thread(*args):
+        threads.append(threading.current_thread())
+        return get_messages_since(*args)
+
+    store.get_messages_since = record_thread
+
+    async def turn():
+        history = CustomChatMessageHistory("s1", store=store, optimistic=True)
+        await history.aget_context_messages()
+        await history.aadd_messages([HumanMessage(content="hi"), AIMessage(content="hello")])
+        await store.aappend_events("s1", [set_section("skills_section", SKILLS)], expected_version=0)
+        return await store.aget_resume("s1"), [b async for b in store.aexport_sessions(10)]
+
+    resume, batches = asyncio.run(turn())
+    assert threads and threading.main_thread() not in threads
+    assert resume.version == 1
+    assert [m["data"]["content"] for m in batches[0][0]["messages"]] == ["hi", "hello"]
@@ -0,0 +1,133 @@
+import copy
+
+from pdf_renderers import LatexPdfRenderer
+from render_cache import IncrementalLatexRenderer, RenderCache, resume_content_hash
+from tools.latex_converter import LaTeXResumeConverter
+
+RESUME = {
+    "personal_section": {"name": "Jane Doe", "email": "jane@example.com", "phone": "+1 555 0100",
+                         "github": "github.com/jane", "linkedin": ""},
+    "education_section": [{"institution": "State University", "location": "Springfield", "degree": "BSc CS",
+                           "graduation_date": "2019"}],
+    "experience_section": [{"job_title": "Engineer", "company": "R&D Co", "start_date": "2020-01", "end_date": None,
+                            "job_type": "Remote", "responsibilities": ["Cut costs by 40%"]}],
+    "projects_section": [{"title": "Compiler", "tech_stack": ["C++"], "duration": "2021",
+                          "features": ["Parses $things"]}],
+    "skills_section": {"languages": ["Python", "C#"], "frameworks": [], "developer_tools": ["Docker"],
+                       "libraries": []},
+}
+
+
+class RecordingConverter(LaTeXResumeConverter):
+    def __init__(self):
+        super().__init__()
+        self.rendered = []
+
+    def render_section(self, key, value):
+        self.rendered.append(key)
+        return super().render_section(key, value)
+
+
+def edits():
+    """Successive versions of RESUME, as a session's tool calls would leave it."""
+    resume = copy.deepcopy(RESUME)
+    yield resume
+    resume = copy.deepcopy(resume)
+    resume["experience_section"].append({"job_title": "Lead", "company": "Initech", "start_date": "2022-01",
+                                         "responsibilities": ["Led ~5 people"]})
+    yield resume
+    resume = copy.deepcopy(resume)
+    resume["skills_section"]["frameworks"] = ["React"]
+    yield resume
+    resume = copy.deepcopy(resume)
+    del resume["projects_section"]
+    resume["personal_section"]["linkedin"] = "linkedin.com/in/jane"
+    yield resume
+    resume = copy.deepcopy(resume)
+    resume["education_section"] = []
+    yield resume
+
+
+def test_output_matches_the_full_converter():
+    converter = LaTeXResumeConverter()
+    renderer = IncrementalLatexRenderer(LaTeXResumeConverter())
+    for resume in edits():
+        assert renderer.render("s", resume) == converter.convert_json_to_latex(resume)
+    # Keys only the full converter knows fall back to it
+    legacy = {"personal_info": {"name": "Jane", "phone": "1", "email": "j@x.org", "linkedin": "in/jane",
+                                "github": "jane"}, "skills": {"Languages": ["Python"]}}
+    assert renderer.render("s", legacy) == converter.convert_json_to_latex(legacy)
+
+
+def test_only_changed_sections_are_rendered_again():
+    converter = RecordingConverter()
+    renderer = IncrementalLatexRenderer(converter)
+    rendered = []
+    for resume in edits():
+        converter.rendered = []
+        renderer.render("s", resume)
+        rendered.append(converter.rendered)
+    assert rendered == [
+        ["personal_section", "education_section", "experience_section", "projects_section", "skills_section"],
+        ["experience_section"],
+        ["skills_section"],
+        ["personal_section"],
+        ["education_section"],
+    ]
+    assert renderer.sections_rendered == 9
+    assert renderer.sections_reused == 4 + 4 + 3 + 3
+
+    # Sessions don't share fragments, and the least recently used one is forgotten past max_sessions
+    renderer.max_sessions = 1
+    converter.rendered = []
+    renderer.render("other", RESUME)
+    renderer.render("s", RESUME)
+    assert len(converter.rendered) == 10
+
+
+def test_memory_tier_is_an_lru_bounded_by_bytes():
+    cache = RenderCache(max_bytes=10)
+    cache.put_pdf("a", b"aaaa")
+    cache.put_pdf("b", b"bbbb")
+    assert cache.get_pdf("a") == b"aaaa"
+    cache.put_latex("c", "cccc")
+    # "b" was used least recently
+    assert cache.get_pdf("b") is None
+    assert cache.get_pdf("a") == b"aaaa" and cache.get_latex("c") == "cccc"
+    # The same key holds a PDF and its LaTeX separately
+    assert cache.get_latex("a") is None
+    cache.put_pdf("too-big", b"x" * 11)
+    assert cache.get_pdf("too-big") is None
+    assert cache.stats() == {
+        "entries": 2, "bytes": 8, "hits": 3, "disk_hits": 0, "misses": 3, "evictions": 1, "hit_ratio": 0.5}
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    cache = RenderCache(max_bytes=10, disk_dir=str(tmp_path))
+    cache.put_pdf("a", b"%PDF-a")
+    cache.put_latex("a", "\\documentclass")
+    cache.put_pdf("b", b"%PDF-b")
+    # "a"'s PDF left memory, but not the disk
+    assert cache.get_pdf("a") == b"%PDF-a" and cache.stats()["disk_hits"] == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.pdf", "a.tex", "b.pdf"]
+
+    restarted = RenderCache(disk_dir=str(tmp_path))
+    assert restarted.get_latex("a") == "\\documentclass"
+    assert restarted.get_pdf("b") == b"%PDF-b"
+    assert restarted.get_pdf("b") == b"%PDF-b"
+    assert restarted.get_pdf("c") is None
+    assert (restarted.disk_hits, restarted.hits, restarted.misses) == (2, 1, 1)
+
+
+def test_template_version_bump_changes_the_key(tmp_path, monkeypatch):
+    cache = RenderCache(disk_dir=str(tmp_path))
+    reordered = {key: RESUME[key] for key in reversed(list(RESUME))}
+    key = resume_content_hash(RESUME, LatexPdfRenderer(LaTeXResumeConverter(), None).cache_version)
+    assert key == resume_content_hash(reordered, LaTeXResumeConverter.TEMPLATE_VERSION)
+    cache.put_pdf(key, b"%PDF-old")
+
+    monkeypatch.setattr(LaTeXResumeConverter, "TEMPLATE_VERSION", LaTeXResumeConverter.TEMPLATE_VERSION + "-next")
+    bumped = resume_content_hash(RESUME, LatexPdfRenderer(LaTeXResumeConverter(), None).cache_version)
+    assert bumped != key
+    assert cache.get_pdf(bumped) is None
+    assert RenderCache(disk_dir=str(tmp_path)).get_pdf(bumped) is None
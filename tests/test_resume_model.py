@@ -0,0 +1,49 @@
+import json
+
+from event_log import append_to_section, replace_resume, set_section
+from render_cache import section_fingerprints
+from resume_model import Experience, ResumeData
+
+RESUME = {
+    "personal_section": {"name": "Jane Doe", "email": "jane@example.com", "phone": "", "github": "",
+                         "linkedin": ""},
+    "experience_section": [{"job_title": "Engineer", "company": "Acme", "start_date": "2020-01",
+                            "end_date": None, "job_type": "Remote", "responsibilities": ["Built things"]}],
+    "skills_section": {"languages": ["Python"], "frameworks": [], "developer_tools": [], "libraries": []},
+    "summary_section": "Ünicode kept as is",
+}
+
+
+def plain_json(resume_data: ResumeData) -> str:
+    return json.dumps(resume_data.to_dict(), separators=(",", ":"), ensure_ascii=False)
+
+
+def test_cached_sections_follow_edits():
+    resume_data = ResumeData.from_dict(RESUME)
+    assert resume_data.to_json() == plain_json(resume_data)
+    before = resume_data.section_fingerprints()
+
+    edited = resume_data.copy()
+    edited.append_to_section("experience_section", Experience(job_title="Lead", company="Initech"))
+    edited.apply(set_section("skills_section", {"languages": ["Go"]}))
+    edited.apply(append_to_section("summary_section", "x"))
+
+    assert edited.to_json() == plain_json(edited)
+    # The copy's edits leave the original's cached JSON alone
+    assert resume_data.to_json() == plain_json(resume_data)
+    after = edited.section_fingerprints()
+    assert {key for key in after if after[key] != before[key]} == {
+        "experience_section", "skills_section", "summary_section"}
+    assert edited.fingerprint() != resume_data.fingerprint()
+
+
+def test_fingerprints_match_a_fresh_model():
+    resume_data = ResumeData.from_dict(RESUME)
+    resume_data.section_fingerprints()
+    resume_data = resume_data.apply(replace_resume({"personal_section": {"name": "John"}}))
+    resume_data.set_section("projects_section", [{"title": "Compiler"}])
+
+    fresh = ResumeData.from_dict(resume_data.to_dict())
+    assert resume_data.section_fingerprints() == fresh.section_fingerprints()
+    assert resume_data.fingerprint() == fresh.fingerprint()
+    assert set(resume_data.section_fingerprints()) == set(section_fingerprints(resume_data.to_dict()))
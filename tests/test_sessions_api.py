@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import main
+from customstore import get_store
+from event_log import set_section
+from main import app
+
+
+def request(method, path, **kwargs):
+    async def send():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.request(method, path, **kwargs)
+    return asyncio.run(send())
+
+
+@pytest.mark.parametrize("method, path", [("GET", "/sessions/export"), ("POST", "/sessions/import")])
+def test_admin_endpoints_need_the_admin_token(monkeypatch, method, path):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+    assert request(method, path).status_code == 404
+    assert request(method, path, headers={"Authorization": "Bearer anything"}).status_code == 404
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    assert request(method, path).status_code == 401
+    assert request(method, path, headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert request(method, path, headers={"Authorization": "Basic s3cret"}).status_code == 401
+    assert request(method, path, headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+
+def ndjson(records):
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+def test_import_caps_the_error_list(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    records = [{"session_id": f"api-bad-{i}", "messages": ["x"]} for i in range(150)]
+    body = ndjson(records) + "not json\n" + ndjson([{"session_id": "api-good", "messages": [
+        {"type": "human", "data": {"content": "hi"}}]}])
+    response = request("POST", "/sessions/import?batch_size=40", content=body,
+                       headers={"Authorization": "Bearer s3cret"})
+    result = response.json()
+    assert result["imported"] == 1 and result["failed"] == 151
+    assert len(result["errors"]) == 100
+    assert get_store().get_messages("api-good")[0]["data"]["content"] == "hi"
+
+
+def test_import_waits_for_a_running_chat_turn(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    store = get_store()
+    store.add_messages("api-locked", [{"type": "human", "data": {"content": "before"}}])
+    body = ndjson([{"session_id": "api-locked", "messages": [{"type": "human", "data": {"content": "imported"}}]}])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            async with store.lock("api-locked"):
+                # Stands in for a /chat turn holding the session
+                post = asyncio.create_task(client.post("/sessions/import", content=body,
+                                                       headers={"Authorization": "Bearer s3cret"}))
+                await asyncio.sleep(0.05)
+                assert not post.done()
+                assert store.get_messages("api-locked")[0]["data"]["content"] == "before"
+            return await post
+
+    assert asyncio.run(run()).json()["imported"] == 1
+    assert store.get_messages("api-locked")[0]["data"]["content"] == "imported"
+
+
+@pytest.mark.parametrize("method, path", [
+    ("GET", "/sessions/api-unknown/resume"), ("GET", "/sessions/api-unknown/resume?version=0"),
+    ("GET", "/sessions/api-unknown/events"), ("POST", "/sessions/api-unknown/undo"),
+])
+def test_unknown_session_is_not_created_by_reading_it(method, path):
+    assert request(method, path).status_code == 404
+    assert not get_store().has_session("api-unknown")
+
+
+def test_session_endpoints():
+    store = get_store()
+    store.append_events("api-known", [set_section("summary_section", "One"), set_section("summary_section", "Two")])
+    assert request("GET", "/sessions/api-known/events?start=1").json() == {
+        "version": 2, "events": [set_section("summary_section", "Two")]}
+    assert request("GET", "/sessions/api-known/resume?version=1").json()["resume_data"]["summary_section"] == "One"
+    undone = request("POST", "/sessions/api-known/undo").json()
+    assert undone["version"] == 3 and undone["resume_data"]["summary_section"] == "One"
+    assert request("POST", "/sessions/api-known/undo?steps=9").status_code == 400
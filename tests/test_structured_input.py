@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage, message_to_dict
+
+from agent import ResumeAgentFactory
+from customstore import CustomChatMessageHistory, InMemoryStore, VersionConflict
+from fake_llm import FakeChatModel
+from resume_builder import Resume
+from structured_input import PERSONAL_TOOL, SKILLS_TOOL, parse_structured_input
+
+
+@pytest.mark.parametrize("query", [
+    "Language: I'd like the resume written in English",
+    "tools: I mostly use VS Code, but sometimes vim",
+    "name: can you change it to my nickname?",
+    "Phone: I'd rather not include it",
+    "mail: please send the PDF to me",
+    "email: please send the PDF to me",
+    "full name: can you change it to my nickname?",
+    "github: I don't have one",
+    "languages: I'd like the resume written in English",
+    "frameworks: React, but only a little. Should I add it?",
+])
+def test_conversational_lines_go_to_the_agent(query):
+    assert parse_structured_input(query) is None
+
+
+def test_key_value_lines():
+    calls = parse_structured_input(
+        "Full name: Jane O'Neil\n"
+        "email: jane@example.com, phone: +1 (555) 010-0100\n"
+        "GitHub: https://github.com/janedoe\n"
+        "- linkedin url: linkedin.com/in/janedoe\n"
+        "languages: Python, Go; C++\n"
+        "developer tools: Docker, VS Code"
+    )
+    assert calls == [
+        (PERSONAL_TOOL, {"name": "Jane O'Neil", "email": "jane@example.com", "phone": "+1 (555) 010-0100",
+                         "github": "https://github.com/janedoe", "linkedin": "linkedin.com/in/janedoe"}),
+        (SKILLS_TOOL, {"languages": ["Python", "Go", "C++"], "developer_tools": ["Docker", "VS Code"]}),
+    ]
+
+
+def test_json_form_fields_keep_short_aliases():
+    # A JSON form names its fields explicitly, so "name" and "tools" still map there
+    calls = parse_structured_input('{"name": "Jane Doe", "tools": ["Docker"]}')
+    assert calls == [(PERSONAL_TOOL, {"name": "Jane Doe"}), (SKILLS_TOOL, {"developer_tools": ["Docker"]})]
+
+
+def test_fast_path_write_is_checked_against_the_history_it_read():
+    store = InMemoryStore()
+    store.add_messages("structured-cas", [message_to_dict(HumanMessage(content="hi"))])
+    history = CustomChatMessageHistory("structured-cas", store=store, optimistic=True, defer_writes=True)
+    resume = store.get_resume("structured-cas")
+    factory = ResumeAgentFactory(model=FakeChatModel(), verbose=False)
+
+    response = asyncio.run(factory.aapply_structured("email: jane@example.com", resume, history))
+    assert response is not None and history.loaded_count == 1
+    # Another worker's turn lands before this one commits
+    store.add_messages("structured-cas", [message_to_dict(HumanMessage(content="from elsewhere"))])
+    with pytest.raises(VersionConflict):
+        asyncio.run(history.acommit_turn(resume, resume.resume_data))
+
+
+@pytest.mark.parametrize("query", [
+    '{"skills_section": ["Python"]}',
+    '{"personal_section": "x"}',
+    '{"experience_section": ["x"]}',
+    '{"experience": ["x"], "name": "Jane Doe"}',
+    '{"basics": "x"}',
+    '{"basics": {"name": "Jane", "profiles": ["x"]}}',
+    '{"work": ["x"]}',
+    '{"work": "x"}',
+    '{"work": [], "education": [1]}',
+    '{"work": [], "projects": [null]}',
+    '{"work": [], "skills": ["Python"]}',
+])
+def test_malformed_json_goes_to_the_agent(query):
+    assert parse_structured_input(query) is None
+    resume, history = Resume(), CustomChatMessageHistory("structured-malformed", store=InMemoryStore())
+    factory = ResumeAgentFactory(model=FakeChatModel(), verbose=False)
+    assert asyncio.run(factory.aapply_structured(query, resume, history)) is None
+    assert resume.pending_events == []
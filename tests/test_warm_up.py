@@ -0,0 +1,58 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+import agent
+import main
+from agent import ResumeAgentFactory
+from fake_llm import FakeChatModel
+from pdf_renderers import HtmlPdfRenderer
+
+
+async def chat_and_ready():
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            chat = await client.post("/chat", json={"query": "I know Python", "session_id": "warm-up"})
+            await main.app.state.pdf_warmup
+            ready = await client.get("/ready")
+            pdf = await client.post("/pdf", json={"resume_data": {}})
+    return chat, ready, pdf
+
+
+@pytest.fixture
+def fake_agent(monkeypatch):
+    monkeypatch.setattr(agent, "ResumeAgentFactory", lambda: ResumeAgentFactory(model=FakeChatModel(), verbose=False))
+
+
+def test_broken_pdf_renderer_only_fails_pdf(monkeypatch, fake_agent):
+    def missing_libraries(self):
+        raise OSError("cannot load library 'libpango-1.0-0'")
+
+    monkeypatch.setattr(main, "PDF_RENDERER", "html")
+    monkeypatch.setattr(HtmlPdfRenderer, "warm", missing_libraries)
+    chat, ready, pdf = asyncio.run(chat_and_ready())
+    assert chat.status_code == 200
+    assert ready.status_code == 200
+    assert ready.json()["pdf_warm"] is False and "libpango" in ready.json()["pdf_warmup_error"]
+    assert pdf.status_code == 500
+
+
+def test_unknown_pdf_renderer_only_fails_pdf(monkeypatch, fake_agent):
+    monkeypatch.setattr(main, "PDF_RENDERER", "nope")
+    chat, ready, pdf = asyncio.run(chat_and_ready())
+    assert chat.status_code == 200
+    assert "PDF_RENDERER=nope" in ready.json()["pdf_warmup_error"]
+    assert pdf.status_code == 400
+
+
+def test_converters_import_without_langchain():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = ("import sys, tools.latex_converter, tools.html_converter; "
+            "print(sorted(m for m in ('langchain_core', 'pydantic') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
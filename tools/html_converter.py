@@ -0,0 +1,143 @@
+from html import escape
+from typing import Dict, Iterator, List
+import io
+import re
+
+from tools.latex_converter import LaTeXResumeConverter
+
+_BULLET_PREFIX = re.compile(r"^\s*[-*•]\s+")
+
+# Letter-size layout close to the LaTeX template: small caps headings with a rule, dates right-aligned
+STYLESHEET = """
+@page { size: letter; margin: 0.5in 0.5in; }
+body { font-family: "Latin Modern Roman", "CMU Serif", "DejaVu Serif", serif; font-size: 10.5pt; line-height: 1.2; margin: 0; }
+header { text-align: center; margin-bottom: 6pt; }
+header h1 { font-size: 22pt; font-variant: small-caps; font-weight: bold; margin: 0 0 2pt; }
+header .contacts { font-size: 9.5pt; }
+header .contacts a { color: inherit; }
+section h2 { font-size: 12pt; font-variant: small-caps; font-weight: normal; border-bottom: 0.6pt solid black;
+             margin: 8pt 0 4pt; padding-bottom: 1pt; }
+.entry { margin: 0 0 5pt 8pt; }
+.row { display: flex; justify-content: space-between; }
+.row .right { text-align: right; white-space: nowrap; margin-left: 8pt; }
+.subrow { font-size: 9.5pt; font-style: italic; }
+ul { margin: 2pt 0 0 0; padding-left: 14pt; }
+li { font-size: 9.5pt; margin-bottom: 1pt; }
+.skills p { margin: 0 0 1pt 8pt; font-size: 9.5pt; }
+"""
+
+
+class HtmlResumeConverter:
+    """Renders resume_data to an HTML document styled by STYLESHEET, for the in-process PDF backend."""
+
+    # Bump whenever the generated HTML or STYLESHEET changes so cached renders are not reused
+    TEMPLATE_VERSION = "1"
+
+    SECTION_ORDER = LaTeXResumeConverter.SECTION_ORDER
+    SKILL_LABELS = LaTeXResumeConverter.SKILL_LABELS
+
+    def _text(self, value) -> str:
+        return escape(str(value or ""))
+
+    def _bullets(self, items: List[str]) -> str:
+        # format_responsibilities used to return "- " prefixed lines and sometimes blank ones
+        rendered = "".join(
+            f"<li>{self._text(_BULLET_PREFIX.sub('', item))}</li>"
+            for item in map(str, filter(None, items or [])) if item.strip()
+        )
+        return f"<ul>{rendered}</ul>" if rendered else ""
+
+    def _section(self, heading: str, items: List[str], css_class: str = "") -> str:
+        if not items:
+            return ""
+        class_attr = f' class="{css_class}"' if css_class else ""
+        return f"<section{class_attr}><h2>{heading}</h2>{''.join(items)}</section>\n"
+
+    def _entry(self, left: str, right: str, sub_left: str = "", sub_right: str = "", bullets: str = "") -> str:
+        sub = ""
+        if sub_left or sub_right:
+            sub = f'<div class="row subrow"><span>{sub_left}</span><span class="right">{sub_right}</span></div>'
+        return (f'<div class="entry"><div class="row"><span>{left}</span><span class="right">{right}</span></div>'
+                f"{sub}{bullets}</div>")
+
+    def render_personal_section(self, info: Dict) -> str:
+        info = info or {}
+        contacts = []
+        if info.get("phone"):
+            contacts.append(self._text(info["phone"]))
+        if info.get("email"):
+            email = self._text(info["email"])
+            contacts.append(f'<a href="mailto:{email}">{email}</a>')
+        for key in ("linkedin", "github"):
+            if info.get(key):
+                url = str(info[key])
+                display = url.split("://", 1)[-1].rstrip("/")
+                contacts.append(f'<a href="{escape(url)}">{self._text(display)}</a>')
+        if not info.get("name") and not contacts:
+            return ""
+        return (f'<header><h1>{self._text(info.get("name"))}</h1>'
+                f'<div class="contacts">{" | ".join(contacts)}</div></header>\n')
+
+    def render_education_section(self, education) -> str:
+        """AddEducation stores a single dict; a list of them is accepted too."""
+        entries = [education] if isinstance(education, dict) else (education or [])
+        return self._section("Education", [
+            self._entry(
+                f"<b>{self._text(entry.get('institution'))}</b>", self._text(entry.get("location")),
+                self._text(entry.get("degree")), self._text(entry.get("graduation_date"))
+            )
+            for entry in entries if entry
+        ])
+
+    def render_experience_section(self, experiences: List[Dict]) -> str:
+        return self._section("Experience", [
+            self._entry(
+                f"<b>{self._text(exp.get('job_title'))}</b>",
+                self._text(f"{exp.get('start_date') or ''} – {exp.get('end_date') or 'Present'}"),
+                self._text(exp.get("company")), self._text(exp.get("job_type")),
+                self._bullets(exp.get("responsibilities"))
+            )
+            for exp in experiences or []
+        ])
+
+    def render_projects_section(self, projects: List[Dict]) -> str:
+        items = []
+        for project in projects or []:
+            title = f"<b>{self._text(project.get('title'))}</b>"
+            if project.get("tech_stack"):
+                title += f" | <i>{self._text(', '.join(project['tech_stack']))}</i>"
+            items.append(self._entry(title, self._text(project.get("duration")),
+                                     bullets=self._bullets(project.get("features"))))
+        return self._section("Projects", items)
+
+    def render_skills_section(self, skills: Dict) -> str:
+        if not isinstance(skills, dict):
+            return ""
+        return self._section("Technical Skills", [
+            f"<p><b>{self._text(self.SKILL_LABELS.get(category, category.replace('_', ' ').title()))}</b>: "
+            f"{self._text(', '.join(items))}</p>"
+            for category, items in skills.items() if items
+        ], css_class="skills")
+
+    def render_section(self, key: str, value) -> str:
+        """Render one resume_data section (a SECTION_ORDER key); empty sections render as ""."""
+        return getattr(self, f"render_{key}")(value)
+
+    def iter_sections(self, json_data: Dict) -> Iterator[str]:
+        for key in self.SECTION_ORDER:
+            if key in json_data:
+                section = self.render_section(key, json_data[key])
+                if section:
+                    yield section
+
+    def convert_json_to_html(self, json_data: Dict, inline_css: bool = False) -> str:
+        """The HTML document; the PDF backend passes STYLESHEET separately so it is parsed only once."""
+        buffer = io.StringIO()
+        buffer.write('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Resume</title>')
+        if inline_css:
+            buffer.write(f"<style>{STYLESHEET}</style>")
+        buffer.write("</head><body>\n")
+        for chunk in self.iter_sections(json_data):
+            buffer.write(chunk)
+        buffer.write("</body></html>\n")
+        return buffer.getvalue()
@@ -1,27 +1,87 @@
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, TextIO
+import io
 import re
 from datetime import datetime
+from tools.latex_templates import (
+    render_bullets,
+    render_education,
+    render_experience,
+    render_list_section,
+    render_personal,
+    render_project,
+    render_skill_line,
+    render_skills,
+)
+
+LATEX_SPECIAL_CHARS = {
+    '\\': '\\textbackslash{}',
+    '&': '\\&',
+    '%': '\\%',
+    '$': '\\$',
+    '#': '\\#',
+    '_': '\\_',
+    '{': '\\{',
+    '}': '\\}',
+    '~': '\\textasciitilde{}',
+    '^': '\\textasciicircum{}'
+}
+
+_BULLET_PREFIX = re.compile(r"^\s*[-*\u2022]\s+")
+_BULLET_STARTS = frozenset(" \t-*\u2022")
+
 
 class LaTeXResumeConverter:
+    # Bump whenever the generated LaTeX changes so cached renders are not reused
+    TEMPLATE_VERSION = "3"
+
+    # resume_data keys written by the tools, in document order
+    SECTION_ORDER = ("personal_section", "education_section", "experience_section", "projects_section", "skills_section")
+    SKILL_LABELS = {
+        "languages": "Languages",
+        "frameworks": "Frameworks",
+        "developer_tools": "Developer Tools",
+        "libraries": "Libraries"
+    }
+
+    _preamble = None
+
     def __init__(self):
-        self.latex_special_chars = {
-            '&': '\\&',
-            '%': '\\%',
-            '$': '\\$',
-            '#': '\\#',
-            '_': '\\_',
-            '{': '\\{',
-            '}': '\\}',
-            '~': '\\textasciitilde{}',
-            '^': '\\textasciicircum{}'
-        }
+        self.latex_special_chars = LATEX_SPECIAL_CHARS
     
     def escape_latex(self, text: str) -> str:
-        """Escape special LaTeX characters."""
+        """Escape special LaTeX characters (LATEX_SPECIAL_CHARS); NUL, which pdflatex rejects, is dropped.
+
+        A str.replace per special character present, unrolled so each costs one C-level scan and
+        no loop step. Backslashes become NUL first and are expanded last, so the braces of
+        \\textbackslash{} are never escaped again.
+        """
         if not isinstance(text, str):
-            return str(text)
-        for char, replacement in self.latex_special_chars.items():
-            text = text.replace(char, replacement)
+            text = str(text)
+        if "\x00" in text:
+            text = text.replace("\x00", "")
+        backslash = "\\" in text
+        if backslash:
+            text = text.replace("\\", "\x00")
+        if "&" in text:
+            text = text.replace("&", "\\&")
+        if "%" in text:
+            text = text.replace("%", "\\%")
+        if "$" in text:
+            text = text.replace("$", "\\$")
+        if "#" in text:
+            text = text.replace("#", "\\#")
+        if "_" in text:
+            text = text.replace("_", "\\_")
+        if "{" in text:
+            text = text.replace("{", "\\{")
+        if "}" in text:
+            text = text.replace("}", "\\}")
+        if "~" in text:
+            text = text.replace("~", "\\textasciitilde{}")
+        if "^" in text:
+            text = text.replace("^", "\\textasciicircum{}")
+        if backslash:
+            text = text.replace("\x00", "\\textbackslash{}")
         return text
 
     def generate_document_header(self) -> List[str]:
@@ -64,6 +124,12 @@ class LaTeXResumeConverter:
             ""
         ]
 
+    def generate_preamble(self) -> str:
+        """Everything before \\begin{document}; identical for every resume, so it is built once and can be precompiled."""
+        if LaTeXResumeConverter._preamble is None:
+            LaTeXResumeConverter._preamble = "\n".join(self.generate_document_header())
+        return LaTeXResumeConverter._preamble
+
     def _get_custom_commands(self) -> str:
         """Define custom LaTeX commands."""
         return """
@@ -86,7 +152,19 @@ class LaTeXResumeConverter:
     \\begin{tabular*}{0.97\\textwidth}{l@{\\extracolsep{\\fill}}r}
       \\textit{\\small#1} & \\textit{\\small #2} \\\\
     \\end{tabular*}\\vspace{-7pt}
-}"""
+}
+
+\\newcommand{\\resumeProjectHeading}[2]{
+    \\item
+    \\begin{tabular*}{0.97\\textwidth}{l@{\\extracolsep{\\fill}}r}
+      \\small#1 & #2 \\\\
+    \\end{tabular*}\\vspace{-7pt}
+}
+
+\\newcommand{\\resumeSubHeadingListStart}{\\begin{itemize}[leftmargin=0.15in, label={}]}
+\\newcommand{\\resumeSubHeadingListEnd}{\\end{itemize}}
+\\newcommand{\\resumeItemListStart}{\\begin{itemize}}
+\\newcommand{\\resumeItemListEnd}{\\end{itemize}\\vspace{-5pt}}"""
 
     def format_personal_info(self, info: Dict) -> List[str]:
         """Format personal information section."""
@@ -144,30 +222,135 @@ class LaTeXResumeConverter:
         lines.append("\\resumeSubHeadingListEnd")
         return lines
 
-    def convert_json_to_latex(self, json_data: Dict) -> str:
-        """Convert JSON resume data to LaTeX format."""
-        latex_content = []
-        
-        # Add document header
-        latex_content.extend(self.generate_document_header())
-        
-        # Begin document
-        latex_content.extend([
-            "\\begin{document}",
-            ""
+    def escape_url(self, url: str) -> str:
+        """Escape only what breaks \\href; the rest of a URL must stay verbatim."""
+        return str(url).replace("\\", "/").replace("%", "\\%").replace("#", "\\#").replace("{", "").replace("}", "")
+
+    def _bullets(self, items: List[str]) -> str:
+        # format_responsibilities returns "- " prefixed lines and sometimes blank ones
+        escape = self.escape_latex
+        return render_bullets([
+            escape(_BULLET_PREFIX.sub("", item) if item[0] in _BULLET_STARTS else item)
+            for item in map(str, filter(None, items or [])) if not item.isspace()
         ])
-        
-        # Add sections
+
+    def _section(self, heading: str, items: List[str]) -> str:
+        if not items:
+            return ""
+        return render_list_section(heading=heading, items="".join(items))
+
+    def render_personal_section(self, info: Dict) -> str:
+        """Name and contact line from the AddPersonalInformation fields."""
+        info = info or {}
+        contacts = []
+        if info.get("phone"):
+            contacts.append(self.escape_latex(info["phone"]))
+        if info.get("email"):
+            email = info["email"]
+            contacts.append(f"\\href{{mailto:{self.escape_url(email)}}}{{\\underline{{{self.escape_latex(email)}}}}}")
+        for key in ("linkedin", "github"):
+            if info.get(key):
+                url = info[key]
+                display = url.split("://", 1)[-1].rstrip("/")
+                contacts.append(f"\\href{{{self.escape_url(url)}}}{{\\underline{{{self.escape_latex(display)}}}}}")
+        if not info.get("name") and not contacts:
+            return ""
+        return render_personal(
+            name=self.escape_latex(info.get("name") or ""),
+            contacts=" $|$ ".join(contacts)
+        )
+
+    def render_education_section(self, education) -> str:
+        """AddEducation stores a single dict; a list of them is accepted too."""
+        entries = [education] if isinstance(education, dict) else (education or [])
+        return self._section("Education", [
+            render_education(
+                institution=self.escape_latex(entry.get("institution") or ""),
+                location=self.escape_latex(entry.get("location") or ""),
+                degree=self.escape_latex(entry.get("degree") or ""),
+                graduation_date=self.escape_latex(entry.get("graduation_date") or "")
+            )
+            for entry in entries if entry
+        ])
+
+    def render_experience_section(self, experiences: List[Dict]) -> str:
+        escape, bullets = self.escape_latex, self._bullets
+        return self._section("Experience", [
+            render_experience(
+                job_title=escape(exp.get("job_title") or ""),
+                dates=escape(f"{exp.get('start_date') or ''} -- {exp.get('end_date') or 'Present'}"),
+                company=escape(exp.get("company") or ""),
+                job_type=escape(exp.get("job_type") or ""),
+                bullets=bullets(exp.get("responsibilities"))
+            )
+            for exp in experiences or []
+        ])
+
+    def render_projects_section(self, projects: List[Dict]) -> str:
+        items = []
+        for project in projects or []:
+            title = f"\\textbf{{{self.escape_latex(project.get('title') or '')}}}"
+            if project.get("tech_stack"):
+                title += f" $|$ \\emph{{{self.escape_latex(', '.join(project['tech_stack']))}}}"
+            items.append(render_project(
+                title=title,
+                duration=self.escape_latex(project.get("duration") or ""),
+                bullets=self._bullets(project.get("features"))
+            ))
+        return self._section("Projects", items)
+
+    def render_skills_section(self, skills: Dict) -> str:
+        if not isinstance(skills, dict):
+            return ""
+        lines = [
+            render_skill_line(
+                label=self.escape_latex(self.SKILL_LABELS.get(category, category.replace("_", " ").title())),
+                items=self.escape_latex(", ".join(items))
+            )
+            for category, items in skills.items() if items
+        ]
+        if not lines:
+            return ""
+        return render_skills(lines=" \\\\\n".join(lines))
+
+    def render_section(self, key: str, value) -> str:
+        """Render one resume_data section (a SECTION_ORDER key); empty sections render as ""."""
+        return getattr(self, f"render_{key}")(value)
+
+    def iter_sections(self, json_data: Dict) -> Iterator[str]:
+        """Yield the document body one chunk at a time, from \\begin{document} to \\end{document}.
+
+        Sections come from the resume_data keys the tools write (SECTION_ORDER). The older
+        personal_info / skills / experience shape is still rendered by the format_* methods.
+        """
+        yield "\\begin{document}\n"
+
+        for key in self.SECTION_ORDER:
+            if key in json_data:
+                section = self.render_section(key, json_data[key])
+                if section:
+                    yield section
+
         if 'personal_info' in json_data:
-            latex_content.extend(self.format_personal_info(json_data['personal_info']))
-        
+            yield "\n".join(self.format_personal_info(json_data['personal_info']))
+
         if 'skills' in json_data:
-            latex_content.extend(self.format_skills(json_data['skills']))
-            
+            yield "\n".join(self.format_skills(json_data['skills']))
+
         if 'experience' in json_data:
-            latex_content.extend(self.format_experience(json_data['experience']))
-        
-        # Close document
-        latex_content.append("\\end{document}")
-        
-        return "\n".join(latex_content)
\ No newline at end of file
+            yield "\n".join(self.format_experience(json_data['experience']))
+
+        yield "\\end{document}"
+
+    def write_latex(self, json_data: Dict, out: TextIO) -> None:
+        """Stream the LaTeX document into `out` (a file or buffer) section by section."""
+        out.write(self.generate_preamble())
+        for chunk in self.iter_sections(json_data):
+            out.write("\n")
+            out.write(chunk)
+
+    def convert_json_to_latex(self, json_data: Dict) -> str:
+        """Convert JSON resume data to LaTeX format."""
+        buffer = io.StringIO()
+        self.write_latex(json_data, buffer)
+        return buffer.getvalue()
@@ -0,0 +1,82 @@
+from typing import Callable, List
+import re
+
+# Templates use $field placeholders ($$ is a literal dollar) so LaTeX braces need no escaping.
+# Each is compiled once, at import, into a function whose body is a single f-string, so a
+# render is as fast as the hand-written f-string formatter; str.format would re-parse the
+# pattern on every call.
+_TEMPLATE_FIELD = re.compile(r"\$(?:(\$)|([a-z_]+))")
+
+
+def compile_template(template: str) -> Callable[..., str]:
+    """Compile a template to a function taking its fields, already escaped, as keyword arguments."""
+    fields = list(dict.fromkeys(name for _, name in _TEMPLATE_FIELD.findall(template) if name))
+    pattern = template.replace("{", "{{").replace("}", "}}")
+    pattern = _TEMPLATE_FIELD.sub(lambda m: "$" if m.group(1) else "{" + m.group(2) + "}", pattern)
+    # The templates are module constants, never user input; repr() gives a valid literal for the f prefix
+    params = f"*, {', '.join(fields)}" if fields else ""
+    return eval(f"lambda {params}: f{pattern!r}", {})
+
+
+PERSONAL_TEMPLATE = r"""\begin{center}
+    \textbf{\Huge \scshape $name} \\ \vspace{1pt}
+    \small $contacts
+\end{center}
+"""
+
+SECTION_TEMPLATE = r"""\section{$heading}
+\resumeSubHeadingListStart
+$items\resumeSubHeadingListEnd
+"""
+
+EXPERIENCE_TEMPLATE = r"""  \resumeSubheading
+    {$job_title}{$dates}
+    {$company}{$job_type}
+$bullets
+"""
+
+EDUCATION_TEMPLATE = r"""  \resumeSubheading
+    {$institution}{$location}
+    {$degree}{$graduation_date}
+"""
+
+PROJECT_TEMPLATE = r"""  \resumeProjectHeading
+    {$title}{$duration}
+$bullets
+"""
+
+BULLETS_TEMPLATE = r"""  \resumeItemListStart
+$items  \resumeItemListEnd"""
+
+BULLET_TEMPLATE = r"""    \resumeItem{$text}
+"""
+
+SKILLS_TEMPLATE = r"""\section{Technical Skills}
+\begin{itemize}[leftmargin=0.15in, label={}]
+    \small{\item{
+$lines
+    }}
+\end{itemize}
+"""
+
+SKILL_LINE_TEMPLATE = r"""     \textbf{$label}{: $items}"""
+
+
+render_personal = compile_template(PERSONAL_TEMPLATE)
+render_list_section = compile_template(SECTION_TEMPLATE)
+render_experience = compile_template(EXPERIENCE_TEMPLATE)
+render_education = compile_template(EDUCATION_TEMPLATE)
+render_project = compile_template(PROJECT_TEMPLATE)
+render_skills = compile_template(SKILLS_TEMPLATE)
+render_skill_line = compile_template(SKILL_LINE_TEMPLATE)
+# Bullets have a single field each, so a whole list is one join between precomputed halves
+_LIST_OPEN, _LIST_CLOSE = BULLETS_TEMPLATE.split("$items")
+_BULLET_OPEN, _BULLET_CLOSE = BULLET_TEMPLATE.split("$text")
+_BULLET_JOIN = _BULLET_CLOSE + _BULLET_OPEN
+
+
+def render_bullets(texts: List[str]) -> str:
+    """BULLETS_TEMPLATE around BULLET_TEMPLATE for each escaped text; "" for no texts."""
+    if not texts:
+        return ""
+    return _LIST_OPEN + _BULLET_OPEN + _BULLET_JOIN.join(texts) + _BULLET_CLOSE + _LIST_CLOSE
@@ -1,8 +1,68 @@
+from contextvars import ContextVar
 from typing import Type, Optional, List
-from langchain_core.callbacks import CallbackManagerForToolRun
+import asyncio
+import logging
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
-from resume_builder import Resume
+from resume_builder import Resume, current_resume
+from resume_model import Education, Experience, PersonalInfo, Project, Skills
+
+logger = logging.getLogger(__name__)
+
+
+class ToolCallSequencer:
+    """Orders resume edits from tool calls that run concurrently within one request.
+
+    Every tool call takes a sequence number when it starts, in the order the model emitted it.
+    Calls run in parallel (at most `max_concurrency` other than resume edits at once), but a
+    resume edit waits until all earlier calls have finished, so the resulting resume_data does
+    not depend on timing.
+    """
+
+    def __init__(self, max_concurrency: int = 4):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self._issued = 0
+        self._next = 0
+        self._turn = asyncio.Condition()
+
+    def next_seq(self) -> int:
+        seq = self._issued
+        self._issued += 1
+        return seq
+
+    async def wait_turn(self, seq: int):
+        async with self._turn:
+            await self._turn.wait_for(lambda: self._next == seq)
+
+    async def release(self, seq: int):
+        await self.wait_turn(seq)
+        async with self._turn:
+            self._next = seq + 1
+            self._turn.notify_all()
+
+
+# Sequencer for the current request and the sequence number of the running tool call
+current_tool_sequencer: ContextVar[Optional[ToolCallSequencer]] = ContextVar("current_tool_sequencer", default=None)
+current_tool_seq: ContextVar[Optional[int]] = ContextVar("current_tool_seq", default=None)
+
+
+class ResumeTool(BaseTool):
+    """Base for tools that edit a resume; falls back to the resume bound to the current request."""
+    resume: Optional[Resume] = None
+
+    def get_resume(self) -> Resume:
+        resume = self.resume or current_resume.get()
+        if resume is None:
+            raise ValueError(f"{self.name} has no resume bound for this request")
+        return resume
+
+    async def _arun(self, *args, run_manager: Optional[AsyncCallbackManagerForToolRun] = None, **kwargs):
+        sequencer, seq = current_tool_sequencer.get(), current_tool_seq.get()
+        if sequencer is not None and seq is not None:
+            await sequencer.wait_turn(seq)
+        # Resume edits are in-memory model updates, so run them inline instead of hopping to a thread
+        return self._run(*args, run_manager=run_manager.get_sync() if run_manager else None, **kwargs)
 
 class PersonalInformationSchema(BaseModel):
     name: Optional[str] = Field("", description="Full name of the person")
@@ -11,23 +71,23 @@ class PersonalInformationSchema(BaseModel):
     github: Optional[str] = Field("", description="GitHub profile link")
     linkedin: Optional[str] = Field("", description="LinkedIn profile link")
 
-class PersonalInformation(BaseTool):
+class PersonalInformation(ResumeTool):
     name: str = "AddPersonalInformation"
     description: str = "Use this tool to add personal information of the user to the resume."
     args_schema: Type[BaseModel] = PersonalInformationSchema
     return_direct: bool = False
-    resume: Resume = None
 
     def _run(self, name: Optional[str] = "", email: Optional[str] = "", phone: Optional[str] = "", 
              github: Optional[str] = "", linkedin: Optional[str] = "",
              run_manager: Optional[CallbackManagerForToolRun] = None):
-        self.resume.resume_data["personal_section"] = {
-            "name": name or "",
-            "email": email or "",
-            "phone": phone or "",
-            "github": github or "",
-            "linkedin": linkedin or ""
-        }
+        resume = self.get_resume()
+        resume.set_section("personal_section", PersonalInfo(
+            name=name or "",
+            email=email or "",
+            phone=phone or "",
+            github=github or "",
+            linkedin=linkedin or ""
+        ))
         return {"output": "Successfully added personal information"}
 
 class ExperienceSchema(BaseModel):
@@ -38,39 +98,27 @@ class ExperienceSchema(BaseModel):
     job_type: Optional[str] = Field("Not Specified", description="Job Type (Remote, On-site, Hybrid)")
     responsibilities: Optional[List[str]] = Field([], description="List of job responsibilities")
 
-class ExperienceTool(BaseTool):
+class ExperienceTool(ResumeTool):
     name: str = "AddExperience"
     description: str = "Tool to capture work experience details."
     args_schema: Type[BaseModel] = ExperienceSchema
     return_direct: bool = False
-    resume: Resume = None
 
     def _run(self, company: Optional[str] = "", job_title: Optional[str] = "", start_date: Optional[str] = "",
              end_date: Optional[str] = None, job_type: Optional[str] = "Not Specified", 
              responsibilities: Optional[List[str]] = None,
              run_manager: Optional[CallbackManagerForToolRun] = None):
-        print("experience started")
-        responsibilities = responsibilities or []
-        print(self.resume.resume_data)
-        existing_data = self.resume.resume_data["experience_section"]
-        print({
-            "job_title": job_title or "",
-            "company": company or "",
-            "start_date": start_date or "",
-            "end_date": end_date,
-            "job_type": job_type or "Not Specified",
-            "responsibilities": responsibilities
-        })
-        existing_data.append({
-            "job_title": job_title or "",
-            "company": company or "",
-            "start_date": start_date or "",
-            "end_date": end_date,
-            "job_type": job_type or "Not Specified",
-            "responsibilities": responsibilities
-        })
-        print("experiece ended")
-        self.resume.resume_data["experience_section"] = existing_data
+        resume = self.get_resume()
+        experience = Experience(
+            job_title=job_title or "",
+            company=company or "",
+            start_date=start_date or "",
+            end_date=end_date,
+            job_type=job_type or "Not Specified",
+            responsibilities=list(responsibilities or [])
+        )
+        logger.debug("Adding experience %s", experience)
+        resume.append_to_section("experience_section", experience)
         return {"output": "Successfully added experience."}
 
 class EducationSchema(BaseModel):
@@ -79,22 +127,22 @@ class EducationSchema(BaseModel):
     degree: Optional[str] = Field("", description="Degree obtained")
     graduation_date: Optional[str] = Field("", description="Graduation date (YYYY-MM)")
 
-class EducationTool(BaseTool):
+class EducationTool(ResumeTool):
     name: str = "AddEducation"
     description: str = "Tool to capture latest education details."
     args_schema: Type[BaseModel] = EducationSchema
     return_direct: bool = False
-    resume: Resume = None
 
     def _run(self, institution: Optional[str] = "", degree: Optional[str] = "", 
              graduation_date: Optional[str] = "", location: Optional[str] = None,
              run_manager: Optional[CallbackManagerForToolRun] = None):
-        self.resume.resume_data["education_section"] = {
-            "degree": degree or "",
-            "institution": institution or "",
-            "graduation_date": graduation_date or "",
-            "location": location
-        }
+        resume = self.get_resume()
+        resume.set_section("education_section", Education(
+            degree=degree or "",
+            institution=institution or "",
+            graduation_date=graduation_date or "",
+            location=location
+        ))
         return {"output": "Successfully added education."}
 
 class ProjectsSchema(BaseModel):
@@ -103,26 +151,22 @@ class ProjectsSchema(BaseModel):
     features: Optional[List[str]] = Field([], description="List of key features in the project")
     duration: Optional[str] = Field("", description="Duration of the project (e.g., 3 months)")
 
-class ProjectsTool(BaseTool):
+class ProjectsTool(ResumeTool):
     name: str = "AddProjects"
     description: str = "Tool to capture project details."
     args_schema: Type[BaseModel] = ProjectsSchema
     return_direct: bool = False
-    resume: Resume = None
 
     def _run(self, title: Optional[str] = "", tech_stack: Optional[List[str]] = None, 
              features: Optional[List[str]] = None, duration: Optional[str] = "",
              run_manager: Optional[CallbackManagerForToolRun] = None):
-        tech_stack = tech_stack or []
-        features = features or []
-        existing_data = self.resume.resume_data.get("projects_section", [])
-        existing_data.append({
-            "title": title or "",
-            "tech_stack": tech_stack,
-            "features": features,
-            "duration": duration or ""
-        })
-        self.resume.resume_data["projects_section"] = existing_data
+        resume = self.get_resume()
+        resume.append_to_section("projects_section", Project(
+            title=title or "",
+            tech_stack=list(tech_stack or []),
+            features=list(features or []),
+            duration=duration or ""
+        ))
         return {"output": "Successfully added project details."}
 
 class SkillsSchema(BaseModel):
@@ -131,24 +175,20 @@ class SkillsSchema(BaseModel):
     developer_tools: Optional[List[str]] = Field([], description="List of developer tools")
     libraries: Optional[List[str]] = Field([], description="List of libraries")
 
-class SkillsTool(BaseTool):
+class SkillsTool(ResumeTool):
     name: str = "AddSkills"
     description: str = "Tool to capture user skills."
     args_schema: Type[BaseModel] = SkillsSchema
     return_direct: bool = False
-    resume: Resume = None
 
     def _run(self, languages: Optional[List[str]] = None, frameworks: Optional[List[str]] = None, 
              developer_tools: Optional[List[str]] = None, libraries: Optional[List[str]] = None,
              run_manager: Optional[CallbackManagerForToolRun] = None):
-        languages = languages or []
-        frameworks = frameworks or []
-        developer_tools = developer_tools or []
-        libraries = libraries or []
-        self.resume.resume_data["skills_section"] = {
-            "languages": languages,
-            "frameworks": frameworks,
-            "developer_tools": developer_tools,
-            "libraries": libraries
-        }
+        resume = self.get_resume()
+        resume.set_section("skills_section", Skills(
+            languages=list(languages or []),
+            frameworks=list(frameworks or []),
+            developer_tools=list(developer_tools or []),
+            libraries=list(libraries or [])
+        ))
         return {"output": "Successfully added skills."}
\ No newline at end of file